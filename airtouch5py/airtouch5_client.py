@@ -1,23 +1,65 @@
 import asyncio
-import binascii
 import logging
+import time
+from collections import deque
 from enum import Enum
 
+from airtouch5py.capture import CaptureDirection, CaptureWriter
 from airtouch5py.data_packet_factory import DataPacketFactory
-
+from airtouch5py.metrics import Metrics
 from airtouch5py.packet_encoder import PacketEncoder
+from airtouch5py.packet_protocol import PacketProtocol
+from airtouch5py.packet_queue import OverflowPolicy, PacketQueue
 from airtouch5py.packet_reader import PacketReader
-
-from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.ac_ability import AcAbilityData, AcAbilityRequestData
+from airtouch5py.packets.ac_control import AcControlData
+from airtouch5py.packets.ac_error_information import (
+    AcErrorInformationData,
+    AcErrorInformationRequestData,
+)
+from airtouch5py.packets.ac_status import AcStatusData
+from airtouch5py.packets.console_version import (
+    ConsoleVersionData,
+    ConsoleVersionRequestData,
+)
+from airtouch5py.packets.datapacket import Data, DataPacket
+from airtouch5py.packets.zone_control import ZoneControlData
+from airtouch5py.packets.zone_name import ZoneNameData, ZoneNameRequestData
+from airtouch5py.packets.zone_status import ZoneStatusData
+from airtouch5py.trace import PacketTrace
 
 _LOGGER = logging.getLogger(__name__)
 
+# The type of data the airtouch 5 replies with for each type of request.
+# Control messages are answered with the matching status message.
+_RESPONSE_TYPES: dict[type[Data], type[Data]] = {
+    ZoneControlData: ZoneStatusData,
+    ZoneStatusData: ZoneStatusData,
+    AcControlData: AcStatusData,
+    AcStatusData: AcStatusData,
+    AcAbilityRequestData: AcAbilityData,
+    AcErrorInformationRequestData: AcErrorInformationData,
+    ZoneNameRequestData: ZoneNameData,
+    ConsoleVersionRequestData: ConsoleVersionData,
+}
+
 
 class Airtouch5ConnectionStateChange(Enum):
     CONNECTED = 1
     DISCONNECTED = 2
 
 
+class ClientTransport(Enum):
+    """
+    How Airtouch5Client reads from the socket.
+    """
+
+    # A task reading chunks from an asyncio StreamReader
+    STREAM = 1
+    # A PacketProtocol, packets are framed as the event loop receives them with no task per connection
+    PROTOCOL = 2
+
+
 class Airtouch5Client:
     """
     The "Raw" (Hard mode) Airtouch 5 Client.
@@ -28,31 +70,90 @@ class Airtouch5Client:
     Wait on packets_received to receive a CONNECTED message.
     Wait on updates from packets_received, use send_packet to send packets.
 
+    Use request to send a packet and get a future for its reply, so several requests can be in flight at once.
+    Replies are also put in packets_received like every other packet.
+
     Call disconnect to disconnect.
 
+    packets_received is unbounded by default. Give a max_queue_size to bound it, overflow_policy then decides
+    whether the reader waits for space, drops the oldest packets or coalesces status packets, see PacketQueue.
+    While the reader waits for space nothing else is read, including the replies to requests, so keep taking packets
+    from packets_received while waiting on a request.
+
+    Set capture to a CaptureWriter to record the raw bytes sent and received, each connection is recorded separately.
+
+    Pass a Metrics to count traffic, reader errors, queue depth and request round trip times.
+    transport chooses between a StreamReader read loop and a PacketProtocol, see ClientTransport.
+    The protocol avoids waking a task and allocating for every chunk received, which adds up over many connections.
+
+    Pass a PacketTrace to keep the last packets received and sent, decoded, to dump when something goes wrong.
+
     When a DISCONNECTED message is received, call connect to reconnect.
     """
 
-    _encoder = PacketEncoder()
-    _packet_reader = PacketReader()
-
     ip: str
-    packets_received: asyncio.Queue[Airtouch5ConnectionStateChange | DataPacket]
+    port: int
+    packets_received: PacketQueue
+    capture: CaptureWriter | None
+    metrics: Metrics | None
+    trace: PacketTrace | None
+    transport: ClientTransport
+
+    _encoder: PacketEncoder
+    _packet_reader: PacketReader
 
     _reader: asyncio.StreamReader | None
-    _writer: asyncio.StreamWriter | None
+    _writer: asyncio.StreamWriter | PacketProtocol | None
+    # The STREAM read loop, or with PROTOCOL the task putting _blocked packets in the queue
+    _reader_task: asyncio.Task[None] | None
+    _protocol: PacketProtocol | None
+    # With PROTOCOL, packets waiting for room in the queue while reading is paused
+    _blocked: deque[DataPacket]
+    # With PROTOCOL, the task disconnecting after the connection was lost
+    _lost_task: asyncio.Task[None] | None
 
     _disconnect_lock: asyncio.Lock
+    # Number of the current connection in capture
+    _capture_connection: int
 
-    def __init__(self, ip: str):
+    # message_id -> (expected reply data type, future for the reply), in the order the requests were sent
+    _pending_requests: dict[int, tuple[type[Data], asyncio.Future[DataPacket]]]
+
+    def __init__(
+        self,
+        ip: str,
+        port: int = 9005,
+        max_queue_size: int = 0,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        capture: CaptureWriter | None = None,
+        metrics: Metrics | None = None,
+        trace: PacketTrace | None = None,
+        transport: ClientTransport = ClientTransport.STREAM,
+    ):
         self.ip = ip
-        self.packets_received = asyncio.Queue()
+        self.port = port
+        self.packets_received = PacketQueue(max_queue_size, overflow_policy)
+        self.capture = capture
+        self._capture_connection = 0
         self.data_packet_factory = DataPacketFactory()
+        self._encoder = PacketEncoder()
+        self._packet_reader = PacketReader()
 
         self._connected = False
         self._should_be_connected = False
         self._writer, self._reader = None, None
+        self._reader_task = None
+        self.transport = transport
+        self._protocol = None
+        self._blocked = deque()
+        self._lost_task = None
         self._disconnect_lock = asyncio.Lock()
+        self._pending_requests = {}
+
+        self.trace = trace
+        self.metrics = metrics
+        if metrics is not None:
+            self._register_gauges(metrics)
 
     async def connect(self):
         """
@@ -65,15 +166,35 @@ class Airtouch5Client:
         # Clear the queue before we connect (Might be dangling stuff in it from a previous connection)
         while not self.packets_received.empty():
             self.packets_received.get_nowait()
+        # Same for any partial packet left over from the previous socket
+        self._packet_reader.reset()
 
-        _LOGGER.info(f"Connecting to {self.ip}:9005")
-        self._reader, self._writer = await asyncio.wait_for(
-            asyncio.open_connection(self.ip, 9005), 5
-        )
-        _LOGGER.info(f"Connected to {self.ip}:9005")
+        _LOGGER.info(f"Connecting to {self.ip}:{self.port}")
+        if self.transport is ClientTransport.PROTOCOL:
+            _, self._protocol = await asyncio.wait_for(
+                asyncio.get_running_loop().create_connection(
+                    lambda: PacketProtocol(
+                        self._protocol_data_received, self._protocol_lost
+                    ),
+                    self.ip,
+                    self.port,
+                ),
+                5,
+            )
+            self._writer = self._protocol
+        else:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip, self.port), 5
+            )
+        _LOGGER.info(f"Connected to {self.ip}:{self.port}")
+        if self.capture is not None:
+            self._capture_connection = self.capture.new_connection()
 
         self.packets_received.put_nowait(Airtouch5ConnectionStateChange.CONNECTED)
-        self._reader_task = asyncio.create_task(self._read_packets())
+        if self._protocol is not None:
+            self._protocol.resume_reading()
+        else:
+            self._reader_task = asyncio.create_task(self._read_packets())
 
     async def disconnect(self):
         """
@@ -82,25 +203,51 @@ class Airtouch5Client:
         Pushes a DISCONNECTED message in to the queue if we actually disconnected (were connected before)
         """
         async with self._disconnect_lock:
-            did_disconnect = False
-            if self._writer is not None:
-                did_disconnect = True
-                self._writer.close()
-                try:
-                    await self._writer.wait_closed()
-                except Exception:
-                    # Ignore exceptions when closing
-                    _LOGGER.debug("Exception when closing writer", exc_info=True)
-
-            if self._reader_task is not None:
-                self._reader_task.cancel()
-                self._reader_task = None
-
-            self._writer, self._reader = None, None
-            if did_disconnect:
-                self.packets_received.put_nowait(
-                    Airtouch5ConnectionStateChange.DISCONNECTED
-                )
+            await self._disconnect_locked()
+
+    async def _disconnect_locked(self):
+        did_disconnect = False
+        if self._writer is not None:
+            did_disconnect = True
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                # Ignore exceptions when closing
+                _LOGGER.debug("Exception when closing writer", exc_info=True)
+
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+        self._writer, self._reader, self._protocol = None, None, None
+        self._blocked.clear()
+        self._fail_pending_requests()
+        if did_disconnect:
+            self.packets_received.put_nowait(
+                Airtouch5ConnectionStateChange.DISCONNECTED
+            )
+
+    def _data_received(self, data: bytes | memoryview) -> list[DataPacket]:
+        """
+        Frame the packets in a chunk read from the socket, resolving the requests they reply to.
+        """
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Received data: %s", data.hex())
+        if self.capture is not None and data:
+            self.capture.record(
+                self._capture_connection, CaptureDirection.RECEIVED, data
+            )
+        packets = self._packet_reader.read(data)
+        if self.metrics is not None:
+            self.metrics.bytes_received += len(data)
+            self.metrics.packets_received += len(packets)
+        trace = self.trace
+        for packet in packets:
+            if trace is not None:
+                trace.record(CaptureDirection.RECEIVED, packet)
+            self._resolve_request(packet)
+        return packets
 
     async def _read_packets(self):
         """
@@ -110,14 +257,17 @@ class Airtouch5Client:
         reader = self._reader
         if reader is None:
             raise Exception("Reader is None")
+        queue = self.packets_received
 
         try:
             while reader.at_eof() == False:
                 read = await reader.read(1024)
-                _LOGGER.debug(f"Received data: {binascii.hexlify(read)}")
-                packets = self._packet_reader.read(read)
-                for packet in packets:
-                    self.packets_received.put_nowait(packet)
+                for packet in self._data_received(read):
+                    try:
+                        queue.put_nowait(packet)
+                    except asyncio.QueueFull:
+                        # Stop reading until the consumer catches up
+                        await queue.put(packet)
         except Exception as e:
             _LOGGER.error(f"Exception in reader task: {e}")
 
@@ -126,21 +276,219 @@ class Airtouch5Client:
         self._reader_task = None
         await self.disconnect()
 
+    def _protocol_data_received(self, data: memoryview):
+        """
+        Called by the PacketProtocol from the event loop with each chunk received.
+        """
+        packets = self._data_received(data)
+        blocked = self._blocked
+        if blocked:
+            # Still waiting for room for earlier packets, these go after them
+            blocked.extend(packets)
+            return
+
+        queue = self.packets_received
+        for index, packet in enumerate(packets):
+            try:
+                queue.put_nowait(packet)
+            except asyncio.QueueFull:
+                # Stop reading until the consumer catches up
+                blocked.extend(packets[index:])
+                if self._protocol is not None:
+                    self._protocol.pause_reading()
+                self._reader_task = asyncio.create_task(self._put_blocked())
+                return
+
+    async def _put_blocked(self):
+        """
+        Put the blocked packets in the queue as room is made, then start reading again.
+        """
+        blocked, queue = self._blocked, self.packets_received
+        while blocked:
+            await queue.put(blocked[0])
+            blocked.popleft()
+        self._reader_task = None
+        if self._protocol is not None:
+            self._protocol.resume_reading()
+
+    def _protocol_lost(self, protocol: PacketProtocol, exc: Exception | None):
+        """
+        Called by the PacketProtocol when the connection is lost, including when we closed it.
+        """
+        if protocol is not self._protocol:
+            return
+        if exc is not None:
+            _LOGGER.error(f"Exception in reader: {exc}")
+        self._lost_task = asyncio.create_task(self._disconnect_lost(protocol))
+
+    async def _disconnect_lost(self, protocol: PacketProtocol):
+        # Like the stream reader, hand over the packets received before the connection was lost first
+        if self._reader_task is not None:
+            await asyncio.wait([self._reader_task])
+        async with self._disconnect_lock:
+            if self._protocol is protocol:
+                await self._disconnect_locked()
+
     async def send_packet(self, packet: DataPacket):
         """
         Send the given packet to the airtouch 5.
         Throws if we aren't connected or if there is a connection issue
         """
+        await self.send_packets([packet])
+
+    async def send_packets(self, packets: list[DataPacket]):
+        """
+        Send the given packets to the airtouch 5 in a single write.
+        Throws if we aren't connected or if there is a connection issue
+        """
         writer = self._writer
         if writer is None:
             raise Exception("Writer is None")
 
         try:
-            data = self._encoder.encode(packet)
-            _LOGGER.debug(f"Sending data: {binascii.hexlify(data)}")
+            encoder = self._encoder
+            data = bytearray(sum(encoder.encoded_length(p) for p in packets))
+            offset = 0
+            for packet in packets:
+                offset += encoder.encode_into(packet, data, offset)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Sending data: %s", data.hex())
+            if self.capture is not None:
+                self.capture.record(
+                    self._capture_connection, CaptureDirection.SENT, data
+                )
+            if self.trace is not None:
+                for packet in packets:
+                    self.trace.record(CaptureDirection.SENT, packet)
             writer.write(data)
+            if self.metrics is not None:
+                self.metrics.bytes_sent += len(data)
+                self.metrics.packets_sent += len(packets)
             await writer.drain()
         except Exception as e:
             _LOGGER.error(f"Exception when sending packet: {e}")
             await self.disconnect()
             raise e
+
+    async def request(self, packet: DataPacket) -> asyncio.Future[DataPacket]:
+        """
+        Send the given packet to the airtouch 5 and return a future for the reply.
+        The reply is matched by message id, or failing that by the oldest request waiting for that type of reply.
+        The future fails if we disconnect before the reply arrives, it does not time out by itself.
+        Throws like send_packet if the packet can't be sent.
+        """
+        return (await self.request_many([packet]))[0]
+
+    async def request_many(
+        self, packets: list[DataPacket]
+    ) -> list[asyncio.Future[DataPacket]]:
+        """
+        Send all the given packets in a single write, returning a future for the reply to each, see request.
+        """
+        response_types = []
+        for packet in packets:
+            response_type = _RESPONSE_TYPES.get(type(packet.data))
+            if response_type is None:
+                raise Exception(
+                    f"No reply expected for {packet.data.__class__.__name__}, use send_packet"
+                )
+            response_types.append(response_type)
+
+        futures = [
+            self._add_pending_request(packet, response_type)
+            for packet, response_type in zip(packets, response_types)
+        ]
+
+        try:
+            await self.send_packets(packets)
+        except Exception:
+            for future in futures:
+                # The caller gets the exception from here, so don't leave it unretrieved on the future as well
+                if future.done() and not future.cancelled():
+                    future.exception()
+                future.cancel()
+            raise
+
+        if self.metrics is not None:
+            self._time_requests(self.metrics, futures)
+        return futures
+
+    def _time_requests(
+        self, metrics: Metrics, futures: list[asyncio.Future[DataPacket]]
+    ):
+        """
+        Record the round trip time of each request that gets a reply.
+        """
+        sent = time.perf_counter()
+
+        def observe(future: asyncio.Future[DataPacket]):
+            if not future.cancelled() and future.exception() is None:
+                metrics.request_seconds.observe(time.perf_counter() - sent)
+
+        for future in futures:
+            future.add_done_callback(observe)
+
+    def _register_gauges(self, metrics: Metrics):
+        """
+        Expose the counters the queue and packet reader already keep as gauges.
+        """
+        queue, reader = self.packets_received, self._packet_reader
+        metrics.gauges["queue_depth"] = queue.qsize
+        metrics.gauges["queue_dropped"] = lambda: queue.dropped
+        metrics.gauges["queue_coalesced"] = lambda: queue.coalesced
+        metrics.gauges['reader_errors{reason="header"}'] = lambda: reader.header_errors
+        metrics.gauges['reader_errors{reason="length"}'] = lambda: reader.length_errors
+        metrics.gauges['reader_errors{reason="crc"}'] = lambda: reader.crc_errors
+        metrics.gauges['reader_errors{reason="decode"}'] = lambda: reader.decode_errors
+
+    def _add_pending_request(
+        self, packet: DataPacket, response_type: type[Data]
+    ) -> asyncio.Future[DataPacket]:
+        """
+        Add a request to the pending table, returning the future that will receive its reply.
+        """
+        future: asyncio.Future[DataPacket] = asyncio.get_running_loop().create_future()
+        previous = self._pending_requests.pop(packet.message_id, None)
+        if previous is not None and not previous[1].done():
+            previous[1].set_exception(
+                Exception(f"Message id {packet.message_id} was reused")
+            )
+        self._pending_requests[packet.message_id] = (response_type, future)
+        future.add_done_callback(lambda f: self._forget_request(packet.message_id, f))
+        return future
+
+    def _forget_request(self, message_id: int, future: asyncio.Future[DataPacket]):
+        """
+        Remove a finished (or timed out and cancelled) request from the pending table.
+        """
+        pending = self._pending_requests.get(message_id)
+        if pending is not None and pending[1] is future:
+            del self._pending_requests[message_id]
+
+    def _resolve_request(self, packet: DataPacket):
+        """
+        If the packet is a reply to a pending request, complete the request's future with it.
+        """
+        message_id = packet.message_id
+        pending = self._pending_requests.get(message_id)
+        if pending is None or not isinstance(packet.data, pending[0]):
+            # Fall back to the oldest request waiting for this type of reply
+            for message_id, pending in self._pending_requests.items():
+                if isinstance(packet.data, pending[0]):
+                    break
+            else:
+                return
+
+        del self._pending_requests[message_id]
+        if not pending[1].done():
+            pending[1].set_result(packet)
+
+    def _fail_pending_requests(self):
+        """
+        Fail every pending request, their replies will never arrive on this connection.
+        """
+        pending_requests = self._pending_requests
+        self._pending_requests = {}
+        for _, future in pending_requests.values():
+            if not future.done():
+                future.set_exception(Exception("Disconnected before reply arrived"))
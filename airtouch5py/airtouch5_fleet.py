@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Callable
+
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange, ClientTransport
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.discovery import AirtouchDevice
+from airtouch5py.metadata_cache import MetadataCache
+from airtouch5py.scheduling import Backoff, TimerWheel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Airtouch5Fleet:
+    """
+    Keeps many Airtouch5 consoles connected from one event loop.
+
+    The clients share a TimerWheel for their keep alive checks (one loop timer instead of one per console),
+    a jittered Backoff so they don't all reconnect at the same moment after a network outage,
+    and a semaphore so only max_concurrent_handshakes consoles are connecting and syncing at once.
+    The clients read with a PacketProtocol by default, so there is no reader task per console.
+
+    Usage:
+    Call add() for each console, then start(). Clients that fail to connect are retried in the background.
+    """
+
+    # Keyed by "ip:port"
+    clients: dict[str, Airtouch5SimpleClient]
+    # Key of each client that is currently connected
+    connected: set[str]
+    backoff: Backoff
+    timers: TimerWheel
+    pipelined: bool
+    metadata_cache: MetadataCache | None
+    transport: ClientTransport
+
+    # Called with the client and its state change
+    connection_state_callbacks: list[
+        Callable[[Airtouch5SimpleClient, Airtouch5ConnectionStateChange], None]
+    ]
+
+    _handshake_semaphore: asyncio.Semaphore
+    _start_tasks: dict[str, asyncio.Task[None]]
+    _started: bool
+
+    def __init__(
+        self,
+        max_concurrent_handshakes: int = 4,
+        backoff: Backoff | None = None,
+        timers: TimerWheel | None = None,
+        pipelined: bool = True,
+        metadata_cache: MetadataCache | None = None,
+        transport: ClientTransport = ClientTransport.PROTOCOL,
+    ):
+        self.clients = {}
+        self.connected = set()
+        self.backoff = Backoff() if backoff is None else backoff
+        self.timers = TimerWheel() if timers is None else timers
+        self.pipelined = pipelined
+        self.metadata_cache = metadata_cache
+        self.transport = transport
+        self.connection_state_callbacks = []
+        self._handshake_semaphore = asyncio.Semaphore(max_concurrent_handshakes)
+        self._start_tasks = {}
+        self._started = False
+
+    def add(self, ip_or_device, port: int = 9005) -> Airtouch5SimpleClient:
+        """
+        Add a console, it is connected straight away if the fleet has been started.
+        """
+        client = Airtouch5SimpleClient(
+            ip_or_device,
+            port,
+            self.metadata_cache,
+            backoff=self.backoff,
+            timers=self.timers,
+            handshake_semaphore=self._handshake_semaphore,
+            transport=self.transport,
+        )
+        key = f"{client.ip}:{port}"
+        if key in self.clients:
+            raise ValueError(f"{key} is already in the fleet")
+
+        client.connection_state_callbacks.append(
+            lambda state: self._on_connection_state(key, client, state)
+        )
+        self.clients[key] = client
+        if self._started:
+            self._start_client(key, client)
+        return client
+
+    async def remove(
+        self, ip_or_device: str | AirtouchDevice, port: int = 9005
+    ) -> None:
+        """
+        Disconnect a console and forget about it.
+        """
+        ip = (
+            ip_or_device.ip
+            if isinstance(ip_or_device, AirtouchDevice)
+            else ip_or_device
+        )
+        key = f"{ip}:{port}"
+        client = self.clients.pop(key)
+        await self._stop_client(key, client)
+
+    def start(self) -> None:
+        """
+        Start connecting to every console, returns straight away.
+        """
+        self._started = True
+        for key, client in self.clients.items():
+            self._start_client(key, client)
+
+    async def stop(self) -> None:
+        """
+        Disconnect from every console, and stop reconnecting.
+        """
+        self._started = False
+        await asyncio.gather(
+            *(self._stop_client(key, client) for key, client in self.clients.items())
+        )
+
+    def summary(self) -> dict[str, int]:
+        """
+        How many consoles are connected, and how many are still connecting or reconnecting.
+        """
+        return {
+            "total": len(self.clients),
+            "connected": len(self.connected),
+            "disconnected": len(self.clients) - len(self.connected),
+        }
+
+    def _start_client(self, key: str, client: Airtouch5SimpleClient) -> None:
+        task = self._start_tasks.get(key)
+        if task is None or task.done():
+            self._start_tasks[key] = asyncio.create_task(
+                self._connect_with_retry(client)
+            )
+
+    async def _connect_with_retry(self, client: Airtouch5SimpleClient) -> None:
+        """
+        Make the initial connection, once connected the client reconnects by itself.
+        """
+        attempt = 0
+        while True:
+            try:
+                await client.connect_and_stay_connected(self.pipelined)
+                return
+            except Exception as e:
+                # connect_and_stay_connected has closed the connection
+                delay = self.backoff.delay(attempt)
+                attempt += 1
+                _LOGGER.warning(
+                    f"Failed to connect to {client.ip}: {e}, will retry in {delay:.1f} seconds"
+                )
+                await asyncio.sleep(delay)
+
+    async def _stop_client(self, key: str, client: Airtouch5SimpleClient) -> None:
+        task = self._start_tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await client.disconnect()
+        self.connected.discard(key)
+
+    def _on_connection_state(
+        self,
+        key: str,
+        client: Airtouch5SimpleClient,
+        state: Airtouch5ConnectionStateChange,
+    ) -> None:
+        if state is Airtouch5ConnectionStateChange.CONNECTED:
+            self.connected.add(key)
+        else:
+            self.connected.discard(key)
+        [cb(client, state) for cb in self.connection_state_callbacks]
@@ -1,20 +1,58 @@
 import asyncio
 import logging
-from typing import Callable, TypeVar
-
-from airtouch5py.airtouch5_client import Airtouch5Client, Airtouch5ConnectionStateChange
+from collections import deque
+from typing import Any, Callable, Iterable, Protocol, TypeVar
+
+from airtouch5py.airtouch5_client import (
+    Airtouch5Client,
+    Airtouch5ConnectionStateChange,
+    ClientTransport,
+)
+from airtouch5py.callback_dispatcher import CallbackDispatcher, DEFAULT_MAX_PENDING
+from airtouch5py.command_scheduler import CommandScheduler
 from airtouch5py.data_packet_factory import DataPacketFactory
 from airtouch5py.discovery import AirtouchDevice
+from airtouch5py.metadata_cache import (
+    ConsoleMetadata,
+    metadata_cache_key,
+    MetadataCache,
+)
+from airtouch5py.metrics import Metrics
+from airtouch5py.packet_queue import OverflowPolicy
 from airtouch5py.packets.ac_ability import AcAbility, AcAbilityData
+from airtouch5py.packets.ac_control import AcControl
 from airtouch5py.packets.ac_status import AcStatus, AcStatusData
 from airtouch5py.packets.console_version import ConsoleVersionData
 from airtouch5py.packets.datapacket import Data, DataPacket
+from airtouch5py.packets.zone_control import ZoneControlZone
 from airtouch5py.packets.zone_name import ZoneName, ZoneNameData
 from airtouch5py.packets.zone_status import ZoneStatusData, ZoneStatusZone
+from airtouch5py.scheduling import Backoff, FIXED_BACKOFF
+from airtouch5py.state_events import StateEventStream
+from airtouch5py.state_store import StateStore
+from airtouch5py.trace import PacketTrace
 
 _LOGGER = logging.getLogger(__name__)
 T = TypeVar("T")
 
+# AirTouch5 doesn't send any packets if nothing is changing.
+# So after this many seconds without a packet we send one to test if the connection is alive
+KEEP_ALIVE_INTERVAL = 4 * 60
+# and reconnect if nothing arrives this many seconds after that
+KEEP_ALIVE_TIMEOUT = 1 * 60
+# Seconds optimistic changes are shown for if the console doesn't confirm them
+OPTIMISTIC_TIMEOUT = 5
+
+
+class TimerScheduler(Protocol):
+    """
+    Something timers can be scheduled on, the event loop or a TimerWheel.
+    """
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> Any: ...
+
 
 class Airtouch5SimpleClient:
     """
@@ -24,11 +62,35 @@ class Airtouch5SimpleClient:
     Call connect_and_stay_connected().
     Add listeners to *_callbacks
     The Airtouch5 will automatically send out updates to zone status and ac status as they happen.
+    For only the fields that changed, use state.subscribe(...) or async for over events(...)
+    instead of zone_status_callbacks / ac_status_callbacks.
+    Send zone and AC control commands with zone_control / ac_control to have bursts merged and rate limited,
+    and to see their expected effect in optimistic_zone_status / optimistic_ac_status (and state.subscribe) straight away.
+
+    If a metadata_cache is given and the client was created from an AirtouchDevice, the AC abilities,
+    zone names and console version are loaded from the cache on connect and checked against the console in the background.
+
+    backoff controls the delay between reconnect attempts (5 seconds by default), timers is where the keep alive
+    checks are scheduled (the event loop by default) and handshake_semaphore limits how many clients connect at once,
+    these are shared by the clients of an Airtouch5Fleet.
+    max_queue_size and overflow_policy bound the received packet queue, and transport chooses how the socket is read,
+    see Airtouch5Client.
+    Callbacks, state subscribers and events streams are isolated from each other and from the connection,
+    and callbacks and state subscribers can be async or run on an executor, see CallbackDispatcher and Subscriber.
+
+    Pass a PacketTrace to keep the last packets received and sent, see Airtouch5Client.
+    Pass a Metrics to collect the Airtouch5Client metrics plus reconnects and the time spent in callbacks.
     """
 
     ip: str
     device: AirtouchDevice | None
     data_packet_factory: DataPacketFactory
+    commands: CommandScheduler
+    # Calls the *_callbacks, see CallbackDispatcher
+    dispatcher: CallbackDispatcher
+    metadata_cache: MetadataCache | None
+    backoff: Backoff
+    metrics: Metrics | None
 
     # Populated after connect_and_stay_connected
     ac: list[AcAbility]
@@ -36,10 +98,8 @@ class Airtouch5SimpleClient:
     zones: list[ZoneName]
     # Populated after connect_and_stay_connected
     console_version: str
-    # Populated after connect_and_stay_connected
-    latest_ac_status: dict[int, AcStatus]
-    # Populated after connect_and_stay_connected
-    latest_zone_status: dict[int, ZoneStatusZone]
+    # Latest zone and ac status, subscribe to it for per zone / per AC field changes
+    state: StateStore
 
     connection_state_callbacks: list[Callable[[Airtouch5ConnectionStateChange], None]]
     data_packet_callbacks: list[Callable[[DataPacket], None]]
@@ -48,8 +108,32 @@ class Airtouch5SimpleClient:
 
     _client: Airtouch5Client
     _connection_task: asyncio.Task[None] | None
-
-    def __init__(self, ip_or_device):
+    _metadata_task: asyncio.Task[None] | None
+    # Set by disconnect so _maintain_connection stops instead of reconnecting
+    _stopping: bool
+    _timers: TimerScheduler | None
+    _handshake_semaphore: asyncio.Semaphore | None
+    # Keep alive state, checked by a timer instead of timing out every read
+    _last_received: float
+    _keep_alive_sent_at: float | None
+    _keep_alive_timer: Any
+    # Tasks started from timers, kept so they aren't garbage collected
+    _background_tasks: set[asyncio.Task[None]]
+
+    def __init__(
+        self,
+        ip_or_device,
+        port: int = 9005,
+        metadata_cache: MetadataCache | None = None,
+        backoff: Backoff | None = None,
+        timers: TimerScheduler | None = None,
+        handshake_semaphore: asyncio.Semaphore | None = None,
+        max_queue_size: int = 0,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        metrics: Metrics | None = None,
+        trace: PacketTrace | None = None,
+        transport: ClientTransport = ClientTransport.STREAM,
+    ):
 
         if isinstance(ip_or_device, AirtouchDevice):
             self.device = ip_or_device
@@ -63,12 +147,35 @@ class Airtouch5SimpleClient:
             raise TypeError(
                 f"Expected str or AirtouchDevice, got {type(ip_or_device).__name__}"
             )
-        self._client = Airtouch5Client(self.ip)
+        self.metrics = metrics
+        self._client = Airtouch5Client(
+            self.ip,
+            port,
+            max_queue_size,
+            overflow_policy,
+            metrics=metrics,
+            trace=trace,
+            transport=transport,
+        )
         self.data_packet_factory = DataPacketFactory()
+        self.commands = CommandScheduler(self.send_packet, self.data_packet_factory)
+        self.dispatcher = CallbackDispatcher(metrics)
+        self.metadata_cache = metadata_cache
+        self._connection_task = None
+        self._metadata_task = None
+        self._stopping = False
+        self.backoff = FIXED_BACKOFF if backoff is None else backoff
+        self._timers = timers
+        self._handshake_semaphore = handshake_semaphore
+        self._last_received = 0.0
+        self._keep_alive_sent_at = None
+        self._keep_alive_timer = None
+        self._background_tasks = set()
 
         self.ac = []
         self.zones = []
         self.console_version = ""
+        self.state = StateStore(self.dispatcher)
 
         self.connection_state_callbacks = []
         self.data_packet_callbacks = []
@@ -83,160 +190,419 @@ class Airtouch5SimpleClient:
         await self._client.connect()
 
         try:
-            # Send a console version request to verify this is an Airtouch 5 console
-            await self._client.send_packet(
-                self.data_packet_factory.console_version_request()
-            )
-
-            # Wait for the response
-            start_wait = asyncio.get_running_loop().time()
-            got_response = False
-            while (
-                asyncio.get_running_loop().time() - start_wait < 5 and not got_response
-            ):
-                packet = await asyncio.wait_for(self._client.packets_received.get(), 5)
-                if isinstance(packet, DataPacket) and isinstance(
-                    packet.data, ConsoleVersionData
-                ):
-                    got_response = True
-                    break
-
-            if not got_response:
+            # Send a console version request to verify this is an Airtouch 5 console, and wait for the response
+            try:
+                await self._request_or_throw(
+                    self.data_packet_factory.console_version_request(),
+                    ConsoleVersionData,
+                )
+            except asyncio.TimeoutError:
                 raise Exception("Didn't receive a console version response")
         finally:
             await self._client.disconnect()
 
-    async def connect_and_stay_connected(self) -> None:
+    async def connect_and_stay_connected(self, pipelined: bool = False) -> None:
         """
         Connect, and reconnect if we disconnect.
         Gets the AC ability and zone names, initial zone status and ac status, and then waits for updates.
-        Throws if we fail to make the initial connection.
+        If pipelined is true these requests are all sent at once instead of waiting for each reply before sending the next.
+        Throws if we fail to make the initial connection, leaving nothing connected, so it can just be called again.
+
+        Nothing received during the initial sync is thrown away: once this returns, the callbacks are called for
+        the CONNECTED state change, for the replies to the initial requests (so zone_status_callbacks and
+        ac_status_callbacks receive the initial status) and for any updates the console pushed in the meantime.
+        """
+        self._stopping = False
+        if self._handshake_semaphore is None:
+            received = await self._connect_and_sync(pipelined)
+        else:
+            async with self._handshake_semaphore:
+                received = await self._connect_and_sync(pipelined)
+
+        # Start up the connection/reader task
+        self._connection_task = asyncio.create_task(self._maintain_connection(received))
+        self._start_keep_alive()
+
+    async def _connect_and_sync(self, pipelined: bool) -> list[Any]:
+        """
+        Connect and run the initial sync, returning what was received in the meantime for _maintain_connection.
+        The queue is emptied as things arrive, otherwise a small queue that blocks when full would stop the reader
+        before the replies the sync is waiting for are read.
         """
         await self._client.connect()
+        received: list[Any] = []
+        holder = asyncio.create_task(self._hold_received(received))
+        try:
+            await self._initial_sync(pipelined)
+        except BaseException:
+            # Don't leave a half open connection behind
+            await self._client.disconnect()
+            raise
+        finally:
+            holder.cancel()
+            await asyncio.gather(holder, return_exceptions=True)
+        return received
 
-        # Get the ac abilities
-        await self._client.send_packet(self.data_packet_factory.ac_ability_request())
-        self.ac = (await self._wait_for_packet_or_throw(AcAbilityData)).ac_ability
+    async def _hold_received(self, received: list[Any]) -> None:
+        queue = self._client.packets_received
+        while True:
+            received.append(await queue.get())
 
-        # Get the zone names
-        await self._client.send_packet(self.data_packet_factory.zone_name_request())
-        self.zones = (await self._wait_for_packet_or_throw(ZoneNameData)).zone_names
+    async def _reconnect(self) -> None:
+        """
+        Connect again, waiting for a handshake slot if we share one.
+        """
+        if self._handshake_semaphore is None:
+            await self._client.connect()
+        else:
+            async with self._handshake_semaphore:
+                await self._client.connect()
 
-        # Get the version
-        await self._client.send_packet(
-            self.data_packet_factory.console_version_request()
-        )
-        self.console_version = (
-            await self._wait_for_packet_or_throw(ConsoleVersionData)
-        ).version
-
-        # Get the initial zone status
-        await self._client.send_packet(self.data_packet_factory.zone_status_request())
-        self.latest_zone_status = {
-            zone.zone_number: zone
-            for zone in (await self._wait_for_packet_or_throw(ZoneStatusData)).zones
-        }
-
-        # Get the initial ac status
-        await self._client.send_packet(self.data_packet_factory.ac_status_request())
-        self.latest_ac_status = {
-            ac.ac_number: ac
-            for ac in (await self._wait_for_packet_or_throw(AcStatusData)).ac_status
-        }
+    async def _initial_sync(self, pipelined: bool) -> None:
+        """
+        Get the ac abilities, zone names, version, initial zone status and initial ac status.
+        The ac abilities, zone names and version come from the metadata cache if they are in it.
+        """
+        metadata = None
+        if self.metadata_cache is not None and self.device is not None:
+            metadata = await asyncio.to_thread(
+                self.metadata_cache.get, metadata_cache_key(self.device)
+            )
 
-        # Start up the connection/reader task
-        self._connection_task = asyncio.create_task(self._maintain_connection())
+        if metadata is not None:
+            self.ac = metadata.ac
+            self.zones = metadata.zones
+            self.console_version = metadata.console_version
+
+            zone_status, ac_status = await self._request_sequence(
+                [
+                    self.data_packet_factory.zone_status_request(),
+                    self.data_packet_factory.ac_status_request(),
+                ],
+                [ZoneStatusData, AcStatusData],
+                pipelined,
+            )
+            self._start_metadata_refresh()
+        else:
+            ac_ability, zone_names, console_version, zone_status, ac_status = (
+                await self._request_sequence(
+                    [
+                        self.data_packet_factory.ac_ability_request(),
+                        self.data_packet_factory.zone_name_request(),
+                        self.data_packet_factory.console_version_request(),
+                        self.data_packet_factory.zone_status_request(),
+                        self.data_packet_factory.ac_status_request(),
+                    ],
+                    [
+                        AcAbilityData,
+                        ZoneNameData,
+                        ConsoleVersionData,
+                        ZoneStatusData,
+                        AcStatusData,
+                    ],
+                    pipelined,
+                )
+            )
+            self.ac = ac_ability.ac_ability
+            self.zones = zone_names.zone_names
+            self.console_version = console_version.version
+            await self._store_metadata()
+
+        self.state.update_zones(zone_status.zones)
+        self.state.update_acs(ac_status.ac_status)
 
-    async def _wait_for_packet_or_throw(self, packet_type: type[T]) -> T:
+    @property
+    def latest_zone_status(self) -> dict[int, ZoneStatusZone]:
         """
-        Wait 5 seconds for a packet of the given type, or throw if we disconnect or timeout.
+        Latest status of each zone, populated after connect_and_stay_connected
         """
+        return self.state.zone_status
 
-        async def _read_packets_until_match() -> T:
-            while True:
-                packet = await self._client.packets_received.get()
-                if packet is Airtouch5ConnectionStateChange.DISCONNECTED:
-                    raise Exception(f"Disconnected while waiting for a {packet_type}")
-                if isinstance(packet, DataPacket) and isinstance(
-                    packet.data, packet_type
-                ):
-                    return packet.data
+    @property
+    def latest_ac_status(self) -> dict[int, AcStatus]:
+        """
+        Latest status of each ac, populated after connect_and_stay_connected
+        """
+        return self.state.ac_status
 
-        return await asyncio.wait_for(_read_packets_until_match(), 5)
+    @property
+    def optimistic_zone_status(self) -> dict[int, ZoneStatusZone]:
+        """
+        latest_zone_status with the control commands that haven't been confirmed yet applied
+        """
+        return self.state.optimistic_zone_status
 
-    async def _maintain_connection(self) -> None:
+    @property
+    def optimistic_ac_status(self) -> dict[int, AcStatus]:
         """
-        Read messages off the queue, reconnecting if we disconnect.
-        Calls the matching callbacks.
+        latest_ac_status with the control commands that haven't been confirmed yet applied
+        """
+        return self.state.optimistic_ac_status
+
+    def events(
+        self,
+        zones: Iterable[int] | None = None,
+        acs: Iterable[int] | None = None,
+        fields: Iterable[str] | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        latest_only: bool = False,
+    ) -> StateEventStream:
         """
+        Stream the changes to zone and AC status (including optimistic ones), for use with async for:
 
-        # AirTouch5 doesn't send any packets if nothing is changing.
-        # So we periodically send a packet to test if the connection is alive.
-        have_sent_keep_alive_packet = False
+        async with client.events(zones=[0, 1], fields=["temperature"]) as events:
+            async for change in events:
+                ...
 
-        while True:
-            # Wait for a packet, send one after 4 minutes, or timeout after 4+1 minutes
-            packet: DataPacket | Airtouch5ConnectionStateChange
-            try:
-                packet = await asyncio.wait_for(
-                    self._client.packets_received.get(),
-                    1 * 60 if have_sent_keep_alive_packet else 4 * 60,
+        zones / acs / fields limit the stream to those zone numbers, AC numbers and fields, see StateEventStream.
+        """
+        return StateEventStream(
+            self.state, zones, acs, fields, max_pending, latest_only
+        )
+
+    async def zone_control(self, zones: list[ZoneControlZone]) -> None:
+        """
+        Send zone commands through the command scheduler, showing their expected effect straight away.
+        The effect is rolled back if sending fails, or if the console hasn't confirmed it within OPTIMISTIC_TIMEOUT.
+        """
+        rollback = self.state.apply_zone_control(zones)
+        await self._send_optimistic(self.commands.zone_control(zones), rollback)
+
+    async def ac_control(self, acs: list[AcControl]) -> None:
+        """
+        Send AC commands through the command scheduler, showing their expected effect straight away.
+        The effect is rolled back if sending fails, or if the console hasn't confirmed it within OPTIMISTIC_TIMEOUT.
+        """
+        rollback = self.state.apply_ac_control(acs)
+        await self._send_optimistic(self.commands.ac_control(acs), rollback)
+
+    async def _send_optimistic(self, send, rollback: Callable[[], None]) -> None:
+        try:
+            await send
+        except BaseException:
+            rollback()
+            raise
+        timers = self._timers
+        if timers is None:
+            timers = asyncio.get_running_loop()
+        timers.call_later(OPTIMISTIC_TIMEOUT, rollback)
+
+    def _start_metadata_refresh(self) -> None:
+        """
+        Start checking the metadata in the background, unless a check is already running.
+        """
+        if self._metadata_task is None or self._metadata_task.done():
+            self._metadata_task = asyncio.create_task(self._refresh_metadata())
+
+    async def _refresh_metadata(self) -> None:
+        """
+        Check the console version, and get the ac abilities and zone names again if it has changed.
+        """
+        try:
+            console_version = (
+                await self._request_or_throw(
+                    self.data_packet_factory.console_version_request(),
+                    ConsoleVersionData,
                 )
-            except asyncio.TimeoutError:
-                if not have_sent_keep_alive_packet:
-                    # send something to test the connection
-                    try:
-                        await self._client.send_packet(
-                            self.data_packet_factory.console_version_request()
-                        )
-                        have_sent_keep_alive_packet = True
-                    except:
-                        # Ignore, send_packet will disconnect if it fails
-                        _LOGGER.info(
-                            "Failed to send keep alive packet, connection must be dead"
-                        )
-                    continue
-                else:
-                    _LOGGER.error("Timeout waiting for packet, reconnecting")
-                    await self._client.disconnect()
-                    have_sent_keep_alive_packet = False
-                    # disconnect pushes a DISCONNECTED message in to the queue, so we'll reconnect
-                    continue
+            ).version
+            if console_version == self.console_version:
+                return
 
-            _LOGGER.debug(f"maintain Received packet {packet}")
-            have_sent_keep_alive_packet = False
+            _LOGGER.info(
+                f"Console version changed from {self.console_version} to {console_version}, refreshing metadata"
+            )
+            if self.metadata_cache is not None and self.device is not None:
+                await asyncio.to_thread(
+                    self.metadata_cache.invalidate, metadata_cache_key(self.device)
+                )
+
+            ac_ability, zone_names = await self._request_sequence(
+                [
+                    self.data_packet_factory.ac_ability_request(),
+                    self.data_packet_factory.zone_name_request(),
+                ],
+                [AcAbilityData, ZoneNameData],
+                True,
+            )
+            self.ac = ac_ability.ac_ability
+            self.zones = zone_names.zone_names
+            self.console_version = console_version
+            await self._store_metadata()
+        except Exception as e:
+            _LOGGER.warning(f"Failed to refresh console metadata: {e}")
+
+    async def _store_metadata(self) -> None:
+        """
+        Put the current metadata in the metadata cache, if we have one.
+        The cache may block on disk I/O, so it is called from a worker thread.
+        """
+        if self.metadata_cache is None or self.device is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.metadata_cache.set,
+                metadata_cache_key(self.device),
+                ConsoleMetadata(self.ac, self.zones, self.console_version),
+            )
+        except Exception as e:
+            _LOGGER.warning(f"Failed to store console metadata: {e}")
+
+    async def _request_sequence(
+        self, packets: list[DataPacket], packet_types: list[type], pipelined: bool
+    ) -> list:
+        """
+        Send the requests and return their replies, either all at once or waiting for each reply before sending the next.
+        """
+        if pipelined:
+            return await self._request_all_or_throw(packets, packet_types)
+        return [
+            await self._request_or_throw(packet, packet_type)
+            for packet, packet_type in zip(packets, packet_types)
+        ]
+
+    async def _request_or_throw(self, packet: DataPacket, packet_type: type[T]) -> T:
+        """
+        Send the request and wait 5 seconds for its reply, or throw if we disconnect or timeout.
+        Other packets received in the meantime stay in the queue for _maintain_connection.
+        """
+        reply = await self._client.request(packet)
+        data = (await asyncio.wait_for(reply, 5)).data
+        if not isinstance(data, packet_type):
+            raise Exception(f"Expected a {packet_type}, received {type(data)}")
+        return data
+
+    async def _request_all_or_throw(
+        self, packets: list[DataPacket], packet_types: list[type]
+    ) -> list[Data]:
+        """
+        Send all the requests in one write and wait 5 seconds for all their replies, or throw if we disconnect or timeout.
+        """
+        replies = await self._client.request_many(packets)
+        received = await asyncio.wait_for(asyncio.gather(*replies), 5)
+        for packet, packet_type in zip(received, packet_types):
+            if not isinstance(packet.data, packet_type):
+                raise Exception(
+                    f"Expected a {packet_type}, received {type(packet.data)}"
+                )
+        return [packet.data for packet in received]
+
+    async def _maintain_connection(self, received: list[Any]) -> None:
+        """
+        Read messages off the queue (after those already received), reconnecting if we disconnect.
+        Calls the matching callbacks.
+        """
+        held = deque(received)
+        while not self._stopping:
+            if held:
+                packet = held.popleft()
+            else:
+                packet = await self._client.packets_received.get()
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("maintain Received packet %s", packet)
+            self._last_received = asyncio.get_running_loop().time()
 
             if packet is Airtouch5ConnectionStateChange.DISCONNECTED:
-                [cb(packet) for cb in self.connection_state_callbacks]
+                self.dispatcher.dispatch(self.connection_state_callbacks, packet)
                 _LOGGER.warning("Disconnected from Airtouch 5, reconnecting")
-                while True:
+                self._stop_keep_alive()
+                attempt = 0
+                while not self._stopping:
                     try:
-                        await self._client.connect()
+                        await self._reconnect()
+                        if self.metrics is not None:
+                            self.metrics.reconnects += 1
+                        self._start_metadata_refresh()
+                        self._start_keep_alive()
                         break
                     except Exception as e:
+                        delay = self.backoff.delay(attempt)
+                        attempt += 1
                         _LOGGER.error(
-                            f"Failed to reconnect: {e}, will reconnect in 5 seconds"
+                            f"Failed to reconnect: {e}, will reconnect in {delay:.1f} seconds"
                         )
-                        await asyncio.sleep(5)
+                        await asyncio.sleep(delay)
             elif packet is Airtouch5ConnectionStateChange.CONNECTED:
-                [cb(packet) for cb in self.connection_state_callbacks]
+                self.dispatcher.dispatch(self.connection_state_callbacks, packet)
             elif isinstance(packet, DataPacket):
-                [cb(packet) for cb in self.data_packet_callbacks]
+                self.dispatcher.dispatch(self.data_packet_callbacks, packet)
                 if isinstance(packet.data, ZoneStatusData):
-                    # convert the list to a dict, store it and broadcast it
-                    self.latest_zone_status = {
-                        zone.zone_number: zone for zone in packet.data.zones
-                    }
-                    [cb(self.latest_zone_status) for cb in self.zone_status_callbacks]
+                    # merge in to the store (which broadcasts what changed) and broadcast all of it
+                    self.state.update_zones(packet.data.zones)
+                    if self.zone_status_callbacks:
+                        # A copy, async subscribers may get to it after the next update
+                        self.dispatcher.dispatch(
+                            self.zone_status_callbacks, dict(self.latest_zone_status)
+                        )
                 if isinstance(packet.data, AcStatusData):
-                    # convert the list to a dict, store it and broadcast it
-                    self.latest_ac_status = {
-                        ac.ac_number: ac for ac in packet.data.ac_status
-                    }
-                    [cb(self.latest_ac_status) for cb in self.ac_status_callbacks]
+                    # merge in to the store (which broadcasts what changed) and broadcast all of it
+                    self.state.update_acs(packet.data.ac_status)
+                    if self.ac_status_callbacks:
+                        self.dispatcher.dispatch(
+                            self.ac_status_callbacks, dict(self.latest_ac_status)
+                        )
             else:
                 _LOGGER.error(f"Received unknown packet type {packet}")
 
+    def _schedule_keep_alive_check(self, delay: float) -> None:
+        timers = self._timers
+        if timers is None:
+            timers = asyncio.get_running_loop()
+        self._keep_alive_timer = timers.call_later(delay, self._check_keep_alive)
+
+    def _start_keep_alive(self) -> None:
+        self._stop_keep_alive()
+        self._last_received = asyncio.get_running_loop().time()
+        self._keep_alive_sent_at = None
+        self._schedule_keep_alive_check(KEEP_ALIVE_INTERVAL)
+
+    def _stop_keep_alive(self) -> None:
+        if self._keep_alive_timer is not None:
+            self._keep_alive_timer.cancel()
+            self._keep_alive_timer = None
+
+    def _check_keep_alive(self) -> None:
+        """
+        Timer callback. Packets only update _last_received, so a busy connection costs nothing here
+        and the check is just rescheduled for when the connection could next be idle.
+        """
+        self._keep_alive_timer = None
+        if self._stopping:
+            return
+        now = asyncio.get_running_loop().time()
+
+        if self._keep_alive_sent_at is not None:
+            if self._last_received < self._keep_alive_sent_at:
+                _LOGGER.error("Timeout waiting for packet, reconnecting")
+                self._keep_alive_sent_at = None
+                # disconnect pushes a DISCONNECTED message in to the queue, so we'll reconnect
+                self._run_in_background(self._client.disconnect())
+                return
+            self._keep_alive_sent_at = None
+
+        idle = now - self._last_received
+        if idle < KEEP_ALIVE_INTERVAL:
+            self._schedule_keep_alive_check(KEEP_ALIVE_INTERVAL - idle)
+            return
+
+        # send something to test the connection
+        self._keep_alive_sent_at = now
+        self._run_in_background(self._send_keep_alive())
+        self._schedule_keep_alive_check(KEEP_ALIVE_TIMEOUT)
+
+    async def _send_keep_alive(self) -> None:
+        try:
+            await self._client.send_packet(
+                self.data_packet_factory.console_version_request()
+            )
+        except:
+            # Ignore, send_packet will disconnect if it fails
+            _LOGGER.info("Failed to send keep alive packet, connection must be dead")
+
+    def _run_in_background(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def send_packet(self, packet: DataPacket) -> None:
         """
         Send a packet.
@@ -247,6 +613,19 @@ class Airtouch5SimpleClient:
         """
         Disconnect, and stop reconnecting.
         """
-        if self._connection_task is not None:
-            self._connection_task.cancel()
+        self._stopping = True
+        self._stop_keep_alive()
+        tasks = [
+            task
+            for task in (self._connection_task, self._metadata_task)
+            if task is not None
+        ] + list(self._background_tasks)
+        self._connection_task, self._metadata_task = None, None
+        for task in tasks:
+            task.cancel()
+        # The DISCONNECTED message wakes _maintain_connection if the cancel was swallowed, it then sees _stopping
         await self._client.disconnect()
+        # Wait for the tasks to finish so they can't reconnect after we disconnect
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.commands.close()
+        await self.dispatcher.close()
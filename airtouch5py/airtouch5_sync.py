@@ -0,0 +1,250 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, TypeVar
+
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.packets.ac_ability import AcAbility
+from airtouch5py.packets.ac_control import AcControl
+from airtouch5py.packets.ac_status import AcStatus
+from airtouch5py.packets.zone_control import ZoneControlZone
+from airtouch5py.packets.zone_name import ZoneName
+from airtouch5py.packets.zone_status import ZoneStatusZone
+
+_LOGGER = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# Seconds the blocking calls wait by default
+DEFAULT_TIMEOUT = 30
+
+
+class LoopThread:
+    """
+    An asyncio event loop running in a background thread, for calling the async clients from threaded code.
+    Share one between any number of Airtouch5SyncClients, so the loop is only started once.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    _thread: threading.Thread
+
+    def __init__(self, name: str = "airtouch5"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(
+        self, coroutine: Awaitable[T], timeout: float | None = DEFAULT_TIMEOUT
+    ) -> T:
+        """
+        Run the coroutine on the loop, blocking until it finishes. Must not be called from the loop thread.
+        The coroutine is cancelled if it takes longer than timeout.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("LoopThread.run called from its own thread")
+        future = asyncio.run_coroutine_threadsafe(
+            coroutine, self.loop  # type: ignore[arg-type]
+        )
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def call(
+        self, function: Callable[[], T], timeout: float | None = DEFAULT_TIMEOUT
+    ) -> T:
+        """
+        Call function on the loop thread, blocking until it returns.
+        """
+
+        async def call() -> T:
+            return function()
+
+        return self.run(call(), timeout)
+
+    def stop(self) -> None:
+        """
+        Stop the loop and wait for the thread to finish.
+        Disconnect the clients using it first.
+        """
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "LoopThread":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class Airtouch5State:
+    """
+    A copy of a console's state, safe to keep and read from any thread.
+    zone_status and ac_status include control commands that are still waiting to be confirmed.
+    """
+
+    zone_status: dict[int, ZoneStatusZone]
+    ac_status: dict[int, AcStatus]
+    ac: list[AcAbility]
+    zones: list[ZoneName]
+    console_version: str
+
+    def __init__(
+        self,
+        zone_status: dict[int, ZoneStatusZone],
+        ac_status: dict[int, AcStatus],
+        ac: list[AcAbility],
+        zones: list[ZoneName],
+        console_version: str,
+    ):
+        self.zone_status = zone_status
+        self.ac_status = ac_status
+        self.ac = ac
+        self.zones = zones
+        self.console_version = console_version
+
+
+class Airtouch5SyncClient:
+    """
+    A blocking, thread safe Airtouch5SimpleClient for code that doesn't use asyncio.
+
+    The client runs on a LoopThread, pass the same one to every console to run them all on one loop.
+    connect, get_state, set_zone, set_ac and disconnect can be called from any thread (but not from callbacks
+    running on the loop thread).
+
+    The callbacks are called on callback_executor, so a slow callback doesn't hold up the loop.
+    By default that is one thread per client, which keeps the callbacks in order.
+    The status callbacks get a copy of the status, so it can be kept without it changing underneath them.
+
+    The other arguments are passed to Airtouch5SimpleClient.
+    """
+
+    loop_thread: LoopThread
+    callback_executor: concurrent.futures.Executor
+
+    connection_state_callbacks: list[Callable[[Airtouch5ConnectionStateChange], None]]
+    ac_status_callbacks: list[Callable[[dict[int, AcStatus]], None]]
+    zone_status_callbacks: list[Callable[[dict[int, ZoneStatusZone]], None]]
+
+    _client: Airtouch5SimpleClient
+    # Stop the loop thread / executor on close, if we made them
+    _owns_loop_thread: bool
+    _owns_executor: bool
+
+    def __init__(
+        self,
+        ip_or_device,
+        port: int = 9005,
+        loop_thread: LoopThread | None = None,
+        callback_executor: concurrent.futures.Executor | None = None,
+        **kwargs: Any,
+    ):
+        self._owns_loop_thread = loop_thread is None
+        self.loop_thread = LoopThread() if loop_thread is None else loop_thread
+        self._owns_executor = callback_executor is None
+        self.callback_executor = (
+            concurrent.futures.ThreadPoolExecutor(1, "airtouch5-callbacks")
+            if callback_executor is None
+            else callback_executor
+        )
+        self.connection_state_callbacks = []
+        self.ac_status_callbacks = []
+        self.zone_status_callbacks = []
+
+        def create() -> Airtouch5SimpleClient:
+            client = Airtouch5SimpleClient(ip_or_device, port, **kwargs)
+            client.connection_state_callbacks.append(
+                lambda state: self._dispatch(self.connection_state_callbacks, state)
+            )
+            client.ac_status_callbacks.append(
+                lambda status: self._dispatch(self.ac_status_callbacks, dict(status))
+            )
+            client.zone_status_callbacks.append(
+                lambda status: self._dispatch(self.zone_status_callbacks, dict(status))
+            )
+            return client
+
+        self._client = self.loop_thread.call(create)
+
+    def connect(
+        self, pipelined: bool = True, timeout: float | None = DEFAULT_TIMEOUT
+    ) -> None:
+        """
+        Connect and stay connected, see Airtouch5SimpleClient.connect_and_stay_connected.
+        Throws if the initial connection fails.
+        """
+        self.loop_thread.run(
+            self._client.connect_and_stay_connected(pipelined), timeout
+        )
+
+    def get_state(self, timeout: float | None = DEFAULT_TIMEOUT) -> Airtouch5State:
+        """
+        A consistent copy of the console's state.
+        """
+        client = self._client
+
+        def get() -> Airtouch5State:
+            return Airtouch5State(
+                dict(client.optimistic_zone_status),
+                dict(client.optimistic_ac_status),
+                list(client.ac),
+                list(client.zones),
+                client.console_version,
+            )
+
+        return self.loop_thread.call(get, timeout)
+
+    def set_zone(
+        self, zones: list[ZoneControlZone], timeout: float | None = DEFAULT_TIMEOUT
+    ) -> None:
+        """
+        Send zone commands, returning once they are sent, see Airtouch5SimpleClient.zone_control.
+        """
+        self.loop_thread.run(self._client.zone_control(zones), timeout)
+
+    def set_ac(
+        self, acs: list[AcControl], timeout: float | None = DEFAULT_TIMEOUT
+    ) -> None:
+        """
+        Send AC commands, returning once they are sent, see Airtouch5SimpleClient.ac_control.
+        """
+        self.loop_thread.run(self._client.ac_control(acs), timeout)
+
+    def disconnect(self, timeout: float | None = DEFAULT_TIMEOUT) -> None:
+        self.loop_thread.run(self._client.disconnect(), timeout)
+
+    def close(self) -> None:
+        """
+        Disconnect, and stop the loop thread and executor if they were made for this client.
+        """
+        self.disconnect()
+        if self._owns_executor:
+            self.callback_executor.shutdown(wait=True)
+        if self._owns_loop_thread:
+            self.loop_thread.stop()
+
+    def __enter__(self) -> "Airtouch5SyncClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _dispatch(self, callbacks: list[Callable[[T], None]], value: T) -> None:
+        for callback in list(callbacks):
+            self.callback_executor.submit(self._call, callback, value)
+
+    @staticmethod
+    def _call(callback: Callable[[T], None], value: T) -> None:
+        try:
+            callback(value)
+        except Exception:
+            _LOGGER.exception("Exception in callback")
@@ -0,0 +1,266 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Any, Callable
+
+from airtouch5py.metrics import Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# The gauges kept for each subscriber when metrics are enabled
+_SUBSCRIBER_GAUGES = (
+    "callback_calls",
+    "callback_errors",
+    "callback_slow",
+    "callback_dropped",
+    "callback_pending",
+)
+
+# Values waiting for an async or executor callback (or in a StateEventStream) before the oldest are dropped.
+# State subscribers get a value per changed field, so this leaves room for a few full updates.
+DEFAULT_MAX_PENDING = 1000
+# Callbacks taking longer than this many seconds are counted (and logged) as slow
+DEFAULT_SLOW_THRESHOLD = 0.1
+
+
+class Subscriber:
+    """
+    A callback with options for how it is called, add one to a callback list instead of the bare callback:
+    client.zone_status_callbacks.append(Subscriber(save_to_database, executor=pool))
+
+    executor runs a synchronous callback on that executor instead of on the event loop.
+    max_pending is how many values can wait for an async or executor callback, after that the oldest are dropped.
+    name is used in log messages and metrics, it defaults to the callback's qualified name.
+    """
+
+    callback: Callable[[Any], Any]
+    executor: concurrent.futures.Executor | None
+    max_pending: int
+    name: str
+
+    def __init__(
+        self,
+        callback: Callable[[Any], Any],
+        executor: concurrent.futures.Executor | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        name: str | None = None,
+    ):
+        self.callback = callback
+        self.executor = executor
+        self.max_pending = max_pending
+        self.name = _callback_name(callback) if name is None else name
+
+    def __call__(self, value: Any) -> Any:
+        return self.callback(value)
+
+
+class SubscriberStats:
+    calls: int
+    # Calls that raised
+    errors: int
+    # Calls that took longer than the dispatcher's slow_threshold
+    slow: int
+    # Values dropped because max_pending were already waiting
+    dropped: int
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.dropped = 0
+
+
+class _SubscriberState:
+    subscriber: Subscriber
+    stats: SubscriberStats
+    # Called straight away on the event loop, otherwise values wait in pending for _task
+    inline: bool
+    is_async: bool
+    pending: deque[Any]
+    _task: asyncio.Task[None] | None
+
+    def __init__(self, subscriber: Subscriber):
+        self.subscriber = subscriber
+        self.stats = SubscriberStats()
+        self.is_async = _is_async(subscriber.callback)
+        self.inline = not self.is_async and subscriber.executor is None
+        self.pending = deque()
+        self._task = None
+
+
+class CallbackDispatcher:
+    """
+    Calls the subscribers of Airtouch5SimpleClient's callback lists and StateStore subscriptions,
+    so one can't hold up or break the others.
+
+    Plain synchronous callbacks are called straight away on the event loop, as before.
+    async callbacks, and callbacks given an executor with Subscriber, each get a queue of up to max_pending values
+    worked through by their own task, so a slow one only falls behind itself. Values are delivered to each
+    subscriber in order, when one falls too far behind its oldest values are dropped.
+    An exception from a callback is logged and counted, the other callbacks and the connection carry on.
+
+    Each subscriber's calls, errors, slow calls and dropped values are kept in stats,
+    and exposed as gauges (labelled by subscriber name) when metrics are enabled.
+    """
+
+    slow_threshold: float
+    metrics: Metrics | None
+
+    # Keyed by the callback as it appears in the callback list
+    _subscribers: dict[Callable[[Any], Any], _SubscriberState]
+    _names: set[str]
+
+    def __init__(
+        self,
+        metrics: Metrics | None = None,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+    ):
+        self.metrics = metrics
+        self.slow_threshold = slow_threshold
+        self._subscribers = {}
+        self._names = set()
+
+    def stats(self) -> dict[str, SubscriberStats]:
+        """
+        The stats of every subscriber that has been called, by name.
+        """
+        return {
+            state.subscriber.name: state.stats for state in self._subscribers.values()
+        }
+
+    def dispatch(self, callbacks: list[Callable[[Any], Any]], value: Any) -> None:
+        """
+        Deliver value to each of the callbacks.
+        """
+        for callback in callbacks:
+            self.dispatch_to(callback, value)
+
+    def dispatch_to(self, callback: Callable[[Any], Any], value: Any) -> None:
+        """
+        Deliver value to one callback.
+        """
+        state = self._subscribers.get(callback)
+        if state is None:
+            state = self._add(callback)
+        if state.inline:
+            self._call(state, value)
+            return
+
+        pending = state.pending
+        if len(pending) >= state.subscriber.max_pending:
+            pending.popleft()
+            state.stats.dropped += 1
+            if state.stats.dropped == 1:
+                _LOGGER.warning(
+                    "Callback %s is falling behind, dropping its oldest values",
+                    state.subscriber.name,
+                )
+        pending.append(value)
+        if state._task is None or state._task.done():
+            state._task = asyncio.create_task(self._work(state))
+
+    def remove(self, callback: Callable[[Any], Any]) -> None:
+        """
+        Forget a callback that won't be called again, values still waiting for it are dropped.
+        """
+        state = self._subscribers.pop(callback, None)
+        if state is None:
+            return
+        if state._task is not None:
+            state._task.cancel()
+        state.pending.clear()
+        name = state.subscriber.name
+        self._names.discard(name)
+        if self.metrics is not None:
+            label = f'{{subscriber="{name}"}}'
+            for metric in _SUBSCRIBER_GAUGES:
+                self.metrics.gauges.pop(f"{metric}{label}", None)
+
+    async def close(self) -> None:
+        """
+        Stop the callback tasks, values still waiting are dropped.
+        """
+        tasks = [
+            state._task
+            for state in self._subscribers.values()
+            if state._task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for state in self._subscribers.values():
+            state.pending.clear()
+            state._task = None
+
+    def _add(self, callback: Callable[[Any], Any]) -> _SubscriberState:
+        subscriber = (
+            callback if isinstance(callback, Subscriber) else Subscriber(callback)
+        )
+        # Make the name unique, lambdas all have the same one
+        name, count = subscriber.name, 1
+        while name in self._names:
+            count += 1
+            name = f"{subscriber.name}#{count}"
+        self._names.add(name)
+        subscriber.name = name
+
+        state = self._subscribers[callback] = _SubscriberState(subscriber)
+        if self.metrics is not None:
+            stats, label = state.stats, f'{{subscriber="{name}"}}'
+            gauges = self.metrics.gauges
+            gauges[f"callback_calls{label}"] = lambda: stats.calls
+            gauges[f"callback_errors{label}"] = lambda: stats.errors
+            gauges[f"callback_slow{label}"] = lambda: stats.slow
+            gauges[f"callback_dropped{label}"] = lambda: stats.dropped
+            gauges[f"callback_pending{label}"] = lambda: len(state.pending)
+        return state
+
+    def _call(self, state: _SubscriberState, value: Any) -> None:
+        start = time.perf_counter()
+        try:
+            state.subscriber.callback(value)
+        except Exception:
+            state.stats.errors += 1
+            _LOGGER.exception("Exception in callback %s", state.subscriber.name)
+        self._finished(state, time.perf_counter() - start)
+
+    async def _work(self, state: _SubscriberState) -> None:
+        subscriber, pending = state.subscriber, state.pending
+        loop = asyncio.get_running_loop()
+        while pending:
+            value = pending.popleft()
+            start = time.perf_counter()
+            try:
+                if state.is_async:
+                    await subscriber.callback(value)
+                else:
+                    await loop.run_in_executor(
+                        subscriber.executor, subscriber.callback, value
+                    )
+            except Exception:
+                state.stats.errors += 1
+                _LOGGER.exception("Exception in callback %s", subscriber.name)
+            self._finished(state, time.perf_counter() - start)
+
+    def _finished(self, state: _SubscriberState, seconds: float) -> None:
+        state.stats.calls += 1
+        if seconds > self.slow_threshold:
+            state.stats.slow += 1
+            _LOGGER.debug(
+                "Callback %s took %.3f seconds", state.subscriber.name, seconds
+            )
+        if self.metrics is not None:
+            self.metrics.callback_seconds.observe(seconds)
+
+
+def _callback_name(callback: Callable[[Any], Any]) -> str:
+    return getattr(callback, "__qualname__", None) or type(callback).__qualname__
+
+
+def _is_async(callback: Callable[[Any], Any]) -> bool:
+    return inspect.iscoroutinefunction(callback) or inspect.iscoroutinefunction(
+        getattr(callback, "__call__", None)
+    )
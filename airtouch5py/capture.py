@@ -0,0 +1,242 @@
+import asyncio
+import io
+import mmap
+import os
+import struct
+import time
+from array import array
+from enum import Enum
+from typing import AsyncIterator, Iterator
+
+from airtouch5py.packet_reader import PacketReader
+from airtouch5py.packets.datapacket import DataPacket
+
+# A capture file starts with MAGIC, followed by records of:
+# timestamp (seconds since the epoch, double), connection number (uint16), direction (uint8), length (uint32), the bytes
+MAGIC = b"AT5CAP\x00\x01"
+_record_header_struct = struct.Struct(">dHBI")
+
+
+class CaptureDirection(Enum):
+    RECEIVED = 0
+    SENT = 1
+
+
+class CaptureRecord:
+    """
+    One chunk of bytes as it was read from or written to the socket.
+    """
+
+    timestamp: float
+    connection: int
+    direction: CaptureDirection
+    data: bytes
+
+    def __init__(
+        self,
+        timestamp: float,
+        connection: int,
+        direction: CaptureDirection,
+        data: bytes,
+    ):
+        self.timestamp = timestamp
+        self.connection = connection
+        self.direction = direction
+        self.data = data
+
+
+class CaptureWriter:
+    """
+    Appends raw socket chunks to a capture file, give one to Airtouch5Client to record its traffic.
+
+    Writes are buffered so recording doesn't touch the disk for every chunk, call flush or close to be sure
+    everything is on disk. A record cut short by a crash is ignored by CaptureReader, and dropped when
+    the file is appended to again.
+    Several clients can share a writer, each connection gets its own number from new_connection.
+    When appending, the numbers carry on from the highest one already in the file.
+    """
+
+    path: str
+    _file: io.BufferedWriter
+    _connections: int
+
+    def __init__(self, path: str, buffer_size: int = 64 * 1024):
+        self.path = path
+        self._connections = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with CaptureReader(path) as capture:
+                self._connections = max(capture.connections(), default=0)
+                end = capture._end
+            # Anything after the last whole record would hide the records appended after it
+            os.truncate(path, end)
+        self._file = open(path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def new_connection(self) -> int:
+        """
+        Number a new connection, so its records can be told apart from other connections in the same file.
+        """
+        self._connections = (self._connections + 1) % 65536
+        return self._connections
+
+    def record(
+        self,
+        connection: int,
+        direction: CaptureDirection,
+        data: bytes | bytearray | memoryview,
+        timestamp: float | None = None,
+    ) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        self._file.write(
+            _record_header_struct.pack(
+                timestamp, connection, direction.value, len(data)
+            )
+        )
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CaptureReader:
+    """
+    Reads a capture file, the records are indexed on open so they can be accessed by position.
+    The file is memory mapped, so only the records that are accessed are read from disk.
+    """
+
+    path: str
+    # Offset of each record in the file
+    _offsets: array
+    # Offset just after the last whole record
+    _end: int
+    _mmap: mmap.mmap | None
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offsets = array("Q")
+        self._mmap = None
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"{path} is empty")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a capture file")
+
+        offset = len(MAGIC)
+        size = len(self._mmap)
+        header_size = _record_header_struct.size
+        while offset + header_size <= size:
+            length = _record_header_struct.unpack_from(self._mmap, offset)[3]
+            if offset + header_size + length > size:
+                # Cut short while it was being written
+                break
+            self._offsets.append(offset)
+            offset += header_size + length
+        self._end = offset
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> CaptureRecord:
+        assert self._mmap is not None
+        offset = self._offsets[index]
+        timestamp, connection, direction, length = _record_header_struct.unpack_from(
+            self._mmap, offset
+        )
+        start = offset + _record_header_struct.size
+        return CaptureRecord(
+            timestamp,
+            connection,
+            CaptureDirection(direction),
+            self._mmap[start : start + length],
+        )
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def connections(self) -> list[int]:
+        """
+        The connection numbers in the capture, in the order they first appear.
+        """
+        assert self._mmap is not None
+        return list(
+            dict.fromkeys(
+                _record_header_struct.unpack_from(self._mmap, offset)[1]
+                for offset in self._offsets
+            )
+        )
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _records(
+    capture: CaptureReader, direction: CaptureDirection, connection: int | None
+) -> Iterator[CaptureRecord]:
+    for record in capture:
+        if record.direction is direction and (
+            connection is None or record.connection == connection
+        ):
+            yield record
+
+
+def replay(
+    capture: CaptureReader,
+    direction: CaptureDirection = CaptureDirection.RECEIVED,
+    connection: int | None = None,
+) -> Iterator[DataPacket]:
+    """
+    Feed the captured chunks in to a PacketReader as fast as possible, yielding the packets it finds.
+    Each connection gets its own PacketReader, so a packet split over chunks is only joined up within a connection.
+    """
+    readers: dict[int, PacketReader] = {}
+    for record in _records(capture, direction, connection):
+        reader = readers.get(record.connection)
+        if reader is None:
+            reader = readers[record.connection] = PacketReader()
+        yield from reader.read(record.data)
+
+
+async def replay_timed(
+    capture: CaptureReader,
+    speed: float = 1.0,
+    direction: CaptureDirection = CaptureDirection.RECEIVED,
+    connection: int | None = None,
+) -> AsyncIterator[DataPacket]:
+    """
+    Like replay, but waits between chunks for the time that passed between them when they were captured.
+    A speed of 2 replays twice as fast.
+    """
+    loop = asyncio.get_running_loop()
+    readers: dict[int, PacketReader] = {}
+    start_time: float | None = None
+    start_timestamp = 0.0
+    for record in _records(capture, direction, connection):
+        if start_time is None:
+            start_time, start_timestamp = loop.time(), record.timestamp
+        delay = start_time + (record.timestamp - start_timestamp) / speed - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        reader = readers.get(record.connection)
+        if reader is None:
+            reader = readers[record.connection] = PacketReader()
+        for packet in reader.read(record.data):
+            yield packet
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable
+
+from airtouch5py.data_packet_factory import DataPacketFactory
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Settings that change relative to the current state, two of them can't be merged in to one without losing a step
+_RELATIVE_ZONE_VALUES = (
+    ZoneSettingValue.VALUE_DECREASE,
+    ZoneSettingValue.VALUE_INCREASE,
+)
+
+
+def merge_zone_control(
+    old: ZoneControlZone, new: ZoneControlZone
+) -> ZoneControlZone | None:
+    """
+    Merge two commands for the same zone, the newer one wins for each setting it changes.
+    Returns None if they can't be merged because both make a relative change (increase / decrease / toggle).
+    """
+    if new.zone_setting_value is ZoneSettingValue.KEEP_SETTING_VALUE:
+        zone_setting_value, value_to_set = old.zone_setting_value, old.value_to_set
+    elif (
+        new.zone_setting_value in _RELATIVE_ZONE_VALUES
+        and old.zone_setting_value is not ZoneSettingValue.KEEP_SETTING_VALUE
+    ):
+        return None
+    else:
+        zone_setting_value, value_to_set = new.zone_setting_value, new.value_to_set
+
+    if new.power is ZoneSettingPower.KEEP_POWER_STATE:
+        power = old.power
+    elif (
+        new.power is ZoneSettingPower.CHANGE_ON_OFF_STATE
+        and old.power is not ZoneSettingPower.KEEP_POWER_STATE
+    ):
+        return None
+    else:
+        power = new.power
+
+    return ZoneControlZone(old.zone_number, zone_setting_value, power, value_to_set)
+
+
+def merge_ac_control(old: AcControl, new: AcControl) -> AcControl | None:
+    """
+    Merge two commands for the same AC, the newer one wins for each setting it changes.
+    Returns None if they can't be merged because both toggle the power.
+    """
+    if new.power_setting is SetPowerSetting.KEEP_POWER_SETTING:
+        power_setting = old.power_setting
+    elif (
+        new.power_setting is SetPowerSetting.CHANGE_ON_OFF_STATUS
+        and old.power_setting is not SetPowerSetting.KEEP_POWER_SETTING
+    ):
+        return None
+    else:
+        power_setting = new.power_setting
+
+    ac_mode = old.ac_mode if new.ac_mode is SetAcMode.KEEP_AC_MODE else new.ac_mode
+    ac_fan_speed = (
+        old.ac_fan_speed
+        if new.ac_fan_speed is SetAcFanSpeed.KEEP_AC_FAN_SPEED
+        else new.ac_fan_speed
+    )
+    if new.setpoint_control is SetpointControl.CHANGE_SETPOINT:
+        setpoint_control, setpoint = new.setpoint_control, new.setpoint
+    else:
+        setpoint_control, setpoint = old.setpoint_control, old.setpoint
+
+    return AcControl(
+        power_setting, old.ac_number, ac_mode, ac_fan_speed, setpoint_control, setpoint
+    )
+
+
+class _Batch:
+    """
+    Commands that will be sent together, at most one zone control and one ac control packet.
+    """
+
+    created: float
+    zones: dict[int, ZoneControlZone]
+    acs: dict[int, AcControl]
+    # Completes when the batch has been sent
+    sent: asyncio.Future[None]
+
+    def __init__(self, created: float):
+        self.created = created
+        self.zones = {}
+        self.acs = {}
+        self.sent = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting any more (the callers were cancelled), don't warn about an unretrieved exception
+        self.sent.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def add_zone(self, zone: ZoneControlZone) -> bool:
+        old = self.zones.get(zone.zone_number)
+        if old is not None:
+            merged = merge_zone_control(old, zone)
+            if merged is None:
+                return False
+            zone = merged
+        self.zones[zone.zone_number] = zone
+        return True
+
+    def add_ac(self, ac: AcControl) -> bool:
+        old = self.acs.get(ac.ac_number)
+        if old is not None:
+            merged = merge_ac_control(old, ac)
+            if merged is None:
+                return False
+            ac = merged
+        self.acs[ac.ac_number] = ac
+        return True
+
+
+class CommandScheduler:
+    """
+    Sits in front of send_packet, merging zone and AC control commands and limiting how often they are sent.
+
+    Commands are held for window seconds so commands that follow close behind (a slider being dragged,
+    an automation setting several zones) are merged in: commands for different zones / ACs are batched in to one
+    multi record packet, and commands for the same zone / AC are merged with the last write winning for each setting.
+    At most rate packets per second are sent, commands keep merging in while they wait.
+    Relative commands (increase, decrease, toggle) are never merged with each other, the second one waits for
+    the next batch, so no command is lost.
+    """
+
+    window: float
+    # Packets per second
+    rate: float
+
+    _send: Callable[[DataPacket], Awaitable[None]]
+    _factory: DataPacketFactory
+    _batches: deque[_Batch]
+    _task: asyncio.Task[None] | None
+    # Loop time the next packet may be sent at
+    _next_send: float
+
+    def __init__(
+        self,
+        send: Callable[[DataPacket], Awaitable[None]],
+        data_packet_factory: DataPacketFactory,
+        window: float = 0.1,
+        rate: float = 4,
+    ):
+        self.window = window
+        self.rate = rate
+        self._send = send
+        self._factory = data_packet_factory
+        self._batches = deque()
+        self._task = None
+        self._next_send = 0.0
+
+    async def zone_control(self, zones: list[ZoneControlZone]) -> None:
+        """
+        Queue the zone commands, returning once they have been sent.
+        Throws if sending fails.
+        """
+        batch = self._latest_batch()
+        for zone in zones:
+            if not batch.add_zone(zone):
+                batch = self._new_batch()
+                batch.add_zone(zone)
+        await self._wait_sent()
+
+    async def ac_control(self, acs: list[AcControl]) -> None:
+        """
+        Queue the AC commands, returning once they have been sent.
+        Throws if sending fails.
+        """
+        batch = self._latest_batch()
+        for ac in acs:
+            if not batch.add_ac(ac):
+                batch = self._new_batch()
+                batch.add_ac(ac)
+        await self._wait_sent()
+
+    async def close(self) -> None:
+        """
+        Stop sending, commands that haven't been sent fail.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        while self._batches:
+            batch = self._batches.popleft()
+            if not batch.sent.done():
+                batch.sent.set_exception(Exception("Command scheduler closed"))
+
+    async def _wait_sent(self) -> None:
+        # Commands may have been split over several batches, they are all sent once the last one is
+        batch = self._batches[-1]
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        # Don't cancel the batch if one of the callers waiting for it is cancelled
+        await asyncio.shield(batch.sent)
+
+    def _latest_batch(self) -> _Batch:
+        if self._batches:
+            return self._batches[-1]
+        return self._new_batch()
+
+    def _new_batch(self) -> _Batch:
+        batch = _Batch(asyncio.get_running_loop().time())
+        self._batches.append(batch)
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._batches:
+            # Leave the batch open until its window has passed and we are allowed to send
+            batch = self._batches[0]
+            delay = max(batch.created + self.window, self._next_send) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._batches.popleft()
+
+            packets = []
+            if batch.zones:
+                packets.append(self._factory.zone_control(list(batch.zones.values())))
+            if batch.acs:
+                packets.append(self._factory.ac_control(list(batch.acs.values())))
+
+            try:
+                for index, packet in enumerate(packets):
+                    if index > 0:
+                        await asyncio.sleep(max(0, self._next_send - loop.time()))
+                    await self._send(packet)
+                    self._next_send = loop.time() + 1 / self.rate
+            except Exception as e:
+                _LOGGER.warning(f"Failed to send control commands: {e}")
+                batch.sent.set_exception(e)
+                continue
+            batch.sent.set_result(None)
@@ -0,0 +1,37 @@
+"""
+CRC16-MODBUS checksum used for the check bytes at the end of every packet.
+
+Uses the crcmod C extension when it is installed, otherwise a precomputed 256 entry lookup table.
+"""
+
+
+def _make_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001  # 0x8005 reflected
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+_TABLE = _make_table()
+
+
+def _crc16_modbus_table(data: bytes | bytearray | memoryview) -> int:
+    crc = 0xFFFF
+    table = _TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+try:
+    from crcmod.predefined import mkPredefinedCrcFun
+
+    crc16_modbus = mkPredefinedCrcFun("modbus")
+except ImportError:
+    crc16_modbus = _crc16_modbus_table
@@ -1,9 +1,12 @@
 import asyncio
+import contextlib
+import ipaddress
 import logging
 import sys
 from dataclasses import dataclass
 from datetime import datetime
 from re import L
+from typing import AsyncIterator, Iterable
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,14 +42,42 @@ class AirtouchDiscoveryProtocol(asyncio.DatagramProtocol):
 
 
 class AirtouchDiscovery:
+    """
+    Finds AirTouch 5 consoles with UDP discovery requests.
+
+    scan sends requests to any number of IPs / broadcast addresses / subnets over one socket, resending them
+    until they are answered, and yields each console as soon as it replies.
+    discover and discover_by_ip return as soon as the expected consoles have replied, or after TIMEOUT.
+    Consoles that answer more than once (several requests, several subnets) are only reported once, by console_id.
+
+    port is where requests are sent, local_addr is where the replies are listened for.
+    Nothing is tied to an event loop until the socket is opened, so it can be constructed outside of one.
+    """
+
     DISCOVERY_PORT = 49005
     DISCOVERY_MESSAGE = "::REQUEST-POLYAIRE-AIRTOUCH-DEVICE-INFO:;"
     TIMEOUT = 5  # seconds
-
-    def __init__(self):
+    # Seconds between resending requests that haven't been answered
+    RETRANSMIT_INTERVAL = 1
+
+    def __init__(
+        self,
+        port: int = DISCOVERY_PORT,
+        local_addr: tuple[str, int] = ("0.0.0.0", DISCOVERY_PORT),
+    ):
+        self.port = port
+        self.local_addr = local_addr
         self.responses: list[AirtouchDevice] = []
-        self.loop = asyncio.get_running_loop()
         self.transport: asyncio.DatagramTransport | None = None
+        # A queue for each running scan, every parsed response is put in all of them
+        self._listeners: set[asyncio.Queue[AirtouchDevice]] = set()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The running event loop, discovery always uses whichever loop it is called from.
+        """
+        return asyncio.get_running_loop()
 
     async def _ensure_server(self):
         """Make sure transport is ready before sending packets."""
@@ -57,9 +88,9 @@ class AirtouchDiscovery:
     async def establish_server(self):
         # Create UDP socket
         reuse_port_supported = sys.platform != "win32"
-        transport, protocol = await self.loop.create_datagram_endpoint(
+        transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(
             lambda: AirtouchDiscoveryProtocol(self.parse_airtouch_response),
-            local_addr=("0.0.0.0", self.DISCOVERY_PORT),
+            local_addr=self.local_addr,
             allow_broadcast=True,
             reuse_port=reuse_port_supported,  # allow multiple listeners (important for HA)
         )
@@ -84,30 +115,105 @@ class AirtouchDiscovery:
                 _LOGGER.info(f"Unexpected response format: {decoded}")
                 return None
 
-            self.responses.append(AirtouchDevice(*parts))
+            device = AirtouchDevice(*parts)
         except Exception as e:
             _LOGGER.error(f"Failed to parse response: {e}")
             return None
 
-    async def discover_by_ip(self, ip: str) -> AirtouchDevice | None:
-        await self._ensure_server()
-
+        for index, response in enumerate(self.responses):
+            if response.console_id == device.console_id:
+                self.responses[index] = device
+                break
+        else:
+            self.responses.append(device)
+        for listener in self._listeners:
+            listener.put_nowait(device)
+        return device
+
+    def _send_requests(self, targets: Iterable[str]) -> None:
+        if self.transport is None:
+            return
         message = self.DISCOVERY_MESSAGE.encode("utf-8")
-        self.transport.sendto(message, (ip, self.DISCOVERY_PORT))
-        _LOGGER.info(
-            f"Sent {len(self.DISCOVERY_MESSAGE)} bytes to {ip}:{self.DISCOVERY_PORT}"
-        )
-        await asyncio.sleep(self.TIMEOUT)
-        return self.responses[0] if self.responses else None
-
-    async def discover(self, ip="255.255.255.255") -> list[AirtouchDevice]:
+        for target in targets:
+            self.transport.sendto(message, (target, self.port))
+            _LOGGER.debug("Sent discovery request to %s:%d", target, self.port)
+
+    async def scan(
+        self,
+        ips: Iterable[str] = ("255.255.255.255",),
+        expected: int | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[AirtouchDevice]:
+        """
+        Send discovery requests to all the ips at once, yielding each console as it replies.
+        An ip can be a console, a broadcast address or a subnet like "192.168.1.0/24" (its broadcast address is used).
+        Requests are resent every RETRANSMIT_INTERVAL to the ips that haven't replied yet.
+        Stops after timeout (TIMEOUT by default), once expected consoles have replied,
+        or once every ip has replied (which only happens if they are all console addresses).
+        """
         await self._ensure_server()
-
-        message = self.DISCOVERY_MESSAGE.encode("utf-8")
-        self.transport.sendto(message, (ip, self.DISCOVERY_PORT))
-        _LOGGER.info(
-            f"Sent {len(self.DISCOVERY_MESSAGE)} bytes to {ip}:{self.DISCOVERY_PORT}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.TIMEOUT if timeout is None else timeout)
+
+        # Subnets are sent to as their broadcast address
+        pending = dict.fromkeys(
+            (
+                str(ipaddress.ip_network(ip, strict=False).broadcast_address)
+                if "/" in ip
+                else ip
+            )
+            for ip in ips
         )
+        seen: set[str] = set()
+        queue: asyncio.Queue[AirtouchDevice] = asyncio.Queue()
+        self._listeners.add(queue)
+        try:
+            next_send = loop.time()
+            while pending and (expected is None or len(seen) < expected):
+                now = loop.time()
+                if now >= deadline:
+                    break
+                if now >= next_send:
+                    self._send_requests(pending)
+                    next_send = now + self.RETRANSMIT_INTERVAL
+                try:
+                    device = await asyncio.wait_for(
+                        queue.get(), min(deadline, next_send) - now
+                    )
+                except asyncio.TimeoutError:
+                    continue
+
+                pending.pop(device.ip, None)
+                if device.console_id in seen:
+                    continue
+                seen.add(device.console_id)
+                yield device
+        finally:
+            self._listeners.discard(queue)
 
-        await asyncio.sleep(self.TIMEOUT)
-        return list(self.responses)
+    async def discover_by_ip(self, ip: str) -> AirtouchDevice | None:
+        """
+        The console at ip, returning as soon as it replies, or None if it doesn't reply within TIMEOUT.
+        Replies from other consoles (e.g. to someone else's broadcast) are ignored.
+        """
+        async with contextlib.aclosing(self.scan([ip])) as devices:
+            async for device in devices:
+                if device.ip == ip:
+                    return device
+        return None
+
+    async def discover(
+        self, ip="255.255.255.255", expected: int | None = None
+    ) -> list[AirtouchDevice]:
+        """
+        The consoles that reply to a request sent to ip within TIMEOUT, or as soon as expected consoles have replied.
+        """
+        return await self.discover_many([ip], expected)
+
+    async def discover_many(
+        self, ips: Iterable[str], expected: int | None = None
+    ) -> list[AirtouchDevice]:
+        """
+        Like discover, but sending to many ips / subnets at once, see scan.
+        """
+        return [device async for device in self.scan(ips, expected)]
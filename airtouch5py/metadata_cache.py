@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+from airtouch5py.discovery import AirtouchDevice
+from airtouch5py.packets.ac_ability import AcAbility
+from airtouch5py.packets.zone_name import ZoneName
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# The fields stored for each AC / zone, listed explicitly so the on disk format doesn't change with the record classes
+_AC_ABILITY_FIELDS = (
+    "ac_number",
+    "ac_name",
+    "start_zone_number",
+    "zone_count",
+    "supports_mode_cool",
+    "supports_mode_fan",
+    "supports_mode_dry",
+    "supports_mode_heat",
+    "supports_mode_auto",
+    "supports_fan_speed_intelligent_auto",
+    "supports_fan_speed_turbo",
+    "supports_fan_speed_powerful",
+    "supports_fan_speed_high",
+    "supports_fan_speed_medium",
+    "supports_fan_speed_low",
+    "supports_fan_speed_quiet",
+    "supports_fan_speed_auto",
+    "min_cool_set_point",
+    "max_cool_set_point",
+    "min_heat_set_point",
+    "max_heat_set_point",
+)
+_ZONE_NAME_FIELDS = ("zone_number", "zone_name")
+
+
+class ConsoleMetadata:
+    """
+    The parts of a console's state that almost never change.
+    """
+
+    ac: list[AcAbility]
+    zones: list[ZoneName]
+    console_version: str
+
+    def __init__(
+        self, ac: list[AcAbility], zones: list[ZoneName], console_version: str
+    ):
+        self.ac = ac
+        self.zones = zones
+        self.console_version = console_version
+
+    def to_json(self) -> dict:
+        return {
+            "ac": [
+                {field: getattr(ac, field) for field in _AC_ABILITY_FIELDS}
+                for ac in self.ac
+            ],
+            "zones": [
+                {field: getattr(zone, field) for field in _ZONE_NAME_FIELDS}
+                for zone in self.zones
+            ],
+            "console_version": self.console_version,
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> "ConsoleMetadata":
+        return ConsoleMetadata(
+            [
+                AcAbility(**{field: ac[field] for field in _AC_ABILITY_FIELDS})
+                for ac in data["ac"]
+            ],
+            [
+                ZoneName(**{field: zone[field] for field in _ZONE_NAME_FIELDS})
+                for zone in data["zones"]
+            ],
+            data["console_version"],
+        )
+
+
+def metadata_cache_key(device: AirtouchDevice) -> str:
+    """
+    The key a device's metadata is cached under.
+    """
+    return f"{device.system_id}_{device.console_id}"
+
+
+class MetadataCache(ABC):
+    """
+    Stores ConsoleMetadata between connections, keyed by metadata_cache_key.
+    Subclass this to store it somewhere else.
+
+    The methods may block (e.g. on disk I/O), Airtouch5SimpleClient calls them from a worker thread
+    so they must be thread safe.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> ConsoleMetadata | None: ...
+
+    @abstractmethod
+    def set(self, key: str, metadata: ConsoleMetadata) -> None: ...
+
+    @abstractmethod
+    def invalidate(self, key: str) -> None: ...
+
+
+class MemoryMetadataCache(MetadataCache):
+    """
+    Keeps metadata for the life of the process, share one between clients.
+    """
+
+    _entries: dict[str, ConsoleMetadata]
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key: str) -> ConsoleMetadata | None:
+        return self._entries.get(key)
+
+    def set(self, key: str, metadata: ConsoleMetadata) -> None:
+        self._entries[key] = metadata
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class FileMetadataCache(MetadataCache):
+    """
+    Keeps metadata as one json file per console in the given directory, so it survives restarts.
+    """
+
+    directory: str
+    _memory: MemoryMetadataCache
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._memory = MemoryMetadataCache()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> ConsoleMetadata | None:
+        metadata = self._memory.get(key)
+        if metadata is not None:
+            return metadata
+
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                metadata = ConsoleMetadata.from_json(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            _LOGGER.warning(f"Ignoring unreadable metadata cache for {key}: {e}")
+            return None
+
+        self._memory.set(key, metadata)
+        return metadata
+
+    def set(self, key: str, metadata: ConsoleMetadata) -> None:
+        self._memory.set(key, metadata)
+
+        # Write to a temporary file and move it in to place so a crash never leaves a half written file
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(metadata.to_json(), f)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def invalidate(self, key: str) -> None:
+        self._memory.invalidate(key)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,163 @@
+import asyncio
+import bisect
+import logging
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the histogram buckets
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CALLBACK_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    Counts observations in to cumulative buckets, like a Prometheus histogram.
+    """
+
+    buckets: tuple[float, ...]
+    # Observations in each bucket (not cumulative), the last is for observations over the largest bucket
+    counts: list[int]
+    count: int
+    sum: float
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """
+        (upper bound, observations <= upper bound) for each bucket, ending with +Inf.
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """
+    Counters for one client, pass one to Airtouch5Client / Airtouch5SimpleClient to turn them on.
+    Without one the clients skip all of this, so metrics cost nothing unless they are wanted.
+
+    Values that already exist elsewhere (queue depth, reader errors) aren't counted twice,
+    the client registers a gauge that reads them when snapshot / to_prometheus is called.
+    """
+
+    bytes_received: int
+    bytes_sent: int
+    packets_received: int
+    packets_sent: int
+    reconnects: int
+    # Seconds from sending a request to receiving its reply
+    request_seconds: Histogram
+    # Seconds spent in each callback call
+    callback_seconds: Histogram
+
+    # name -> function returning the current value, names may include prometheus labels
+    gauges: dict[str, Callable[[], float]]
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.packets_received = 0
+        self.packets_sent = 0
+        self.reconnects = 0
+        self.request_seconds = Histogram(REQUEST_BUCKETS)
+        self.callback_seconds = Histogram(CALLBACK_BUCKETS)
+        self.gauges = {}
+
+    def snapshot(self) -> dict:
+        """
+        The current values, as plain data (e.g. for json).
+        """
+        return {
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "packets_received": self.packets_received,
+            "packets_sent": self.packets_sent,
+            "reconnects": self.reconnects,
+            "request_seconds": _histogram_snapshot(self.request_seconds),
+            "callback_seconds": _histogram_snapshot(self.callback_seconds),
+            **{name: gauge() for name, gauge in self.gauges.items()},
+        }
+
+    def to_prometheus(self, prefix: str = "airtouch5_", labels: str = "") -> str:
+        """
+        The values in the Prometheus text exposition format.
+        labels is added to every sample, e.g. 'console="upstairs"'.
+        """
+        lines: list[str] = []
+
+        def sample(name: str, value: float, extra_labels: str = "") -> None:
+            all_labels = ",".join(label for label in (labels, extra_labels) if label)
+            lines.append(
+                f"{prefix}{name}{{{all_labels}}} {value}"
+                if all_labels
+                else f"{prefix}{name} {value}"
+            )
+
+        for name in (
+            "bytes_received",
+            "bytes_sent",
+            "packets_received",
+            "packets_sent",
+        ):
+            lines.append(f"# TYPE {prefix}{name}_total counter")
+            sample(f"{name}_total", getattr(self, name))
+        lines.append(f"# TYPE {prefix}reconnects_total counter")
+        sample("reconnects_total", self.reconnects)
+
+        for name in ("request_seconds", "callback_seconds"):
+            histogram: Histogram = getattr(self, name)
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else bound
+                sample(f"{name}_bucket", count, f'le="{le}"')
+            sample(f"{name}_sum", histogram.sum)
+            sample(f"{name}_count", histogram.count)
+
+        # The samples of each gauge family go together under its TYPE line,
+        # whatever order the labelled gauges were registered in
+        families: dict[str, list[tuple[str, Callable[[], float]]]] = {}
+        for name, gauge in self.gauges.items():
+            base, _, gauge_labels = name.partition("{")
+            families.setdefault(base, []).append((gauge_labels.rstrip("}"), gauge))
+        for base, family in families.items():
+            lines.append(f"# TYPE {prefix}{base} gauge")
+            for gauge_labels, gauge in family:
+                sample(base, gauge(), gauge_labels)
+
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_snapshot(histogram: Histogram) -> dict:
+    return {
+        "count": histogram.count,
+        "sum": histogram.sum,
+        "buckets": {str(bound): count for bound, count in histogram.cumulative()},
+    }
+
+
+async def report_metrics(
+    metrics: Metrics, callback: Callable[[dict], None], interval: float = 60
+) -> None:
+    """
+    Call callback with metrics.snapshot() every interval seconds, until cancelled.
+    Run it as a task: asyncio.create_task(report_metrics(client.metrics, send_to_dashboard))
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            callback(metrics.snapshot())
+        except Exception:
+            _LOGGER.exception("Exception in metrics callback")
@@ -1,4 +1,6 @@
 import struct
+from enum import Enum
+from typing import TypeVar
 
 from airtouch5py.packet_fields import (
     ControlStatusSubType,
@@ -51,8 +53,29 @@ from airtouch5py.packets.zone_status import (
     ZoneStatusData,
     ZoneStatusZone,
 )
-from bitarray import bitarray
-from bitarray.util import ba2int
+
+# Address (2 bytes), Message ID (1 byte), Message type (1 byte), Data length (2 bytes)
+_header_struct = struct.Struct(">HBBH")
+# Byte 1, Byte 2, Byte 3, Byte 4 NOT USED
+_zone_control_struct = struct.Struct(">BBBx")
+# Byte 1, Byte 2, Byte 3, Byte 4, Byte 5-6, Byte 7
+_zone_status_struct = struct.Struct(">BBBBHB")
+# Byte 1, Byte 2, Byte 3, Byte 4
+_ac_control_struct = struct.Struct(">BBBB")
+# Byte 1, Byte 2, Byte 3, Byte 4, Byte 5-6, Byte 7-8
+_ac_status_struct = struct.Struct(">BBBBHH")
+# Byte 21 start zone number, Byte 22 zone count, Byte 23-24 supported modes and fan speeds, Byte 25-28 set points
+_ac_ability_struct = struct.Struct(">BBBBBBBB")
+
+E = TypeVar("E", bound=Enum)
+
+
+def _lookup_table(enum: type[E], size: int, default: E | None) -> tuple[E | None, ...]:
+    """
+    Map every raw value that fits in the field to its enum member, or to default if it isn't a member.
+    """
+    members = {item.value: item for item in enum}
+    return tuple(members.get(value, default) for value in range(size))
 
 
 class PacketDecoder:
@@ -61,18 +84,30 @@ class PacketDecoder:
     Assumes that they have already been validated (CRC, data length)
     """
 
-    # https://stackoverflow.com/questions/43634618/how-do-i-test-if-int-value-exists-in-python-enum-without-using-try-catch
-    _set_ZoneSettingValue = set(item.value for item in ZoneSettingValue)
-    _set_ZoneSettingPower = set(item.value for item in ZoneSettingPower)
-    _set_SetPowerSetting = set(item.value for item in SetPowerSetting)
-    _set_SetAcMode = set(item.value for item in SetAcMode)
-    _set_SetAcFanSpeed = set(item.value for item in SetAcFanSpeed)
-    _set_SetpointControl = set(item.value for item in SetpointControl)
-    _set_AcPowerState = set(item.value for item in AcPowerState)
-    _set_AcMode = set(item.value for item in AcMode)
-    _set_AcFanSpeed = set(item.value for item in AcFanSpeed)
-
-    def decode(self, buffer: bytes) -> DataPacket:
+    # Raw field value -> enum member, invalid values map to the documented fallback
+    _ZoneSettingValue = _lookup_table(
+        ZoneSettingValue, 0b1000, ZoneSettingValue.KEEP_SETTING_VALUE
+    )
+    _ZoneSettingPower = _lookup_table(
+        ZoneSettingPower, 0b1000, ZoneSettingPower.KEEP_POWER_STATE
+    )
+    _ZonePowerState = _lookup_table(ZonePowerState, 0b100, None)
+    _ControlMethod = _lookup_table(ControlMethod, 0b10, None)
+    _SetPowerSetting = _lookup_table(
+        SetPowerSetting, 0b10000, SetPowerSetting.KEEP_POWER_SETTING
+    )
+    _SetAcMode = _lookup_table(SetAcMode, 0b10000, SetAcMode.KEEP_AC_MODE)
+    _SetAcFanSpeed = _lookup_table(
+        SetAcFanSpeed, 0b10000, SetAcFanSpeed.KEEP_AC_FAN_SPEED
+    )
+    _SetpointControl = _lookup_table(
+        SetpointControl, 0x100, SetpointControl.INVALIDATE_DATA
+    )
+    _AcPowerState = _lookup_table(AcPowerState, 0b10000, AcPowerState.NOT_AVAILABLE)
+    _AcMode = _lookup_table(AcMode, 0b10000, AcMode.NOT_AVAILABLE)
+    _AcFanSpeed = _lookup_table(AcFanSpeed, 0b10000, AcFanSpeed.NOT_AVAILABLE)
+
+    def decode(self, buffer: bytes | bytearray | memoryview) -> DataPacket:
         # Header (4 bytes)
         # Address (2 bytes)
         # Message ID (1 byte)
@@ -84,12 +119,10 @@ class PacketDecoder:
         # if len(bytes) < 4 + 2 + 1 + 1 + 2 + 2:
         #    raise ValueError("Packet is too short")
 
-        # TODO: Could do these all in one unpack call?
-        address: int = struct.unpack(">H", buffer[4:6])[0]
-        message_id: int = struct.unpack(">B", buffer[6:7])[0]
-        message_type: int = struct.unpack(">B", buffer[7:8])[0]
-        data_length: int = struct.unpack(">H", buffer[8:10])[0]
-        data_bytes: bytes = buffer[10 : data_length + 10]
+        address, message_id, message_type, data_length = _header_struct.unpack_from(
+            buffer, 4
+        )
+        data_bytes = buffer[10 : data_length + 10]
 
         data: Data
         match message_type:
@@ -174,31 +207,22 @@ class PacketDecoder:
         self, bytes: bytes, repeat_data_count: int
     ) -> ZoneControlData:
         zones: list[ZoneControlZone] = []
-        bits = bitarray(endian="big")
 
-        for i in range(0, repeat_data_count):
-            bits.clear()
-            bits.frombytes(bytes[i * 4 : i * 4 + 4])
+        for byte1, byte2, byte3 in _zone_control_struct.iter_unpack(
+            bytes[: repeat_data_count * 4]
+        ):
             # Byte 1 Bit 6-1 Zone number
-            zone_number = ba2int(bits[2:8])
+            zone_number = byte1 & 0x3F
             # Byte 2 Bit 8-6 Zone setting value (Can be invalid -> KEEP_SETTING_VALUE)
-            zone_setting_value = ba2int(bits[8 + 0 : 8 + 3])
-            if zone_setting_value in self._set_ZoneSettingValue:
-                zone_setting_value = ZoneSettingValue(zone_setting_value)
-            else:
-                zone_setting_value = ZoneSettingValue.KEEP_SETTING_VALUE
+            zone_setting_value = self._ZoneSettingValue[byte2 >> 5]
             # Byte 2 bit 3-1 Power
-            power = ba2int(bits[8 + 5 : 8 + 8])
-            if power in self._set_ZoneSettingPower:
-                power = ZoneSettingPower(power)
-            else:
-                power = ZoneSettingPower.KEEP_POWER_STATE
+            power = self._ZoneSettingPower[byte2 & 0x07]
             # Byte 3 Value to set
-            value_to_set = ba2int(bits[16 : 16 + 8])
+            value_to_set = byte3
 
-            if zone_setting_value == ZoneSettingValue.SET_OPEN_PERCENTAGE:
+            if zone_setting_value is ZoneSettingValue.SET_OPEN_PERCENTAGE:
                 value_to_set = value_to_set / 100
-            elif zone_setting_value == ZoneSettingValue.SET_TARGET_SETPOINT:
+            elif zone_setting_value is ZoneSettingValue.SET_TARGET_SETPOINT:
                 value_to_set = (value_to_set + 100) / 10
 
             zones.append(
@@ -213,41 +237,39 @@ class PacketDecoder:
             return ZoneStatusData([])
 
         zones: list[ZoneStatusZone] = []
-        bits = bitarray(endian="big")
+        unpack_from = _zone_status_struct.unpack_from
 
         for i in range(0, repeat_data_count):
-            bits.clear()
-            bits.frombytes(
-                bytes[
-                    i * repeat_data_length : i * repeat_data_length + repeat_data_length
-                ]
+            byte1, byte2, byte3, byte4, byte56, byte7 = unpack_from(
+                bytes, i * repeat_data_length
             )
             # Byte 1 Bit 8-7 Zone power state
-            zone_power_state = ZonePowerState(ba2int(bits[0:2]))
+            zone_power_state = self._ZonePowerState[byte1 >> 6]
+            if zone_power_state is None:
+                raise ValueError(f"{byte1 >> 6} is not a valid ZonePowerState")
             # Byte 1 Bit 6-1 Zone number
-            zone_number = ba2int(bits[2:8])
+            zone_number = byte1 & 0x3F
             # Byte 2 Bit 8 Control method
-            control_method = ControlMethod(ba2int(bits[8 + 0 : 8 + 1]))
+            control_method = self._ControlMethod[byte2 >> 7]
             # Byte 2 Bit 7-1 Open percentage
-            open_percentage = ba2int(bits[8 + 1 : 8 + 8]) / 100
+            open_percentage = (byte2 & 0x7F) / 100
             # Byte 3 Set point
-            set_point = ba2int(bits[16 : 16 + 8])
-            if set_point == 0xFF:  # 0xFF invalid
+            if byte3 == 0xFF:  # 0xFF invalid
                 set_point = None
             else:
-                set_point = (set_point + 100) / 10
+                set_point = (byte3 + 100) / 10
             # Byte 4 Bit 8 Has sensor
-            has_sensor = bool(bits[24 + 0])
+            has_sensor = bool(byte4 & 0x80)
             # Byte 5 Bit 3-1, Byte 6 Temperature
-            temperature = ba2int(bits[32 + 5 : 32 + 5 + 3 + 8])
+            temperature = byte56 & 0x07FF
             if temperature <= 2000:
                 temperature = (temperature - 500) / 10
             else:  # Other: Not available
                 temperature = None
             # Byte 7 Bit 2 Spill active
-            spill_active = bool(bits[48 + 6])
+            spill_active = bool(byte7 & 0x02)
             # Byte 7 Bit 1 Is low battery
-            is_low_battery = bool(bits[48 + 7])
+            is_low_battery = bool(byte7 & 0x01)
 
             zones.append(
                 ZoneStatusZone(
@@ -266,39 +288,22 @@ class PacketDecoder:
 
     def decode_ac_control(self, bytes: bytes, repeat_data_count: int) -> AcControlData:
         ac_control: list[AcControl] = []
-        bits = bitarray(endian="big")
 
-        for i in range(0, repeat_data_count):
-            bits.clear()
-            bits.frombytes(bytes[i * 4 : i * 4 + 4])
+        for byte1, byte2, byte3, byte4 in _ac_control_struct.iter_unpack(
+            bytes[: repeat_data_count * 4]
+        ):
             # Byte 1 Bit 8-5 Power setting
-            power_setting = ba2int(bits[0:4])
-            if power_setting in self._set_SetPowerSetting:
-                power_setting = SetPowerSetting(power_setting)
-            else:
-                power_setting = SetPowerSetting.KEEP_POWER_SETTING
+            power_setting = self._SetPowerSetting[byte1 >> 4]
             # Byte 1 Bit 4-1 AC number
-            ac_number = ba2int(bits[4:8])
+            ac_number = byte1 & 0x0F
             # Byte 2 Bit 8-5 AC mode
-            ac_mode = ba2int(bits[8 + 0 : 8 + 4])
-            if ac_mode in self._set_SetAcMode:
-                ac_mode = SetAcMode(ac_mode)
-            else:
-                ac_mode = SetAcMode.KEEP_AC_MODE
+            ac_mode = self._SetAcMode[byte2 >> 4]
             # Byte 2 Bit 4-1 AC fan speed
-            ac_fan_speed = ba2int(bits[8 + 4 : 8 + 8])
-            if ac_fan_speed in self._set_SetAcFanSpeed:
-                ac_fan_speed = SetAcFanSpeed(ac_fan_speed)
-            else:
-                ac_fan_speed = SetAcFanSpeed.KEEP_AC_FAN_SPEED
+            ac_fan_speed = self._SetAcFanSpeed[byte2 & 0x0F]
             # Byte 3 Setpoint control
-            setpoint_control = ba2int(bits[16 : 16 + 8])
-            if setpoint_control in self._set_SetpointControl:
-                setpoint_control = SetpointControl(setpoint_control)
-            else:
-                setpoint_control = SetpointControl.INVALIDATE_DATA
+            setpoint_control = self._SetpointControl[byte3]
             # Byte 4 Setpoint value
-            setpoint = (ba2int(bits[24 : 24 + 8]) + 100) / 10
+            setpoint = (byte4 + 100) / 10
 
             ac_control.append(
                 AcControl(
@@ -318,54 +323,39 @@ class PacketDecoder:
         if repeat_data_count == 0:
             return AcStatusData([])
         ac_status: list[AcStatus] = []
-        bits = bitarray(endian="big")
+        unpack_from = _ac_status_struct.unpack_from
 
         for i in range(0, repeat_data_count):
-            bits.clear()
-            bits.frombytes(
-                bytes[
-                    i * repeat_data_length : i * repeat_data_length + repeat_data_length
-                ]
+            byte1, byte2, byte3, byte4, byte56, byte78 = unpack_from(
+                bytes, i * repeat_data_length
             )
 
             # Byte 1 Bit 8-5 AC power state
-            ac_power_state = ba2int(bits[0:4])
-            if ac_power_state in self._set_AcPowerState:
-                ac_power_state = AcPowerState(ac_power_state)
-            else:
-                ac_power_state = AcPowerState.NOT_AVAILABLE
+            ac_power_state = self._AcPowerState[byte1 >> 4]
             # Byte 1 Bit 4-1 AC number
-            ac_number = ba2int(bits[4:8])
+            ac_number = byte1 & 0x0F
             # Byte 2 Bit 8-5 AC mode
-            ac_mode = ba2int(bits[8 + 0 : 8 + 4])
-            if ac_mode in self._set_AcMode:
-                ac_mode = AcMode(ac_mode)
-            else:
-                ac_mode = AcMode.NOT_AVAILABLE
+            ac_mode = self._AcMode[byte2 >> 4]
             # Byte 2 Bit 4-1 AC fan speed
-            ac_fan_speed = ba2int(bits[8 + 4 : 8 + 8])
-            if ac_fan_speed in self._set_AcFanSpeed:
-                ac_fan_speed = AcFanSpeed(ac_fan_speed)
-            else:
-                ac_fan_speed = AcFanSpeed.NOT_AVAILABLE
+            ac_fan_speed = self._AcFanSpeed[byte2 & 0x0F]
             # Byte 3 Setpoint
-            setpoint = (ba2int(bits[16 : 16 + 8]) + 100) / 10
+            setpoint = (byte3 + 100) / 10
             # Byte 4 Bit 4 Turbo active
-            turbo_active = bool(bits[24 + 4])
+            turbo_active = bool(byte4 & 0x08)
             # Byte 4 Bit 3 Bypass active
-            bypass_active = bool(bits[24 + 5])
+            bypass_active = bool(byte4 & 0x04)
             # Byte 4 Bit 2 Spill active
-            spill_active = bool(bits[24 + 6])
+            spill_active = bool(byte4 & 0x02)
             # Byte 4 Bit 1 Timer set
-            timer_set = bool(bits[24 + 7])
+            timer_set = bool(byte4 & 0x01)
             # Byte 5 Bit 3-1, Byte 6 Temperature
-            temperature = ba2int(bits[32 + 5 : 32 + 5 + 3 + 8])
+            temperature = byte56 & 0x07FF
             if temperature <= 2000:
                 temperature = (temperature - 500) / 10
             else:  # Other: Not available
                 temperature = None
             # Byte 7-8 Error code
-            error_code = ba2int(bits[48 : 48 + 16])
+            error_code = byte78
 
             # Byte 9 NOT USED (in 1.1 docs)
             # Byte 10,11,12,13 ?????? Not in 1.1 docs, introduced in console 1.2.0
@@ -412,57 +402,57 @@ class PacketDecoder:
             return AcAbilityRequestData(struct.unpack(">B", bytes[0:1])[0])
 
         ac_ability: list[AcAbility] = []
-        bits = bitarray(endian="big")
 
         while len(bytes) > 2:
             # Byte 3 AC number
-            ac_number = struct.unpack(">B", bytes[0:1])[0]
+            ac_number = bytes[0]
             # Byte 4 Following data length
-            length = struct.unpack(">B", bytes[1:2])[0]
+            length = bytes[1]
             # Byte 5-20 AC Name (Null terminated if nulls fit)
-            name = bytes[2:18].decode(errors="ignore").split("\x00")[0]
-            # Byte 21 start zone number
-            start_zone_number = struct.unpack(">B", bytes[18:19])[0]
-            # Byte 22 zone count
-            zone_count = struct.unpack(">B", bytes[19:20])[0]
-
-            bits.clear()
-            bits.frombytes(bytes[20:22])
+            name = str(bytes[2:18], errors="ignore").split("\x00")[0]
+            (
+                # Byte 21 start zone number
+                start_zone_number,
+                # Byte 22 zone count
+                zone_count,
+                modes,
+                fan_speeds,
+                # Byte 25 Min cool set point
+                min_cool_set_point,
+                # Byte 26 Max cool set point
+                max_cool_set_point,
+                # Byte 27 Min heat set point
+                min_heat_set_point,
+                # Byte 28 Max heat set point
+                max_heat_set_point,
+            ) = _ac_ability_struct.unpack_from(bytes, 18)
+
             # Byte 23 Bit 5 Cool mode
-            supports_mode_cool = bool(bits[3])
+            supports_mode_cool = bool(modes & 0x10)
             # Byte 23 Bit 4 Fan mode
-            supports_mode_fan = bool(bits[4])
+            supports_mode_fan = bool(modes & 0x08)
             # Byte 23 Bit 3 Dry mode
-            supports_mode_dry = bool(bits[5])
+            supports_mode_dry = bool(modes & 0x04)
             # Byte 23 Bit 2 Heat mode
-            supports_mode_heat = bool(bits[6])
+            supports_mode_heat = bool(modes & 0x02)
             # Byte 23 Bit 1 Auto mode
-            supports_mode_auto = bool(bits[7])
+            supports_mode_auto = bool(modes & 0x01)
             # Byte 24 Bit 8 Fan speed intelligent auto
-            supports_fan_speed_intelligent_auto = bool(bits[8 + 0])
+            supports_fan_speed_intelligent_auto = bool(fan_speeds & 0x80)
             # Byte 24 Bit 7 Fan speed turbo
-            supports_fan_speed_turbo = bool(bits[8 + 1])
+            supports_fan_speed_turbo = bool(fan_speeds & 0x40)
             # Byte 24 Bit 6 Fan speed powerful
-            supports_fan_speed_powerful = bool(bits[8 + 2])
+            supports_fan_speed_powerful = bool(fan_speeds & 0x20)
             # Byte 24 Bit 5 Fan speed high
-            supports_fan_speed_high = bool(bits[8 + 3])
+            supports_fan_speed_high = bool(fan_speeds & 0x10)
             # Byte 24 Bit 4 Fan speed medium
-            supports_fan_speed_medium = bool(bits[8 + 4])
+            supports_fan_speed_medium = bool(fan_speeds & 0x08)
             # Byte 24 Bit 3 Fan speed low
-            supports_fan_speed_low = bool(bits[8 + 5])
+            supports_fan_speed_low = bool(fan_speeds & 0x04)
             # Byte 24 Bit 2 Fan speed quiet
-            supports_fan_speed_quiet = bool(bits[8 + 6])
+            supports_fan_speed_quiet = bool(fan_speeds & 0x02)
             # Byte 24 Bit 1 Fan speed auto
-            supports_fan_speed_auto = bool(bits[8 + 7])
-
-            # Byte 25 Min cool set point
-            min_cool_set_point = struct.unpack(">B", bytes[22:23])[0]
-            # Byte 26 Max cool set point
-            max_cool_set_point = struct.unpack(">B", bytes[23:24])[0]
-            # Byte 27 Min heat set point
-            min_heat_set_point = struct.unpack(">B", bytes[24:25])[0]
-            # Byte 28 Max heat set point
-            max_heat_set_point = struct.unpack(">B", bytes[25:26])[0]
+            supports_fan_speed_auto = bool(fan_speeds & 0x01)
 
             ac_ability.append(
                 AcAbility(
@@ -504,7 +494,7 @@ class PacketDecoder:
         # Byte 4 error info length
         error_length = struct.unpack(">B", bytes[1:2])[0]
         # Byte 5-error_length error info
-        error_info = bytes[2 : 2 + error_length].decode(errors="ignore")
+        error_info = str(bytes[2 : 2 + error_length], errors="ignore")
         return AcErrorInformationData(ac_number, error_info)
 
     def decode_zone_name(self, bytes: bytes) -> Data:
@@ -521,7 +511,7 @@ class PacketDecoder:
             # Byte 4 Name  length
             length = struct.unpack(">B", bytes[1:2])[0]
             # Byte 5..n Zone Name
-            name = bytes[2 : 2 + length].decode(errors="ignore")
+            name = str(bytes[2 : 2 + length], errors="ignore")
 
             names.append(ZoneName(zone_number, name))
             # We've now used the first 2 + length bytes, so remove them from the buffer
@@ -538,6 +528,6 @@ class PacketDecoder:
         # Byte 4 version string length
         length = struct.unpack(">B", bytes[1:2])[0]
         # Byte 5..n Version string
-        version = bytes[2 : 2 + length].decode(errors="ignore")
+        version = str(bytes[2 : 2 + length], errors="ignore")
 
         return ConsoleVersionData(has_update, version)
@@ -1,5 +1,6 @@
 import struct
 
+from airtouch5py.crc16 import crc16_modbus
 from airtouch5py.packet_fields import MessageType
 from airtouch5py.packets.ac_ability import AcAbilityData, AcAbilityRequestData
 from airtouch5py.packets.ac_control import AcControlData, SetpointControl
@@ -15,40 +16,85 @@ from airtouch5py.packets.console_version import (
 from airtouch5py.packets.datapacket import Data, DataPacket
 from airtouch5py.packets.zone_control import ZoneControlData, ZoneSettingValue
 from airtouch5py.packets.zone_name import ZoneNameData, ZoneNameRequestData
-
 from airtouch5py.packets.zone_status import ZoneStatusData
 
-from crc import Calculator, Crc16
-
-_calculator = Calculator(Crc16.MODBUS)  # type: ignore
+# Header (4 bytes), Address (2 bytes), Message ID (1 byte), Message type (1 byte), Data length (2 bytes)
+_header_struct = struct.Struct(">4sHBBH")
+# CRC16 check bytes
+_crc_struct = struct.Struct(">H")
+# Sub message type (1 byte), Keep 0 (1 byte), Normal data length (2 bytes), Each repeat data length (2 bytes), Repeat count (2 bytes)
+_control_status_struct = struct.Struct(">BxHHH")
+# Sub message type (2 bytes)
+_extended_struct = struct.Struct(">H")
+# Byte 1, Byte 2, Byte 3, Byte 4 Keep 0
+_zone_control_struct = struct.Struct(">BBBx")
+# Byte 1, Byte 2, Byte 3, Byte 4, Byte 5-6, Byte 7, Byte 8 NOT USED
+_zone_status_struct = struct.Struct(">BBBBHBx")
+# Byte 1, Byte 2, Byte 3, Byte 4
+_ac_control_struct = struct.Struct(">BBBB")
+# Byte 1, Byte 2, Byte 3, Byte 4, Byte 5-6, Byte 7-8, Byte 9-10 NOT USED
+_ac_status_struct = struct.Struct(">BBBBHHH")
+# Byte 3 AC number, Byte 4 Following data length, Byte 5-20 AC name, Byte 21-28
+_ac_ability_struct = struct.Struct(">BB16sBBBBBBBB")
+# Byte 3 Number, Byte 4 Length
+_number_length_struct = struct.Struct(">BB")
 
 
 class PacketEncoder:
     header = b"\x55\x55\x55\xaa"
 
     def encode(self, packet: DataPacket) -> bytes:
+        buffer = bytearray(self.encoded_length(packet))
+        self.encode_into(packet, buffer)
+        return bytes(buffer)
+
+    def encoded_length(self, packet: DataPacket) -> int:
+        """
+        The number of bytes encode / encode_into will write for this packet.
+        """
+        # Header (4) + Address (2) + Message Id (1) + Message type (1) + Data length (2) + data + check bytes (2)
+        return _header_struct.size + self._data_length(packet.data) + _crc_struct.size
+
+    def encode_into(
+        self, packet: DataPacket, buffer: bytearray | memoryview, offset: int = 0
+    ) -> int:
+        """
+        Encode the packet into buffer starting at offset, returning the number of bytes written.
+        buffer must have at least encoded_length(packet) bytes available after offset.
+        """
+        data_length = self._data_length(packet.data)
+        end = offset + _header_struct.size + data_length + _crc_struct.size
+        if end > len(buffer):
+            raise ValueError(
+                f"Buffer too small, need {end - offset} bytes but only {len(buffer) - offset} available"
+            )
+
         # Header is always 0x55 0x55 0x55 0xAA
-        res = self.header
-        # Address, Message id
-        res += struct.pack(">HB", packet.address, packet.message_id)
-        # Message type
-        res += struct.pack(">B", self._message_type(packet.data).value)
-
-        # Data length (2bytes)
-        packet_data = self._encode_data(packet.data)
-        res += struct.pack(">H", len(packet_data))
+        # Address, Message id, Message type, Data length (2bytes)
+        _header_struct.pack_into(
+            buffer,
+            offset,
+            self.header,
+            packet.address,
+            packet.message_id,
+            self._message_type(packet.data).value,
+            data_length,
+        )
+
         # Data
-        res += packet_data
+        self._encode_data(packet.data, buffer, offset + _header_struct.size)
 
         # CRC16 check bytes
-        res += struct.pack(">H", _calculator.checksum(res[4:]))
+        with memoryview(buffer) as view:
+            crc = crc16_modbus(view[offset + len(self.header) : end - _crc_struct.size])
+        _crc_struct.pack_into(buffer, end - _crc_struct.size, crc)
 
         # h. Redundant bytes in message
         # To prevent the message from containing the same data as header, a 00 is inserted after every three
         # consecutive 0x55s in the message. The inserted 00 is redundant bytes
         # ^^ In testing this actually doesn't happen. I named a zone UUUUUUU and it didn't insert any 00s
 
-        return res
+        return end - offset
 
     def _message_type(self, data: Data) -> MessageType:
         match data:
@@ -70,278 +116,328 @@ class PacketEncoder:
             case _:
                 raise Exception(f"Unknown message type for {data.__class__.__name__}")
 
-    def _encode_data(self, data: Data) -> bytes:
+    def _data_length(self, data: Data) -> int:
+        match data:
+            case ZoneControlData():
+                return _control_status_struct.size + _zone_control_struct.size * len(
+                    data.zones
+                )
+            case ZoneStatusData():
+                return _control_status_struct.size + _zone_status_struct.size * len(
+                    data.zones
+                )
+            case AcControlData():
+                return _control_status_struct.size + _ac_control_struct.size * len(
+                    data.ac_control
+                )
+            case AcStatusData():
+                return _control_status_struct.size + _ac_status_struct.size * len(
+                    data.ac_status
+                )
+            case AcAbilityRequestData() | AcErrorInformationRequestData() if (
+                data.ac_number is not None
+            ):
+                return _extended_struct.size + 1
+            case ZoneNameRequestData() if data.zone_number is not None:
+                return _extended_struct.size + 1
+            case (
+                AcAbilityRequestData()
+                | AcErrorInformationRequestData()
+                | ZoneNameRequestData()
+                | ConsoleVersionRequestData()
+            ):
+                return _extended_struct.size
+            case AcAbilityData():
+                return _extended_struct.size + _ac_ability_struct.size * len(
+                    data.ac_ability
+                )
+            case AcErrorInformationData():
+                return (
+                    _extended_struct.size
+                    + _number_length_struct.size
+                    + len(data.error_info)
+                )
+            case ZoneNameData():
+                return _extended_struct.size + sum(
+                    _number_length_struct.size + len(zone.zone_name)
+                    for zone in data.zone_names
+                )
+            case ConsoleVersionData():
+                return (
+                    _extended_struct.size
+                    + _number_length_struct.size
+                    + len(data.version)
+                )
+            case _:
+                raise Exception(f"Unknown data type for {data.__class__.__name__}")
+
+    def _encode_data(
+        self, data: Data, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         match data:
             case ZoneControlData():
-                return self._encode_zone_control_data(data)
+                self._encode_zone_control_data(data, buffer, offset)
             case ZoneStatusData():
-                return self._encode_zone_status_data(data)
+                self._encode_zone_status_data(data, buffer, offset)
             case AcControlData():
-                return self._encode_ac_control_data(data)
+                self._encode_ac_control_data(data, buffer, offset)
             case AcStatusData():
-                return self._encode_ac_status_data(data)
+                self._encode_ac_status_data(data, buffer, offset)
             case AcAbilityRequestData():
-                return self._encode_ac_ability_request_data(data)
+                self._encode_ac_ability_request_data(data, buffer, offset)
             case AcAbilityData():
-                return self._encode_ac_ability_data(data)
+                self._encode_ac_ability_data(data, buffer, offset)
             case AcErrorInformationRequestData():
-                return self._encode_ac_error_information_request_data(data)
+                self._encode_ac_error_information_request_data(data, buffer, offset)
             case AcErrorInformationData():
-                return self._encode_ac_error_information_data(data)
+                self._encode_ac_error_information_data(data, buffer, offset)
             case ZoneNameRequestData():
-                return self._encode_zone_name_request_data(data)
+                self._encode_zone_name_request_data(data, buffer, offset)
             case ZoneNameData():
-                return self._encode_zone_name_data(data)
+                self._encode_zone_name_data(data, buffer, offset)
             case ConsoleVersionRequestData():
-                return self._encode_console_version_request_data(data)
+                self._encode_console_version_request_data(data, buffer, offset)
             case ConsoleVersionData():
-                return self._encode_console_version_data(data)
+                self._encode_console_version_data(data, buffer, offset)
             case _:
                 raise Exception(f"Unknown data type for {data.__class__.__name__}")
 
-    def _encode_zone_control_data(self, data: ZoneControlData) -> bytes:
+    def _encode_zone_control_data(
+        self, data: ZoneControlData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0x20
         # 0
         # no normal data (2 bytes)
         # each repeat data length (2 bytes, 4)
-        res = b"\x20\x00\x00\x00\x00\x04"
         # repeat count (2 bytes)
-        res += struct.pack(">H", len(data.zones))
+        _control_status_struct.pack_into(buffer, offset, 0x20, 0, 4, len(data.zones))
+        offset += _control_status_struct.size
 
         # pack the zones
+        pack_into = _zone_control_struct.pack_into
         for zone in data.zones:
-            # Byte 1 Bit 8-7 Keep 0
-            # Byte 1 Bit 6-1 Zone number
-            res += struct.pack(">B", zone.zone_number)
-
-            # Byte 2 Bit 8-7 Zone setting value
-            # Byte 2 Bit 5-4 Keep 0
-            # Byte 2 Bit 3-1 Power
-            res += struct.pack(
-                ">B", (zone.zone_setting_value.value << 5) | (zone.power.value << 0)
-            )
-
             # Byte 3 Value to Set
             if zone.zone_setting_value == ZoneSettingValue.SET_OPEN_PERCENTAGE:
-                res += struct.pack(">B", int(zone.value_to_set * 100))
+                value_to_set = int(zone.value_to_set * 100)
             elif zone.zone_setting_value == ZoneSettingValue.SET_TARGET_SETPOINT:
-                res += struct.pack(">B", int(zone.value_to_set * 10 - 100))
+                value_to_set = int(zone.value_to_set * 10 - 100)
             elif zone.zone_setting_value == ZoneSettingValue.KEEP_SETTING_VALUE:
-                res += b"\xff"
+                value_to_set = 0xFF
             else:
                 raise Exception(f"Unknown zone setting value {zone.zone_setting_value}")
 
-            # Byte 4 Keep 0
-            res += b"\x00"
-
-        return res
+            pack_into(
+                buffer,
+                offset,
+                # Byte 1 Bit 8-7 Keep 0
+                # Byte 1 Bit 6-1 Zone number
+                zone.zone_number,
+                # Byte 2 Bit 8-7 Zone setting value
+                # Byte 2 Bit 5-4 Keep 0
+                # Byte 2 Bit 3-1 Power
+                (zone.zone_setting_value.value << 5) | (zone.power.value << 0),
+                value_to_set,
+                # Byte 4 Keep 0
+            )
+            offset += _zone_control_struct.size
 
-    def _encode_zone_status_data(self, data: ZoneStatusData) -> bytes:
+    def _encode_zone_status_data(
+        self, data: ZoneStatusData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0x21
         # 0
         # no normal data (2 bytes)
         # each repeat data length, only if there is repeat data (2 bytes, 8)
-        res = b"\x21\x00\x00\x00\x00"
-        if len(data.zones) == 0:
-            res += b"\x00"
-        else:
-            res += b"\x08"
         # repeat count (2 bytes)
-        res += struct.pack(">H", len(data.zones))
+        _control_status_struct.pack_into(
+            buffer,
+            offset,
+            0x21,
+            0,
+            _zone_status_struct.size if data.zones else 0,
+            len(data.zones),
+        )
+        offset += _control_status_struct.size
 
         # pack the zone statuses
+        pack_into = _zone_status_struct.pack_into
         for zone in data.zones:
-            # Byte 1 Bit 8-7 Zone power state
-            # Byte 1 Bit 6-1 Zone number
-            res += struct.pack(
-                ">B", (zone.zone_power_state.value << 6) | (zone.zone_number)
-            )
-
-            # Byte 2 Bit 8 control method (temperature = 1, percentage = 0)
-            # Byte 2 Bit 7-1 Open percentage
-            res += struct.pack(
-                ">B", (zone.control_method.value << 7) | int(zone.open_percentage * 100)
+            pack_into(
+                buffer,
+                offset,
+                # Byte 1 Bit 8-7 Zone power state
+                # Byte 1 Bit 6-1 Zone number
+                (zone.zone_power_state.value << 6) | (zone.zone_number),
+                # Byte 2 Bit 8 control method (temperature = 1, percentage = 0)
+                # Byte 2 Bit 7-1 Open percentage
+                (zone.control_method.value << 7) | int(zone.open_percentage * 100),
+                # Byte 3 Set point setpoint=(value+100)/10, 0xFF invalid (None)
+                (0xFF if zone.set_point is None else int(zone.set_point * 10 - 100)),
+                # Byte 4 Bit 8 has sensor
+                # Byte 4 Bit 7-1 NOT USED
+                (zone.has_sensor << 7),
+                # Byte 5-6 Temperature Temperature > 150 invalid (None)
+                (
+                    0x07FF  # The sample packs this
+                    if zone.temperature is None
+                    else int(zone.temperature * 10 + 500)
+                ),
+                # Byte 7 Bit 8-3 NOT USED
+                # Byte 7 Bit 2 Spill active
+                # Byte 7 Bit 1 Low battery
+                (zone.spill_active << 1) | (zone.is_low_battery << 0),
+                # Byte 8 NOT USED
             )
+            offset += _zone_status_struct.size
 
-            # Byte 3 Set point setpoint=(value+100)/10, 0xFF invalid (None)
-            if zone.set_point is None:
-                res += b"\xff"
-            else:
-                res += struct.pack(">B", int(zone.set_point * 10 - 100))
-
-            # Byte 4 Bit 8 has sensor
-            # Byte 4 Bit 7-1 NOT USED
-            res += struct.pack(">B", (zone.has_sensor << 7))
-
-            # Byte 5-6 Temperature Temperature > 150 invalid (None)
-            if zone.temperature is None:
-                res += b"\x07\xff"  # The sample packs this
-            else:
-                res += struct.pack(">H", int(zone.temperature * 10 + 500))
-
-            # Byte 7 Bit 8-3 NOT USED
-            # Byte 7 Bit 2 Spill active
-            # Byte 7 Bit 1 Low battery
-            res += struct.pack(
-                ">B", (zone.spill_active << 1) | (zone.is_low_battery << 0)
-            )
-
-            # Byte 8 NOT USED
-            res += b"\x00"
-
-        return res
-
-    def _encode_ac_control_data(self, data: AcControlData) -> bytes:
+    def _encode_ac_control_data(
+        self, data: AcControlData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0x22
         # 0
         # no normal data (2 bytes)
         # each repeat data length (2 bytes, 4)
-        res = b"\x22\x00\x00\x00\x00\x04"
         # repeat count (2 bytes)
-        res += struct.pack(">H", len(data.ac_control))
+        _control_status_struct.pack_into(
+            buffer, offset, 0x22, 0, 4, len(data.ac_control)
+        )
+        offset += _control_status_struct.size
 
         # pack the ac controls
+        pack_into = _ac_control_struct.pack_into
         for ac in data.ac_control:
-            # Byte 1 Bit 8-5 Power setting
-            # Byte 1 Bit 4-1 AC number
-            res += struct.pack(">B", (ac.power_setting.value << 4) | (ac.ac_number))
-
-            # Byte 2 Bit 8-5 AC mode
-            # Byte 2 Bit 4-1 AC fan speed
-            res += struct.pack(">B", (ac.ac_mode.value << 4) | (ac.ac_fan_speed.value))
-
-            # Byte 3 Setpoint control
-            res += struct.pack(">B", ac.setpoint_control.value)
-
             # Byte 4 Setpoint value (Available when byte 3 is Change setpoint)
             match ac.setpoint_control:
                 case SetpointControl.CHANGE_SETPOINT:
-                    res += struct.pack(">B", int(ac.setpoint * 10 - 100))
+                    setpoint = int(ac.setpoint * 10 - 100)
                 case (
                     SetpointControl.KEEP_SETPOINT_VALUE
                     | SetpointControl.INVALIDATE_DATA
                 ):
-                    res += b"\xff"
+                    setpoint = 0xFF
                 case _:
                     raise Exception(
                         f"Unsupported setpoint control {ac.setpoint_control}"
                     )
 
-        return res
+            pack_into(
+                buffer,
+                offset,
+                # Byte 1 Bit 8-5 Power setting
+                # Byte 1 Bit 4-1 AC number
+                (ac.power_setting.value << 4) | (ac.ac_number),
+                # Byte 2 Bit 8-5 AC mode
+                # Byte 2 Bit 4-1 AC fan speed
+                (ac.ac_mode.value << 4) | (ac.ac_fan_speed.value),
+                # Byte 3 Setpoint control
+                ac.setpoint_control.value,
+                setpoint,
+            )
+            offset += _ac_control_struct.size
 
-    def _encode_ac_status_data(self, data: AcStatusData) -> bytes:
+    def _encode_ac_status_data(
+        self, data: AcStatusData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0x23
         # 0
         # no normal data (2 bytes)
         # each repeat data length, only if there is repeat data (2 bytes, 10)
-        res = b"\x23\x00\x00\x00\x00"
-        if len(data.ac_status) == 0:
-            res += b"\x00"
-        else:
-            res += b"\x0a"
         # repeat count (2 bytes)
-        res += struct.pack(">H", len(data.ac_status))
+        _control_status_struct.pack_into(
+            buffer,
+            offset,
+            0x23,
+            0,
+            _ac_status_struct.size if data.ac_status else 0,
+            len(data.ac_status),
+        )
+        offset += _control_status_struct.size
 
         # pack the ac statuses
+        pack_into = _ac_status_struct.pack_into
         for ac in data.ac_status:
-            # Byte 1 Bit 8-5 AC power state
-            # Byte 1 Bit 4-1 AC number
-            res += struct.pack(">B", (ac.ac_power_state.value << 4) | (ac.ac_number))
-
-            # Byte 2 Bit 8-5 AC mode
-            # Byte 2 Bit 4-1 AC fan speed
-            res += struct.pack(">B", (ac.ac_mode.value << 4) | (ac.ac_fan_speed.value))
-
-            # Byte 3 Setpoint (0xFF if Not Available)
-            if ac.ac_setpoint is None:
-                res += b"\xff"
-            else:
-                res += struct.pack(">B", int(ac.ac_setpoint * 10 - 100))
-
-            # Byte 4 Bit 8-5 NOT USED (Packed as C in the sample)
-            # Byte 4 Bit 4 Turbo active
-            # Byte 4 Bit 3 Bypass active
-            # Byte 4 Bit 2 Spill active
-            # Byte 4 Bit 1 Timer set
-            res += struct.pack(
-                ">B",
+            pack_into(
+                buffer,
+                offset,
+                # Byte 1 Bit 8-5 AC power state
+                # Byte 1 Bit 4-1 AC number
+                (ac.ac_power_state.value << 4) | (ac.ac_number),
+                # Byte 2 Bit 8-5 AC mode
+                # Byte 2 Bit 4-1 AC fan speed
+                (ac.ac_mode.value << 4) | (ac.ac_fan_speed.value),
+                # Byte 3 Setpoint (0xFF if Not Available)
+                (0xFF if ac.ac_setpoint is None else int(ac.ac_setpoint * 10 - 100)),
+                # Byte 4 Bit 8-5 NOT USED (Packed as C in the sample)
+                # Byte 4 Bit 4 Turbo active
+                # Byte 4 Bit 3 Bypass active
+                # Byte 4 Bit 2 Spill active
+                # Byte 4 Bit 1 Timer set
                 0xC0
                 | ac.turbo_active << 3
                 | ac.bypass_active << 2
                 | ac.spill_active << 1
                 | ac.timer_set << 0,
+                # Byte 5-6 Temperature (0x07FF if Not Available)
+                (0x07FF if ac.temperature is None else int(ac.temperature * 10 + 500)),
+                # Byte 7-8 Error code
+                ac.error_code,
+                # Byte 9-10 NOT USED (Sample packs 8000)
+                0x8000,
             )
+            offset += _ac_status_struct.size
 
-            # Byte 5-6 Temperature (0x07FF if Not Available)
-            if ac.temperature is None:
-                res += b"\x07\xff"
-            else:
-                res += struct.pack(">H", int(ac.temperature * 10 + 500))
-
-            # Byte 7-8 Error code
-            res += struct.pack(">H", ac.error_code)
-
-            # Byte 9-10 NOT USED (Sample packs 8000)
-            res += b"\x80\x00"
-
-        return res
-
-    def _encode_ac_ability_request_data(self, data: AcAbilityRequestData) -> bytes:
+    def _encode_ac_ability_request_data(
+        self, data: AcAbilityRequestData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF11
-        res = b"\xff\x11"
+        _extended_struct.pack_into(buffer, offset, 0xFF11)
 
         if data.ac_number is not None:
-            res += struct.pack(">B", data.ac_number)
-
-        return res
+            buffer[offset + _extended_struct.size] = data.ac_number
 
-    def _encode_ac_ability_data(self, data: AcAbilityData) -> bytes:
+    def _encode_ac_ability_data(
+        self, data: AcAbilityData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF11
-        res = b"\xff\x11"
+        _extended_struct.pack_into(buffer, offset, 0xFF11)
+        offset += _extended_struct.size
 
         # Pack each ac
+        pack_into = _ac_ability_struct.pack_into
         for ac in data.ac_ability:
-            # Byte 3 AC number
-            res += struct.pack(">B", ac.ac_number)
-
-            # Byte 4 Following data length (24)
-            res += b"\x18"
-
-            # Byte 5-20 AC Name (Null padded)
-            res += ac.ac_name.encode("ascii").ljust(16, b"\x00")
-
-            # Byte 21 start zone number
-            res += struct.pack(">B", ac.start_zone_number)
-
-            # Byte 22 zone count
-            res += struct.pack(">B", ac.zone_count)
-
-            # Byte 23 Bit 8-6 NOT USED
-            # Byte 23 Bit 5 Cool mode supported
-            # Byte 23 Bit 4 Fan mode supported
-            # Byte 23 Bit 3 Dry mode supported
-            # Byte 23 Bit 2 Heat mode supported
-            # Byte 23 Bit 1 Auto mode supported
-            res += struct.pack(
-                ">B",
+            pack_into(
+                buffer,
+                offset,
+                # Byte 3 AC number
+                ac.ac_number,
+                # Byte 4 Following data length (24)
+                0x18,
+                # Byte 5-20 AC Name (Null padded)
+                ac.ac_name.encode("ascii"),
+                # Byte 21 start zone number
+                ac.start_zone_number,
+                # Byte 22 zone count
+                ac.zone_count,
+                # Byte 23 Bit 8-6 NOT USED
+                # Byte 23 Bit 5 Cool mode supported
+                # Byte 23 Bit 4 Fan mode supported
+                # Byte 23 Bit 3 Dry mode supported
+                # Byte 23 Bit 2 Heat mode supported
+                # Byte 23 Bit 1 Auto mode supported
                 0x00
                 | ac.supports_mode_cool << 4
                 | ac.supports_mode_fan << 3
                 | ac.supports_mode_dry << 2
                 | ac.supports_mode_heat << 1
                 | ac.supports_mode_auto << 0,
-            )
-
-            # Byte 24 Bit 8 Supports intelligent auto fan speed
-            # Byte 24 Bit 7 Supports turbo fan speed
-            # Byte 24 Bit 6 Supports powerful fan speed
-            # Byte 24 Bit 5 Supports high fan speed
-            # Byte 24 Bit 4 Supports medium fan speed
-            # Byte 24 Bit 3 Supports low fan speed
-            # Byte 24 Bit 2 Supports quiet fan speed
-            # Byte 24 Bit 1 Supports auto fan speed
-            res += struct.pack(
-                ">B",
+                # Byte 24 Bit 8 Supports intelligent auto fan speed
+                # Byte 24 Bit 7 Supports turbo fan speed
+                # Byte 24 Bit 6 Supports powerful fan speed
+                # Byte 24 Bit 5 Supports high fan speed
+                # Byte 24 Bit 4 Supports medium fan speed
+                # Byte 24 Bit 3 Supports low fan speed
+                # Byte 24 Bit 2 Supports quiet fan speed
+                # Byte 24 Bit 1 Supports auto fan speed
                 0x00
                 | ac.supports_fan_speed_intelligent_auto << 7
                 | ac.supports_fan_speed_turbo << 6
@@ -351,88 +447,98 @@ class PacketEncoder:
                 | ac.supports_fan_speed_low << 2
                 | ac.supports_fan_speed_quiet << 1
                 | ac.supports_fan_speed_auto << 0,
+                # Byte 25 Min cool set point
+                ac.min_cool_set_point,
+                # Byte 26 Max cool set point
+                ac.max_cool_set_point,
+                # Byte 27 Min heat set point
+                ac.min_heat_set_point,
+                # Byte 28 Max heat set point
+                ac.max_heat_set_point,
             )
-
-            # Byte 25 Min cool set point
-            res += struct.pack(">B", ac.min_cool_set_point)
-            # Byte 26 Max cool set point
-            res += struct.pack(">B", ac.max_cool_set_point)
-            # Byte 27 Min heat set point
-            res += struct.pack(">B", ac.min_heat_set_point)
-            # Byte 28 Max heat set point
-            res += struct.pack(">B", ac.max_heat_set_point)
-
-        return res
+            offset += _ac_ability_struct.size
 
     def _encode_ac_error_information_request_data(
-        self, data: AcErrorInformationRequestData
-    ) -> bytes:
+        self,
+        data: AcErrorInformationRequestData,
+        buffer: bytearray | memoryview,
+        offset: int,
+    ) -> None:
         # Sub message type 0xFF10
-        res = b"\xff\x10"
+        _extended_struct.pack_into(buffer, offset, 0xFF10)
 
         if data.ac_number is not None:
-            res += struct.pack(">B", data.ac_number)
+            buffer[offset + _extended_struct.size] = data.ac_number
 
-        return res
-
-    def _encode_ac_error_information_data(self, data: AcErrorInformationData) -> bytes:
+    def _encode_ac_error_information_data(
+        self, data: AcErrorInformationData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF10
-        res = b"\xff\x10"
+        _extended_struct.pack_into(buffer, offset, 0xFF10)
+        offset += _extended_struct.size
 
         # Byte 3 AC number
-        res += struct.pack(">B", data.ac_number)
         # Byte 4 Error info length (0 if no error)
-        res += struct.pack(">B", len(data.error_info))
+        _number_length_struct.pack_into(
+            buffer, offset, data.ac_number, len(data.error_info)
+        )
+        offset += _number_length_struct.size
         # Byte 5.. Error info (no bytes if no error, no null at end)
-        res += data.error_info.encode("ascii")
-
-        return res
+        buffer[offset : offset + len(data.error_info)] = data.error_info.encode("ascii")
 
-    def _encode_zone_name_request_data(self, data: ZoneNameRequestData) -> bytes:
+    def _encode_zone_name_request_data(
+        self, data: ZoneNameRequestData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF13
-        res = b"\xff\x13"
+        _extended_struct.pack_into(buffer, offset, 0xFF13)
 
         if data.zone_number is not None:
-            res += struct.pack(">B", data.zone_number)
+            buffer[offset + _extended_struct.size] = data.zone_number
 
-        return res
-
-    def _encode_zone_name_data(self, data: ZoneNameData) -> bytes:
+    def _encode_zone_name_data(
+        self, data: ZoneNameData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF13
-        res = b"\xff\x13"
+        _extended_struct.pack_into(buffer, offset, 0xFF13)
+        offset += _extended_struct.size
 
         # Pack each zone
         for zone in data.zone_names:
             # Byte 3 Zone number
-            res += struct.pack(">B", zone.zone_number)
-
             # Byte 4 Name length
-            res += struct.pack(">B", len(zone.zone_name))
+            _number_length_struct.pack_into(
+                buffer, offset, zone.zone_number, len(zone.zone_name)
+            )
+            offset += _number_length_struct.size
 
             # Byte 5.. Zone name (no null at end)
-            res += zone.zone_name.encode("ascii")
-
-        return res
+            buffer[offset : offset + len(zone.zone_name)] = zone.zone_name.encode(
+                "ascii"
+            )
+            offset += len(zone.zone_name)
 
     def _encode_console_version_request_data(
-        self, data: ConsoleVersionRequestData
-    ) -> bytes:
+        self,
+        data: ConsoleVersionRequestData,
+        buffer: bytearray | memoryview,
+        offset: int,
+    ) -> None:
         # Sub message type 0xFF30
-        res = b"\xff\x30"
-
-        return res
+        _extended_struct.pack_into(buffer, offset, 0xFF30)
 
-    def _encode_console_version_data(self, data: ConsoleVersionData) -> bytes:
+    def _encode_console_version_data(
+        self, data: ConsoleVersionData, buffer: bytearray | memoryview, offset: int
+    ) -> None:
         # Sub message type 0xFF30
-        res = b"\xff\x30"
+        _extended_struct.pack_into(buffer, offset, 0xFF30)
+        offset += _extended_struct.size
 
         # Byte 3 Update sign (0 - latest, Other - new version available)
-        res += struct.pack(">B", data.has_update)
-
         # Byte 4 Version length
-        res += struct.pack(">B", len(data.version))
+        _number_length_struct.pack_into(
+            buffer, offset, data.has_update, len(data.version)
+        )
+        offset += _number_length_struct.size
 
         # Byte 5.. Version (no null at end)
-        res += data.version.encode("ascii")
-
-        return res
+        buffer[offset : offset + len(data.version)] = data.version.encode("ascii")
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Callable
+
+# Size of the receive buffer the event loop reads in to
+RECEIVE_BUFFER_SIZE = 16 * 1024
+
+
+class PacketProtocol(asyncio.BufferedProtocol):
+    """
+    A BufferedProtocol for the Airtouch5Client connection, used instead of a StreamReader read loop.
+
+    The event loop reads straight in to one receive buffer that is reused for the life of the connection,
+    and data_received is called with a view of the new bytes synchronously from the loop,
+    so there is no task to wake and no bytes object to allocate for each chunk.
+
+    Reading starts paused, so nothing is received before the owner is ready for it, call resume_reading to start.
+    Writes go through the same write / drain / close / wait_closed methods as a StreamWriter.
+    """
+
+    # Called with a view of each chunk received, the view is only valid until it returns
+    data_received: Callable[[memoryview], None]
+    # Called with this protocol when the connection is lost, and the exception if it was lost because of an error
+    lost: Callable[["PacketProtocol", Exception | None], None]
+
+    _transport: asyncio.Transport | None
+    _buffer: bytearray
+    _view: memoryview
+    # Set while the transport's write buffer is full
+    _drain_waiter: asyncio.Future[None] | None
+    _closed: asyncio.Future[None]
+
+    def __init__(
+        self,
+        data_received: Callable[[memoryview], None],
+        lost: Callable[["PacketProtocol", Exception | None], None],
+        buffer_size: int = RECEIVE_BUFFER_SIZE,
+    ):
+        self.data_received = data_received
+        self.lost = lost
+        self._transport = None
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._drain_waiter = None
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+        transport.pause_reading()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._view
+
+    def buffer_updated(self, nbytes: int) -> None:
+        with self._view[:nbytes] as data:
+            self.data_received(data)
+
+    def eof_received(self) -> bool:
+        # Close the transport, connection_lost follows
+        return False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._transport = None
+        if not self._closed.done():
+            self._closed.set_result(None)
+        self._wake_drain(exc or ConnectionResetError("Connection lost"))
+        self.lost(self, exc)
+
+    def pause_writing(self) -> None:
+        if self._drain_waiter is None:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            # The writer may have gone away, don't warn about an unretrieved exception
+            self._drain_waiter.add_done_callback(
+                lambda f: f.cancelled() or f.exception()
+            )
+
+    def resume_writing(self) -> None:
+        self._wake_drain()
+
+    def _wake_drain(self, exc: Exception | None = None) -> None:
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    def pause_reading(self) -> None:
+        if self._transport is not None:
+            self._transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.resume_reading()
+
+    def write(self, data: bytes | bytearray) -> None:
+        if self._transport is None or self._transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+        self._transport.write(data)
+
+    async def drain(self) -> None:
+        """
+        Wait until the transport's write buffer has room again.
+        """
+        if self._transport is None:
+            raise ConnectionResetError("Connection lost")
+        if self._drain_waiter is not None:
+            await asyncio.shield(self._drain_waiter)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    async def wait_closed(self) -> None:
+        await self._closed
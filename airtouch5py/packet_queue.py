@@ -0,0 +1,187 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Any
+
+from airtouch5py.packets.ac_status import AcStatusData
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_status import ZoneStatusData
+
+
+class OverflowPolicy(Enum):
+    # Make the reader wait for space, so the console's TCP window fills up and it stops sending
+    BLOCK = 1
+    # Throw away the oldest queued packet to make space
+    DROP_OLDEST = 2
+    # Keep only the newest status of each zone / AC, then throw away the oldest packet if still full
+    COALESCE = 3
+
+
+class PacketQueue:
+    """
+    The queue between the socket reader and the consumer, with the same interface as asyncio.Queue.
+
+    With a maxsize of 0 it is unbounded. Otherwise policy decides what happens to data packets when it is full.
+    Connection state changes are never dropped or delayed, so they can take the queue over maxsize.
+
+    With OverflowPolicy.COALESCE a status for a zone or AC replaces any older status for it that is still
+    queued (even when the queue isn't full), older status snapshots have no value once a newer one exists.
+    Replaced status packets are copied rather than modified, they may be the reply to a request.
+    """
+
+    maxsize: int
+    policy: OverflowPolicy
+    # Data packets thrown away to make space
+    dropped: int
+    # Zone / AC statuses replaced by a newer one
+    coalesced: int
+
+    _items: deque[Any]
+    _getters: deque[asyncio.Future[None]]
+    _putters: deque[asyncio.Future[None]]
+
+    def __init__(self, maxsize: int = 0, policy: OverflowPolicy = OverflowPolicy.BLOCK):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self._items = deque()
+        self._getters = deque()
+        self._putters = deque()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._items)
+
+    async def put(self, item: Any) -> None:
+        """
+        Put an item in the queue, waiting for space if it is full and the policy is BLOCK.
+        """
+        while (
+            self.policy is OverflowPolicy.BLOCK
+            and isinstance(item, DataPacket)
+            and self.full()
+        ):
+            await self._wait(self._putters)
+        self.put_nowait(item)
+
+    def put_nowait(self, item: Any) -> None:
+        """
+        Put an item in the queue without waiting.
+        Throws asyncio.QueueFull if it is full and the policy is BLOCK.
+        """
+        if isinstance(item, DataPacket) and self.maxsize > 0:
+            if self.policy is OverflowPolicy.COALESCE:
+                self._coalesce(item)
+            if self.full():
+                if self.policy is OverflowPolicy.BLOCK:
+                    raise asyncio.QueueFull
+                self._drop_oldest()
+
+        self._items.append(item)
+        self._wake(self._getters)
+
+    async def get(self) -> Any:
+        """
+        Remove and return an item, waiting for one if the queue is empty.
+        """
+        while not self._items:
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    def get_nowait(self) -> Any:
+        """
+        Remove and return an item, throws asyncio.QueueEmpty if the queue is empty.
+        """
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        self._wake(self._putters)
+        return item
+
+    async def _wait(self, waiters: deque[asyncio.Future[None]]) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except:
+            waiter.cancel()
+            if waiter in waiters:
+                waiters.remove(waiter)
+            else:
+                # We were woken and then cancelled, pass the wake up on
+                self._wake(waiters)
+            raise
+
+    def _wake(self, waiters: deque[asyncio.Future[None]]) -> None:
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _drop_oldest(self) -> None:
+        for index, queued in enumerate(self._items):
+            if isinstance(queued, DataPacket):
+                del self._items[index]
+                self.dropped += 1
+                return
+        # Only connection state changes are queued, go over maxsize rather than lose one
+
+    def _coalesce(self, packet: DataPacket) -> None:
+        """
+        Take the zones / ACs in packet out of the older status packets still in the queue.
+        """
+        data = packet.data
+        if isinstance(data, ZoneStatusData):
+            data_type: type = ZoneStatusData
+            numbers = {zone.zone_number for zone in data.zones}
+        elif isinstance(data, AcStatusData):
+            data_type = AcStatusData
+            numbers = {ac.ac_number for ac in data.ac_status}
+        else:
+            return
+
+        if not any(
+            isinstance(queued, DataPacket) and isinstance(queued.data, data_type)
+            for queued in self._items
+        ):
+            return
+
+        items: deque[Any] = deque()
+        for queued in self._items:
+            if isinstance(queued, DataPacket) and isinstance(queued.data, data_type):
+                queued = self._without(queued, numbers)
+                if queued is None:
+                    continue
+            items.append(queued)
+        self._items = items
+
+    def _without(self, packet: DataPacket, numbers: set[int]) -> DataPacket | None:
+        """
+        A copy of the status packet without the given zones / ACs, or None if there are none left.
+        """
+        data = packet.data
+        if isinstance(data, ZoneStatusData):
+            zones = [zone for zone in data.zones if zone.zone_number not in numbers]
+            removed = len(data.zones) - len(zones)
+            new_data: ZoneStatusData | AcStatusData = ZoneStatusData(zones)
+            remaining = len(zones)
+        else:
+            assert isinstance(data, AcStatusData)
+            acs = [ac for ac in data.ac_status if ac.ac_number not in numbers]
+            removed = len(data.ac_status) - len(acs)
+            new_data = AcStatusData(acs)
+            remaining = len(acs)
+
+        if removed == 0:
+            return packet
+        self.coalesced += removed
+        if remaining == 0:
+            return None
+        return DataPacket(packet.address, packet.message_id, new_data)
@@ -1,6 +1,8 @@
 import logging
 
+from airtouch5py.crc16 import crc16_modbus
 from airtouch5py.packet_decoder import PacketDecoder
+from airtouch5py.packet_fields import MessageType
 from airtouch5py.packets.datapacket import DataPacket
 
 _LOGGER = logging.getLogger(__name__)
@@ -9,23 +11,71 @@ _LOGGER = logging.getLogger(__name__)
 MINIMUM_PACKET_LENGTH = 12
 HEADER = b"\x55\x55\x55\xaa"
 
+# The addresses packets are sent to (0x80B0 / 0x90B0 extended) and replied from (0xB080 / 0xB090)
+ADDRESSES = frozenset((0x80B0, 0x90B0, 0xB080, 0xB090))
+MESSAGE_TYPES = frozenset(message_type.value for message_type in MessageType)
+
+# The largest data length we will wait for. The biggest real messages (zone names for 16 zones) are a few hundred bytes,
+# anything bigger is a corrupted length field and we resync instead of waiting for bytes that will never arrive.
+MAXIMUM_DATA_LENGTH = 1024
+
+# Consumed bytes are only removed from the front of the buffer once there are at least this many of them
+COMPACT_THRESHOLD = 4096
+
 
 class PacketReader:
     """
     Provide the bytes received from the airtouch 5 socket, and this class will find the packets, decode them, and return them.
+
+    A header followed by an unknown address or message type is not a real one (it is packet data that happens to
+    look like a header), it is skipped without waiting for the length it claims.
+    Packets with a data length over max_data_length or a bad CRC are dropped, the reader then resyncs on the next header.
+    The number of dropped packets is counted in header_errors, length_errors, crc_errors and decode_errors.
+
+    Received bytes are appended to a single buffer and consumed by moving a read offset forward,
+    the consumed bytes are only dropped from the buffer once enough of them have built up.
     """
 
     _buffer: bytearray
-    _packet_decoder = PacketDecoder()
-
-    def __init__(self):
+    # Index of the first unconsumed byte in _buffer
+    _offset: int
+    _packet_decoder: PacketDecoder
+
+    max_data_length: int
+    # Headers skipped because the address or message type after them was unknown
+    header_errors: int
+    # Packets dropped because the data length was over max_data_length
+    length_errors: int
+    # Packets dropped because the CRC didn't match
+    crc_errors: int
+    # Packets dropped because the decoder raised
+    decode_errors: int
+
+    def __init__(self, max_data_length: int = MAXIMUM_DATA_LENGTH):
         self._buffer = bytearray()
+        self._offset = 0
+        self._packet_decoder = PacketDecoder()
+        self.max_data_length = max_data_length
+        self.header_errors = 0
+        self.length_errors = 0
+        self.crc_errors = 0
+        self.decode_errors = 0
+
+    def reset(self) -> None:
+        """
+        Throw away any partially received packet, call this when starting to read a new stream.
+        """
+        self._buffer.clear()
+        self._offset = 0
 
     def read(self, data: bytes) -> list[DataPacket]:
         """
         Read the data and return a list of packets.
         """
-        self._buffer.extend(data)
+        buffer = self._buffer
+        buffer.extend(data)
+        offset = self._offset
+        end = len(buffer)
 
         packets = []
 
@@ -34,29 +84,68 @@ class PacketReader:
         # consecutive 0x55s in the message. The inserted 00 is redundant bytes
         # ^^ In testing this actually doesn't happen. I named a zone UUUUUUU and it didn't insert any 00s
 
-        while len(self._buffer) >= MINIMUM_PACKET_LENGTH:
-            # Seek until we find the header
-            while len(self._buffer) > 0 and not self._buffer.startswith(HEADER):
-                self._buffer.pop(0)
-
-            # If we don't have enough data for a packet, then we can't do anything
-            if len(self._buffer) < MINIMUM_PACKET_LENGTH:
-                break
-
-            # Check if we have a full packet (Data length is now bytes 9-10)
-            data_length = int.from_bytes(self._buffer[8:10], byteorder="big")
-            packet_length = data_length + MINIMUM_PACKET_LENGTH
-            if len(self._buffer) < packet_length:
-                break
-
-            # Decode the packet
-            try:
-                packet = self._packet_decoder.decode(self._buffer[:packet_length])
-                packets.append(packet)
-            except Exception as e:
-                _LOGGER.debug(f"Error decoding packet: {e}")
-
-            # remove the packet from the buffer
-            self._buffer = self._buffer[packet_length:]
+        with memoryview(buffer) as view:
+            while end - offset >= MINIMUM_PACKET_LENGTH:
+                # Seek until we find the header
+                if not buffer.startswith(HEADER, offset):
+                    header_index = buffer.find(HEADER, offset)
+                    if header_index == -1:
+                        # Keep the tail in case it is the start of a header that hasn't fully arrived
+                        offset = max(offset, end - len(HEADER) + 1)
+                        break
+                    offset = header_index
+                    continue
+
+                # Only trust the data length of a header followed by a known address and message type
+                address = (buffer[offset + 4] << 8) | buffer[offset + 5]
+                if address not in ADDRESSES or buffer[offset + 7] not in MESSAGE_TYPES:
+                    _LOGGER.debug("Skipping false header with address %04x", address)
+                    self.header_errors += 1
+                    offset += 1
+                    continue
+
+                # Check if we have a full packet (Data length is now bytes 9-10)
+                data_length = (buffer[offset + 8] << 8) | buffer[offset + 9]
+                if data_length > self.max_data_length:
+                    # Corrupt length, skip this header and look for the next one
+                    _LOGGER.debug("Dropping packet with data length %d", data_length)
+                    self.length_errors += 1
+                    offset += 1
+                    continue
+                packet_length = data_length + MINIMUM_PACKET_LENGTH
+                if end - offset < packet_length:
+                    break
+
+                # Check bytes are a CRC16 of everything after the header
+                packet_end = offset + packet_length
+                crc = (buffer[packet_end - 2] << 8) | buffer[packet_end - 1]
+                if crc != crc16_modbus(view[offset + 4 : packet_end - 2]):
+                    # The length could be what is corrupt, so only skip this header rather than the whole packet
+                    _LOGGER.debug("Dropping packet with bad CRC")
+                    self.crc_errors += 1
+                    offset += 1
+                    continue
+
+                # Decode a copy of the packet, a slice of view would keep the buffer exported (so it couldn't
+                # be resized) for as long as anything holds on to it, like the traceback of a logged exception
+                try:
+                    packet = self._packet_decoder.decode(
+                        view[offset:packet_end].tobytes()
+                    )
+                    packets.append(packet)
+                except Exception as e:
+                    _LOGGER.debug("Error decoding packet: %s", e)
+                    self.decode_errors += 1
+
+                offset = packet_end
+
+        # remove the consumed bytes from the buffer
+        if offset == end:
+            buffer.clear()
+            offset = 0
+        elif offset >= COMPACT_THRESHOLD:
+            del buffer[:offset]
+            offset = 0
+        self._offset = offset
 
         return packets
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 from airtouch5py.packets.datapacket import Data
@@ -51,6 +52,7 @@ class SetpointControl(Enum):
     # Other: Invalidate data (????)
 
 
+@dataclass(slots=True)
 class AcControl:
     power_setting: SetPowerSetting
     ac_number: int
@@ -59,22 +61,6 @@ class AcControl:
     setpoint_control: SetpointControl
     setpoint: float
 
-    def __init__(
-        self,
-        power_setting: SetPowerSetting,
-        ac_number: int,
-        ac_mode: SetAcMode,
-        ac_fan_speed: SetAcFanSpeed,
-        setpoint_control: SetpointControl,
-        setpoint: float,
-    ):
-        self.power_setting = power_setting
-        self.ac_number = ac_number
-        self.ac_mode = ac_mode
-        self.ac_fan_speed = ac_fan_speed
-        self.setpoint_control = setpoint_control
-        self.setpoint = setpoint
-
 
 class AcControlData(Data):
     """
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 from airtouch5py.packets.datapacket import Data
@@ -49,6 +50,7 @@ class AcFanSpeed(Enum):
     # Other: Not available
 
 
+@dataclass(slots=True)
 class AcStatus:
     ac_power_state: AcPowerState
     ac_number: int
@@ -62,32 +64,6 @@ class AcStatus:
     temperature: float | None  # Other: Not available
     error_code: int
 
-    def __init__(
-        self,
-        ac_power_state: AcPowerState,
-        ac_number: int,
-        ac_mode: AcMode,
-        ac_fan_speed: AcFanSpeed,
-        ac_setpoint: float | None,
-        turbo_active: bool,
-        bypass_active: bool,
-        spill_active: bool,
-        timer_set: bool,
-        temperature: float | None,
-        error_code: int,
-    ):
-        self.ac_power_state = ac_power_state
-        self.ac_number = ac_number
-        self.ac_mode = ac_mode
-        self.ac_fan_speed = ac_fan_speed
-        self.ac_setpoint = ac_setpoint
-        self.turbo_active = turbo_active
-        self.bypass_active = bypass_active
-        self.spill_active = spill_active
-        self.timer_set = timer_set
-        self.temperature = temperature
-        self.error_code = error_code
-
 
 class AcStatusData(Data):
     ac_status: list[AcStatus]
@@ -1,13 +1,21 @@
+from dataclasses import dataclass
+
+
 class Data:
-    pass
+    """
+    The data of a packet, compared by value like the records in it.
+    """
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and vars(self) == vars(other)
 
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
 
+
+@dataclass(slots=True)
 class DataPacket:
     address: int
     message_id: int
     data: Data
-
-    def __init__(self, address: int, message_id: int, data: Data):
-        self.address = address
-        self.message_id = message_id
-        self.data = data
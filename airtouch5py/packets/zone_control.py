@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 from airtouch5py.packets.datapacket import Data
@@ -25,24 +26,13 @@ class ZoneSettingPower(Enum):
     # Other: Keep power state
 
 
+@dataclass(slots=True)
 class ZoneControlZone:
     zone_number: int
     zone_setting_value: ZoneSettingValue
     power: ZoneSettingPower
     value_to_set: float
 
-    def __init__(
-        self,
-        zone_number: int,
-        zone_setting_value: ZoneSettingValue,
-        power: ZoneSettingPower,
-        value_to_set: float,
-    ):
-        self.zone_number = zone_number
-        self.zone_setting_value = zone_setting_value
-        self.power = power
-        self.value_to_set = value_to_set
-
 
 class ZoneControlData(Data):
     """
@@ -1,14 +1,13 @@
+from dataclasses import dataclass
+
 from airtouch5py.packets.datapacket import Data
 
 
+@dataclass(slots=True)
 class ZoneName:
     zone_number: int
     zone_name: str
 
-    def __init__(self, zone_number: int, zone_name: str):
-        self.zone_number = zone_number
-        self.zone_name = zone_name
-
 
 class ZoneNameRequestData(Data):
     zone_number: int | None  # None for all
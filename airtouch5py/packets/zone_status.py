@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 from airtouch5py.packets.datapacket import Data
@@ -14,6 +15,7 @@ class ControlMethod(Enum):
     PERCENTAGE_CONTROL = 0
 
 
+@dataclass(slots=True)
 class ZoneStatusZone:
     zone_power_state: ZonePowerState
     zone_number: int
@@ -25,28 +27,6 @@ class ZoneStatusZone:
     spill_active: bool
     is_low_battery: bool
 
-    def __init__(
-        self,
-        zone_power_state: ZonePowerState,
-        zone_number: int,
-        control_method: ControlMethod,
-        open_percentage: float,
-        set_point: float | None,
-        has_sensor: bool,
-        temperature: float | None,
-        spill_active: bool,
-        is_low_battery: bool,
-    ):
-        self.zone_power_state = zone_power_state
-        self.zone_number = zone_number
-        self.control_method = control_method
-        self.open_percentage = open_percentage
-        self.set_point = set_point
-        self.has_sensor = has_sensor
-        self.temperature = temperature
-        self.spill_active = spill_active
-        self.is_low_battery = is_low_battery
-
 
 class ZoneStatusData(Data):
     """
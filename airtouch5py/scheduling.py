@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import math
+import random
+from typing import Any, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Backoff:
+    """
+    Delay before each reconnect attempt: initial * multiplier ** attempt, capped at maximum.
+    Up to jitter (0 - 1) of the delay is randomly taken off so many clients don't reconnect in lock step.
+    """
+
+    initial: float
+    maximum: float
+    multiplier: float
+    jitter: float
+
+    def __init__(
+        self,
+        initial: float = 5,
+        maximum: float = 300,
+        multiplier: float = 2,
+        jitter: float = 0.5,
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before the given attempt (0 for the first retry).
+        """
+        delay = min(self.maximum, self.initial * self.multiplier**attempt)
+        return delay * (1 - self.jitter * random.random())
+
+
+# Always wait 5 seconds between reconnect attempts
+FIXED_BACKOFF = Backoff(5, 5, 1, 0)
+
+
+class TimerWheelHandle:
+    """
+    A timer scheduled on a TimerWheel, like asyncio.TimerHandle.
+    """
+
+    __slots__ = ("_wheel", "_callback", "_args", "_cancelled")
+
+    def __init__(self, wheel: "TimerWheel", callback: Callable[..., Any], args: tuple):
+        self._wheel = wheel
+        self._callback = callback
+        self._args = args
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        if not self._cancelled:
+            self._cancelled = True
+            self._wheel._pending -= 1
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+class TimerWheel:
+    """
+    Coarse timers for many connections, driven by a single event loop timer.
+
+    Timers are put in buckets of resolution seconds, and a bucket is run once its time has passed,
+    so timers fire up to resolution seconds late. Scheduling and cancelling are O(1).
+    call_later matches asyncio.AbstractEventLoop.call_later, so either can be used for keep-alive checks.
+    """
+
+    resolution: float
+
+    # Bucket number -> timers due in it
+    _buckets: dict[int, list[TimerWheelHandle]]
+    # Timers scheduled and not yet run or cancelled
+    _pending: int
+    _loop: asyncio.AbstractEventLoop | None
+    _tick_handle: asyncio.TimerHandle | None
+
+    def __init__(self, resolution: float = 1.0):
+        self.resolution = resolution
+        self._buckets = {}
+        self._pending = 0
+        self._loop = None
+        self._tick_handle = None
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> TimerWheelHandle:
+        """
+        Call callback(*args) after at least delay seconds. Must be called from the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous loop has gone away. Timers can't move between loops.
+            self._loop = loop
+            self._tick_handle = None
+
+        handle = TimerWheelHandle(self, callback, args)
+        bucket = math.ceil((loop.time() + max(delay, 0)) / self.resolution)
+        self._buckets.setdefault(bucket, []).append(handle)
+        self._pending += 1
+
+        if self._tick_handle is None:
+            self._tick_handle = loop.call_later(self.resolution, self._tick)
+        return handle
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def _tick(self) -> None:
+        loop = self._loop
+        assert loop is not None
+        self._tick_handle = None
+
+        now = loop.time() / self.resolution
+        for bucket in sorted(b for b in self._buckets if b <= now):
+            for handle in self._buckets.pop(bucket):
+                if handle._cancelled:
+                    continue
+                handle._cancelled = True
+                self._pending -= 1
+                try:
+                    handle._callback(*handle._args)
+                except Exception:
+                    _LOGGER.exception("Exception in timer callback")
+
+        if self._pending == 0:
+            # Drop buckets that only held cancelled timers
+            self._buckets.clear()
+        elif self._tick_handle is None:
+            self._tick_handle = loop.call_later(self.resolution, self._tick)
@@ -0,0 +1,488 @@
+import asyncio
+import dataclasses
+import logging
+import random
+
+from airtouch5py.discovery import AirtouchDiscovery
+from airtouch5py.packet_encoder import PacketEncoder
+from airtouch5py.packet_reader import PacketReader
+from airtouch5py.packets.ac_ability import (
+    AcAbility,
+    AcAbilityData,
+    AcAbilityRequestData,
+)
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    AcControlData,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.ac_error_information import (
+    AcErrorInformationData,
+    AcErrorInformationRequestData,
+)
+from airtouch5py.packets.ac_status import (
+    AcFanSpeed,
+    AcMode,
+    AcPowerState,
+    AcStatus,
+    AcStatusData,
+)
+from airtouch5py.packets.console_version import (
+    ConsoleVersionData,
+    ConsoleVersionRequestData,
+)
+from airtouch5py.packets.datapacket import Data, DataPacket
+from airtouch5py.packets.zone_control import (
+    ZoneControlData,
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_name import ZoneName, ZoneNameData, ZoneNameRequestData
+from airtouch5py.packets.zone_status import (
+    ControlMethod,
+    ZonePowerState,
+    ZoneStatusData,
+    ZoneStatusZone,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The console replies from these addresses (the requests are sent to 0x80B0 / 0x90B0)
+ADDRESS = 0xB080
+EXTENDED_ADDRESS = 0xB090
+
+# How much a zone's open percentage / set point moves for VALUE_INCREASE / VALUE_DECREASE
+_PERCENTAGE_STEP = 0.05
+_SET_POINT_STEP = 1
+
+
+class SimulatedConsole:
+    """
+    An AirTouch 5 console running on asyncio, for testing clients without the real thing.
+
+    It answers the requests DataPacketFactory makes from a model of the ACs and zones,
+    applies zone and AC control commands to the model and pushes the new status to every connected client.
+    Use push_status to send an unsolicited update after changing the model directly.
+
+    The knobs make it behave like a bad network:
+    latency delays every reply, loss is the chance (0 - 1) a reply is never sent,
+    fragment_size splits replies in to writes of at most that many bytes, and disconnect_after
+    drops a connection after it has received that many replies.
+    Pass a seed to make loss repeatable.
+    """
+
+    console_id: str
+    system_id: str
+    name: str
+    version: str
+    ac: list[AcAbility]
+    zone_names: list[ZoneName]
+    ac_status: dict[int, AcStatus]
+    zone_status: dict[int, ZoneStatusZone]
+
+    latency: float
+    loss: float
+    fragment_size: int
+    disconnect_after: int | None
+
+    _server: asyncio.Server | None
+    # Connected clients, and how many replies each has been sent
+    _writers: dict[asyncio.StreamWriter, int]
+    _encoder: PacketEncoder
+    _random: random.Random
+
+    def __init__(
+        self,
+        ac_count: int = 1,
+        zones_per_ac: int = 4,
+        console_id: str = "AT5N000000000000",
+        system_id: str = "0000000",
+        name: str = "Simulator",
+        version: str = "1.0.3,1.0.3",
+        latency: float = 0.0,
+        loss: float = 0.0,
+        fragment_size: int = 0,
+        disconnect_after: int | None = None,
+        seed: int | None = None,
+    ):
+        self.console_id = console_id
+        self.system_id = system_id
+        self.name = name
+        self.version = version
+        self.latency = latency
+        self.loss = loss
+        self.fragment_size = fragment_size
+        self.disconnect_after = disconnect_after
+
+        self.ac = []
+        self.ac_status = {}
+        self.zone_names = []
+        self.zone_status = {}
+        for ac_number in range(ac_count):
+            start_zone = ac_number * zones_per_ac
+            self.ac.append(
+                AcAbility(
+                    ac_number,
+                    f"AC {ac_number + 1}",
+                    start_zone,
+                    zones_per_ac,
+                    *([True] * 13),
+                    16,
+                    30,
+                    16,
+                    30,
+                )
+            )
+            self.ac_status[ac_number] = AcStatus(
+                AcPowerState.ON,
+                ac_number,
+                AcMode.COOL,
+                AcFanSpeed.AUTO,
+                24.0,
+                False,
+                False,
+                False,
+                False,
+                25.0,
+                0,
+            )
+            for zone_number in range(start_zone, start_zone + zones_per_ac):
+                self.zone_names.append(ZoneName(zone_number, f"Zone {zone_number + 1}"))
+                self.zone_status[zone_number] = ZoneStatusZone(
+                    ZonePowerState.ON,
+                    zone_number,
+                    ControlMethod.PERCENTAGE_CONTROL,
+                    1.0,
+                    22.0,
+                    True,
+                    23.0,
+                    False,
+                    False,
+                )
+
+        self._server = None
+        self._writers = {}
+        self._encoder = PacketEncoder()
+        self._random = random.Random(seed)
+
+    @property
+    def port(self) -> int:
+        """
+        The port we are listening on, useful after starting on port 0.
+        """
+        if self._server is None:
+            raise Exception("Not started")
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9005) -> None:
+        """
+        Start listening for clients, port 0 picks a free port.
+        """
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+
+    async def stop(self) -> None:
+        """
+        Stop listening and disconnect every client.
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        self.disconnect_clients()
+
+    def disconnect_clients(self) -> None:
+        """
+        Drop every connection, as if the console rebooted or the network went down.
+        """
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    def discovery_response(self, ip: str) -> bytes:
+        """
+        What the console answers a discovery request with.
+        """
+        return f"{ip},{self.console_id},AirTouch5,{self.system_id},{self.name}".encode(
+            "utf-8"
+        )
+
+    def push_status(self) -> None:
+        """
+        Send the zone and AC status to every connected client, like the console does when something changes.
+        """
+        for writer in list(self._writers):
+            self._reply(writer, ADDRESS, 0, self._zone_status_data())
+            self._reply(writer, ADDRESS, 0, self._ac_status_data())
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers[writer] = 0
+        packet_reader = PacketReader()
+        try:
+            while writer in self._writers:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                for packet in packet_reader.read(data):
+                    self._handle_packet(writer, packet)
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.pop(writer, None)
+            writer.close()
+
+    def _handle_packet(self, writer: asyncio.StreamWriter, packet: DataPacket) -> None:
+        data = packet.data
+        message_id = packet.message_id
+        match data:
+            case ZoneControlData():
+                for control in data.zones:
+                    self._apply_zone_control(control)
+                # Every client hears about the change, the client that made it gets its message id back
+                for other in list(self._writers):
+                    self._reply(
+                        other,
+                        ADDRESS,
+                        message_id if other is writer else 0,
+                        self._zone_status_data(),
+                    )
+            case ZoneStatusData():
+                self._reply(writer, ADDRESS, message_id, self._zone_status_data())
+            case AcControlData():
+                for control in data.ac_control:
+                    self._apply_ac_control(control)
+                for other in list(self._writers):
+                    self._reply(
+                        other,
+                        ADDRESS,
+                        message_id if other is writer else 0,
+                        self._ac_status_data(),
+                    )
+            case AcStatusData():
+                self._reply(writer, ADDRESS, message_id, self._ac_status_data())
+            case AcAbilityRequestData():
+                self._reply(
+                    writer,
+                    EXTENDED_ADDRESS,
+                    message_id,
+                    AcAbilityData(
+                        [
+                            ac
+                            for ac in self.ac
+                            if data.ac_number is None or ac.ac_number == data.ac_number
+                        ]
+                    ),
+                )
+            case AcErrorInformationRequestData():
+                self._reply(
+                    writer,
+                    EXTENDED_ADDRESS,
+                    message_id,
+                    AcErrorInformationData(data.ac_number, ""),
+                )
+            case ZoneNameRequestData():
+                self._reply(
+                    writer,
+                    EXTENDED_ADDRESS,
+                    message_id,
+                    ZoneNameData(
+                        [
+                            zone
+                            for zone in self.zone_names
+                            if data.zone_number is None
+                            or zone.zone_number == data.zone_number
+                        ]
+                    ),
+                )
+            case ConsoleVersionRequestData():
+                self._reply(
+                    writer,
+                    EXTENDED_ADDRESS,
+                    message_id,
+                    ConsoleVersionData(False, self.version),
+                )
+            case _:
+                _LOGGER.warning(f"Simulator ignoring {data.__class__.__name__}")
+
+    # Commands are applied here without the client's predictions (state_store.predict_*),
+    # so tests comparing the client's optimistic state with the console's can catch a wrong prediction.
+
+    def _apply_zone_control(self, control: ZoneControlZone) -> None:
+        zone = self.zone_status.get(control.zone_number)
+        if zone is None:
+            return
+        zone = dataclasses.replace(zone)
+
+        match control.zone_setting_value:
+            case ZoneSettingValue.SET_OPEN_PERCENTAGE:
+                zone.control_method = ControlMethod.PERCENTAGE_CONTROL
+                zone.open_percentage = control.value_to_set
+            case ZoneSettingValue.SET_TARGET_SETPOINT:
+                zone.control_method = ControlMethod.TEMPERATURE_CONTROL
+                zone.set_point = control.value_to_set
+            case ZoneSettingValue.VALUE_INCREASE | ZoneSettingValue.VALUE_DECREASE:
+                sign = (
+                    1
+                    if control.zone_setting_value is ZoneSettingValue.VALUE_INCREASE
+                    else -1
+                )
+                if zone.control_method is ControlMethod.TEMPERATURE_CONTROL:
+                    zone.set_point = (zone.set_point or 0) + sign * _SET_POINT_STEP
+                else:
+                    zone.open_percentage = min(
+                        1.0, max(0.0, zone.open_percentage + sign * _PERCENTAGE_STEP)
+                    )
+
+        match control.power:
+            case ZoneSettingPower.SET_TO_OFF:
+                zone.zone_power_state = ZonePowerState.OFF
+            case ZoneSettingPower.SET_TO_ON:
+                zone.zone_power_state = ZonePowerState.ON
+            case ZoneSettingPower.SET_TO_TURBO:
+                zone.zone_power_state = ZonePowerState.TURBO
+            case ZoneSettingPower.CHANGE_ON_OFF_STATE:
+                # Turbo counts as on
+                zone.zone_power_state = (
+                    ZonePowerState.ON
+                    if zone.zone_power_state is ZonePowerState.OFF
+                    else ZonePowerState.OFF
+                )
+        self.zone_status[control.zone_number] = zone
+
+    def _apply_ac_control(self, control: AcControl) -> None:
+        ac = self.ac_status.get(control.ac_number)
+        if ac is None:
+            return
+        ac = dataclasses.replace(ac)
+        is_off = ac.ac_power_state in (AcPowerState.OFF, AcPowerState.AWAY_OFF)
+
+        match control.power_setting:
+            case SetPowerSetting.SET_TO_OFF:
+                ac.ac_power_state = AcPowerState.OFF
+            case SetPowerSetting.SET_TO_ON:
+                ac.ac_power_state = AcPowerState.ON
+            case SetPowerSetting.SET_TO_SLEEP:
+                ac.ac_power_state = AcPowerState.SLEEP
+            case SetPowerSetting.SET_TO_AWAY:
+                ac.ac_power_state = (
+                    AcPowerState.AWAY_OFF if is_off else AcPowerState.AWAY_ON
+                )
+            case SetPowerSetting.CHANGE_ON_OFF_STATUS:
+                ac.ac_power_state = AcPowerState.ON if is_off else AcPowerState.OFF
+
+        match control.ac_mode:
+            case SetAcMode.SET_TO_AUTO:
+                ac.ac_mode = AcMode.AUTO
+            case SetAcMode.SET_TO_HEAT:
+                ac.ac_mode = AcMode.HEAT
+            case SetAcMode.SET_TO_DRY:
+                ac.ac_mode = AcMode.DRY
+            case SetAcMode.SET_TO_FAN:
+                ac.ac_mode = AcMode.FAN
+            case SetAcMode.SET_TO_COOL:
+                ac.ac_mode = AcMode.COOL
+
+        match control.ac_fan_speed:
+            case SetAcFanSpeed.SET_TO_AUTO:
+                ac.ac_fan_speed = AcFanSpeed.AUTO
+            case SetAcFanSpeed.SET_TO_QUIET:
+                ac.ac_fan_speed = AcFanSpeed.QUIET
+            case SetAcFanSpeed.SET_TO_LOW:
+                ac.ac_fan_speed = AcFanSpeed.LOW
+            case SetAcFanSpeed.SET_TO_MEDIUM:
+                ac.ac_fan_speed = AcFanSpeed.MEDIUM
+            case SetAcFanSpeed.SET_TO_HIGH:
+                ac.ac_fan_speed = AcFanSpeed.HIGH
+            case SetAcFanSpeed.SET_TO_POWERFUL:
+                ac.ac_fan_speed = AcFanSpeed.POWERFUL
+            case SetAcFanSpeed.SET_TO_TURBO:
+                ac.ac_fan_speed = AcFanSpeed.TURBO
+            case SetAcFanSpeed.SET_TO_INTELLIGENT_AUTO:
+                ac.ac_fan_speed = AcFanSpeed.INTELLIGENT_AUTO_1
+
+        if control.setpoint_control is SetpointControl.CHANGE_SETPOINT:
+            ac.ac_setpoint = control.setpoint
+        self.ac_status[control.ac_number] = ac
+
+    def _zone_status_data(self) -> ZoneStatusData:
+        return ZoneStatusData(list(self.zone_status.values()))
+
+    def _ac_status_data(self) -> AcStatusData:
+        return AcStatusData(list(self.ac_status.values()))
+
+    def _reply(
+        self, writer: asyncio.StreamWriter, address: int, message_id: int, data: Data
+    ) -> None:
+        if self.loss and self._random.random() < self.loss:
+            return
+        encoded = self._encoder.encode(DataPacket(address, message_id, data))
+        if self.latency:
+            asyncio.get_running_loop().call_later(
+                self.latency, self._write, writer, encoded
+            )
+        else:
+            self._write(writer, encoded)
+
+    def _write(self, writer: asyncio.StreamWriter, encoded: bytes) -> None:
+        if writer.is_closing():
+            return
+        if self.fragment_size:
+            for start in range(0, len(encoded), self.fragment_size):
+                writer.write(encoded[start : start + self.fragment_size])
+        else:
+            writer.write(encoded)
+
+        replies_sent = self._writers.get(writer, 0) + 1
+        self._writers[writer] = replies_sent
+        if self.disconnect_after is not None and replies_sent >= self.disconnect_after:
+            self._writers.pop(writer, None)
+            writer.close()
+
+
+class SimulatorDiscoveryProtocol(asyncio.DatagramProtocol):
+    """
+    Answers AirTouch 5 UDP discovery requests for the given consoles, one response per console.
+    """
+
+    consoles: list[SimulatedConsole]
+    ip: str
+
+    _transport: asyncio.DatagramTransport | None
+
+    def __init__(self, consoles: list[SimulatedConsole], ip: str = "127.0.0.1"):
+        self.consoles = consoles
+        self.ip = ip
+        self._transport = None
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if self._transport is None:
+            return
+        if data != AirtouchDiscovery.DISCOVERY_MESSAGE.encode("utf-8"):
+            return
+        for console in self.consoles:
+            self._transport.sendto(console.discovery_response(self.ip), addr)
+
+
+async def start_discovery_responder(
+    consoles: list[SimulatedConsole],
+    ip: str = "127.0.0.1",
+    host: str = "0.0.0.0",
+    port: int = AirtouchDiscovery.DISCOVERY_PORT,
+) -> asyncio.DatagramTransport:
+    """
+    Answer discovery requests on host:port for the consoles, advertising them at ip.
+    Close the returned transport to stop.
+    """
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: SimulatorDiscoveryProtocol(consoles, ip),
+        local_addr=(host, port),
+        allow_broadcast=True,
+    )
+    return transport
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Iterable
+
+from airtouch5py.callback_dispatcher import DEFAULT_MAX_PENDING, Subscriber
+from airtouch5py.state_store import (
+    AC_STATUS_FIELDS,
+    StateChange,
+    StateChangeKind,
+    StateStore,
+    ZONE_STATUS_FIELDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateEventStream:
+    """
+    The StateChanges of a StateStore as an async iterator, see Airtouch5SimpleClient.events.
+
+    Only changes to the given zones / ACs / fields are built and buffered (None for any).
+    Giving zones but not acs streams only zone changes, and the other way round.
+
+    Each stream has its own buffer, so consumers go at their own pace.
+    Once max_pending changes are waiting the oldest are dropped (counted in dropped).
+    With latest_only a consumer that falls behind only gets the newest value of each field:
+    a change to a field that is already waiting replaces it (keeping its place and old_value).
+
+    Close the stream (or use it with async with) to stop receiving changes, iteration then ends.
+    When the store has a dispatcher the stream is one of its subscribers, named "events".
+    """
+
+    latest_only: bool
+    max_pending: int
+    # Changes dropped because max_pending were already waiting
+    dropped: int
+
+    _unsubscribes: list
+    # The changes waiting, oldest first
+    _pending: deque[StateChange]
+    # Used instead of _pending with latest_only: (kind, number, field) -> the change waiting for it, oldest first
+    _latest: dict[tuple[StateChangeKind, int, str], StateChange]
+    _waiter: asyncio.Future[None] | None
+    _closed: bool
+
+    def __init__(
+        self,
+        store: StateStore,
+        zones: Iterable[int] | None = None,
+        acs: Iterable[int] | None = None,
+        fields: Iterable[str] | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        latest_only: bool = False,
+    ):
+        self.latest_only = latest_only
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending = deque()
+        self._latest = {}
+        self._waiter = None
+        self._closed = False
+
+        if fields is not None:
+            fields = list(fields)
+            unknown = set(fields) - set(ZONE_STATUS_FIELDS) - set(AC_STATUS_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields {sorted(unknown)}")
+        subscriber = Subscriber(self._on_change, name="events")
+        if zones is None and acs is None:
+            self._unsubscribes = [store.subscribe(subscriber, fields=fields)]
+            return
+        self._unsubscribes = []
+        if zones is not None:
+            self._unsubscribes.append(
+                store.subscribe(subscriber, StateChangeKind.ZONE, zones, fields)
+            )
+        if acs is not None:
+            self._unsubscribes.append(
+                store.subscribe(subscriber, StateChangeKind.AC, acs, fields)
+            )
+
+    def _on_change(self, change: StateChange) -> None:
+        if self.latest_only:
+            key = (change.kind, change.number, change.field)
+            waiting = self._latest.get(key)
+            if waiting is not None:
+                # The change is shared with other subscribers, so replace rather than modify it
+                self._latest[key] = StateChange(
+                    change.kind,
+                    change.number,
+                    change.field,
+                    waiting.old_value,
+                    change.new_value,
+                )
+                return
+            if len(self._latest) >= self.max_pending:
+                del self._latest[next(iter(self._latest))]
+                self._dropped()
+            self._latest[key] = change
+        else:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._dropped()
+            self._pending.append(change)
+        self._wake()
+
+    def _dropped(self) -> None:
+        self.dropped += 1
+        if self.dropped == 1:
+            _LOGGER.warning("State event consumer is falling behind, dropping changes")
+
+    def _wake(self) -> None:
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __len__(self) -> int:
+        """
+        The number of changes waiting.
+        """
+        return len(self._latest) if self.latest_only else len(self._pending)
+
+    def __aiter__(self) -> "StateEventStream":
+        return self
+
+    async def __anext__(self) -> StateChange:
+        while not len(self):
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        if self.latest_only:
+            return self._latest.pop(next(iter(self._latest)))
+        return self._pending.popleft()
+
+    def close(self) -> None:
+        """
+        Stop receiving changes, iteration ends once the waiting changes have been taken.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for unsubscribe in self._unsubscribes:
+            unsubscribe()
+        self._wake()
+
+    async def __aenter__(self) -> "StateEventStream":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,458 @@
+import dataclasses
+import logging
+from enum import Enum
+from typing import Any, Callable, Iterable
+
+from airtouch5py.callback_dispatcher import CallbackDispatcher
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.ac_status import AcFanSpeed, AcMode, AcPowerState, AcStatus
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_status import ZonePowerState, ZoneStatusZone
+
+_LOGGER = logging.getLogger(__name__)
+
+# The fields of ZoneStatusZone that are compared to find changes
+ZONE_STATUS_FIELDS = (
+    "zone_power_state",
+    "control_method",
+    "open_percentage",
+    "set_point",
+    "has_sensor",
+    "temperature",
+    "spill_active",
+    "is_low_battery",
+)
+# The fields of AcStatus that are compared to find changes
+AC_STATUS_FIELDS = (
+    "ac_power_state",
+    "ac_mode",
+    "ac_fan_speed",
+    "ac_setpoint",
+    "turbo_active",
+    "bypass_active",
+    "spill_active",
+    "timer_set",
+    "temperature",
+    "error_code",
+)
+
+# What each control setting is expected to change the status to.
+# Settings that aren't listed (keep, increase / decrease, intelligent auto, away) aren't predicted.
+_PREDICTED_ZONE_POWER = {
+    ZoneSettingPower.SET_TO_OFF: ZonePowerState.OFF,
+    ZoneSettingPower.SET_TO_ON: ZonePowerState.ON,
+    ZoneSettingPower.SET_TO_TURBO: ZonePowerState.TURBO,
+}
+_PREDICTED_AC_POWER = {
+    SetPowerSetting.SET_TO_OFF: AcPowerState.OFF,
+    SetPowerSetting.SET_TO_ON: AcPowerState.ON,
+    SetPowerSetting.SET_TO_SLEEP: AcPowerState.SLEEP,
+}
+_PREDICTED_AC_MODE = {
+    SetAcMode.SET_TO_AUTO: AcMode.AUTO,
+    SetAcMode.SET_TO_HEAT: AcMode.HEAT,
+    SetAcMode.SET_TO_DRY: AcMode.DRY,
+    SetAcMode.SET_TO_FAN: AcMode.FAN,
+    SetAcMode.SET_TO_COOL: AcMode.COOL,
+}
+_PREDICTED_AC_FAN_SPEED = {
+    SetAcFanSpeed.SET_TO_AUTO: AcFanSpeed.AUTO,
+    SetAcFanSpeed.SET_TO_QUIET: AcFanSpeed.QUIET,
+    SetAcFanSpeed.SET_TO_LOW: AcFanSpeed.LOW,
+    SetAcFanSpeed.SET_TO_MEDIUM: AcFanSpeed.MEDIUM,
+    SetAcFanSpeed.SET_TO_HIGH: AcFanSpeed.HIGH,
+    SetAcFanSpeed.SET_TO_POWERFUL: AcFanSpeed.POWERFUL,
+    SetAcFanSpeed.SET_TO_TURBO: AcFanSpeed.TURBO,
+}
+
+
+def predict_zone_control(
+    current: ZoneStatusZone | None, control: ZoneControlZone
+) -> dict[str, Any]:
+    """
+    The zone status fields the command is expected to change, and their new values.
+    """
+    predicted: dict[str, Any] = {}
+    if control.zone_setting_value is ZoneSettingValue.SET_OPEN_PERCENTAGE:
+        predicted["open_percentage"] = control.value_to_set
+    elif control.zone_setting_value is ZoneSettingValue.SET_TARGET_SETPOINT:
+        predicted["set_point"] = control.value_to_set
+
+    if control.power in _PREDICTED_ZONE_POWER:
+        predicted["zone_power_state"] = _PREDICTED_ZONE_POWER[control.power]
+    elif control.power is ZoneSettingPower.CHANGE_ON_OFF_STATE and current is not None:
+        predicted["zone_power_state"] = (
+            ZonePowerState.ON
+            if current.zone_power_state is ZonePowerState.OFF
+            else ZonePowerState.OFF
+        )
+    return predicted
+
+
+def predict_ac_control(current: AcStatus | None, control: AcControl) -> dict[str, Any]:
+    """
+    The AC status fields the command is expected to change, and their new values.
+    """
+    predicted: dict[str, Any] = {}
+    if control.power_setting in _PREDICTED_AC_POWER:
+        predicted["ac_power_state"] = _PREDICTED_AC_POWER[control.power_setting]
+    elif (
+        control.power_setting is SetPowerSetting.CHANGE_ON_OFF_STATUS
+        and current is not None
+    ):
+        predicted["ac_power_state"] = (
+            AcPowerState.ON
+            if current.ac_power_state is AcPowerState.OFF
+            else AcPowerState.OFF
+        )
+    if control.ac_mode in _PREDICTED_AC_MODE:
+        predicted["ac_mode"] = _PREDICTED_AC_MODE[control.ac_mode]
+    if control.ac_fan_speed in _PREDICTED_AC_FAN_SPEED:
+        predicted["ac_fan_speed"] = _PREDICTED_AC_FAN_SPEED[control.ac_fan_speed]
+    if control.setpoint_control is SetpointControl.CHANGE_SETPOINT:
+        predicted["ac_setpoint"] = control.setpoint
+    return predicted
+
+
+class StateChangeKind(Enum):
+    ZONE = 1
+    AC = 2
+
+
+class StateChange:
+    """
+    One field of one zone or AC changed.
+    old_value is None the first time a zone or AC is seen.
+    """
+
+    kind: StateChangeKind
+    # Zone number or AC number
+    number: int
+    field: str
+    old_value: Any
+    new_value: Any
+
+    def __init__(
+        self,
+        kind: StateChangeKind,
+        number: int,
+        field: str,
+        old_value: Any,
+        new_value: Any,
+    ):
+        self.kind = kind
+        self.number = number
+        self.field = field
+        self.old_value = old_value
+        self.new_value = new_value
+
+    def __repr__(self) -> str:
+        return f"StateChange({self.kind.name} {self.number} {self.field}: {self.old_value!r} -> {self.new_value!r})"
+
+
+class _Subscription:
+    callback: Callable[[StateChange], None]
+    kind: StateChangeKind | None
+    numbers: frozenset[int] | None
+    fields: frozenset[str] | None
+
+    def __init__(
+        self,
+        callback: Callable[[StateChange], None],
+        kind: StateChangeKind | None,
+        numbers: Iterable[int] | None,
+        fields: Iterable[str] | None,
+    ):
+        self.callback = callback
+        self.kind = kind
+        self.numbers = None if numbers is None else frozenset(numbers)
+        self.fields = None if fields is None else frozenset(fields)
+
+    def matches(self, change: StateChange) -> bool:
+        return (
+            (self.kind is None or self.kind is change.kind)
+            and (self.numbers is None or change.number in self.numbers)
+            and (self.fields is None or change.field in self.fields)
+        )
+
+
+class StateStore:
+    """
+    The latest status of every zone and AC.
+    Incoming records are merged in and compared against the previous record for the same zone / AC,
+    subscribers are called with a StateChange for each field that changed.
+    When nobody is subscribed no changes are built.
+    An exception from a subscriber is logged, the other subscribers and the update carry on.
+    Given a dispatcher, subscribers are called through it instead (see CallbackDispatcher), so they can also be
+    async or run on an executor with Subscriber.
+
+    Control commands can be applied optimistically with apply_zone_control / apply_ac_control, the fields they are
+    expected to change show up in optimistic_zone_status / optimistic_ac_status (and are broadcast) straight away.
+    They are dropped once a status from the console confirms them, or when rolled back (e.g. after a timeout).
+    Changes are broadcast for the optimistic view, which is the same as zone_status / ac_status when nothing is pending.
+    """
+
+    # The latest status received from the console
+    zone_status: dict[int, ZoneStatusZone]
+    ac_status: dict[int, AcStatus]
+
+    dispatcher: CallbackDispatcher | None
+
+    _subscriptions: list[_Subscription]
+    # Number -> fields expected to change and their new values, until confirmed or rolled back
+    _zone_overrides: dict[int, dict[str, Any]]
+    _ac_overrides: dict[int, dict[str, Any]]
+
+    def __init__(self, dispatcher: CallbackDispatcher | None = None):
+        self.dispatcher = dispatcher
+        self.zone_status = {}
+        self.ac_status = {}
+        self._subscriptions = []
+        self._zone_overrides = {}
+        self._ac_overrides = {}
+
+    @property
+    def optimistic_zone_status(self) -> dict[int, ZoneStatusZone]:
+        """
+        zone_status with the pending control commands applied.
+        """
+        return self._optimistic(self.zone_status, self._zone_overrides)
+
+    @property
+    def optimistic_ac_status(self) -> dict[int, AcStatus]:
+        """
+        ac_status with the pending control commands applied.
+        """
+        return self._optimistic(self.ac_status, self._ac_overrides)
+
+    def subscribe(
+        self,
+        callback: Callable[[StateChange], None],
+        kind: StateChangeKind | None = None,
+        numbers: Iterable[int] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> Callable[[], None]:
+        """
+        Call callback for every change matching the filters (None matches everything).
+        numbers are zone numbers or AC numbers, so usually filter on kind too.
+        Returns a function that unsubscribes.
+        """
+        subscription = _Subscription(callback, kind, numbers, fields)
+        self._subscriptions.append(subscription)
+
+        def unsubscribe() -> None:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.remove(subscription)
+            if self.dispatcher is not None and all(
+                s.callback != callback for s in self._subscriptions
+            ):
+                self.dispatcher.remove(callback)
+
+        return unsubscribe
+
+    def update_zones(self, zones: list[ZoneStatusZone]) -> list[StateChange]:
+        """
+        Merge in the zone records, returning (and broadcasting) what changed.
+        """
+        return self._update(
+            StateChangeKind.ZONE,
+            self.zone_status,
+            self._zone_overrides,
+            [(zone.zone_number, zone) for zone in zones],
+            ZONE_STATUS_FIELDS,
+        )
+
+    def update_acs(self, acs: list[AcStatus]) -> list[StateChange]:
+        """
+        Merge in the AC records, returning (and broadcasting) what changed.
+        """
+        return self._update(
+            StateChangeKind.AC,
+            self.ac_status,
+            self._ac_overrides,
+            [(ac.ac_number, ac) for ac in acs],
+            AC_STATUS_FIELDS,
+        )
+
+    def apply_zone_control(self, zones: list[ZoneControlZone]) -> Callable[[], None]:
+        """
+        Show the changes the zone commands are expected to make until the console confirms them.
+        Returns a function that rolls them back, it does nothing once they are confirmed or replaced by a newer command.
+        """
+        return self._apply(
+            StateChangeKind.ZONE,
+            self.zone_status,
+            self._zone_overrides,
+            [
+                (
+                    zone.zone_number,
+                    predict_zone_control(
+                        self._view(
+                            self.zone_status, self._zone_overrides, zone.zone_number
+                        ),
+                        zone,
+                    ),
+                )
+                for zone in zones
+            ],
+            ZONE_STATUS_FIELDS,
+        )
+
+    def apply_ac_control(self, acs: list[AcControl]) -> Callable[[], None]:
+        """
+        Show the changes the AC commands are expected to make until the console confirms them.
+        Returns a function that rolls them back, it does nothing once they are confirmed or replaced by a newer command.
+        """
+        return self._apply(
+            StateChangeKind.AC,
+            self.ac_status,
+            self._ac_overrides,
+            [
+                (
+                    ac.ac_number,
+                    predict_ac_control(
+                        self._view(self.ac_status, self._ac_overrides, ac.ac_number),
+                        ac,
+                    ),
+                )
+                for ac in acs
+            ],
+            AC_STATUS_FIELDS,
+        )
+
+    def _optimistic(self, store: dict, overrides: dict[int, dict[str, Any]]) -> dict:
+        if not overrides:
+            return store
+        view = dict(store)
+        for number, fields in overrides.items():
+            if number in view:
+                view[number] = dataclasses.replace(view[number], **fields)
+        return view
+
+    def _view(
+        self, store: dict, overrides: dict[int, dict[str, Any]], number: int
+    ) -> Any:
+        record = store.get(number)
+        fields = overrides.get(number)
+        if record is None or fields is None:
+            return record
+        return dataclasses.replace(record, **fields)
+
+    def _update(
+        self,
+        kind: StateChangeKind,
+        store: dict,
+        overrides: dict[int, dict[str, Any]],
+        records: list[tuple[int, Any]],
+        fields: tuple[str, ...],
+    ) -> list[StateChange]:
+        subscriptions = self._subscriptions_for(kind)
+        if not subscriptions and not overrides:
+            for number, record in records:
+                store[number] = record
+            return []
+
+        changes: list[StateChange] = []
+        for number, record in records:
+            previous = self._view(store, overrides, number)
+            store[number] = record
+            pending = overrides.get(number)
+            if pending is not None and all(
+                getattr(record, field) == value for field, value in pending.items()
+            ):
+                # Confirmed by the console
+                del overrides[number]
+            if subscriptions:
+                record = self._view(store, overrides, number)
+                self._diff(kind, number, previous, record, fields, changes)
+
+        self._broadcast(subscriptions, changes)
+        return changes
+
+    def _apply(
+        self,
+        kind: StateChangeKind,
+        store: dict,
+        overrides: dict[int, dict[str, Any]],
+        predictions: list[tuple[int, dict[str, Any]]],
+        fields: tuple[str, ...],
+    ) -> Callable[[], None]:
+        subscriptions = self._subscriptions_for(kind)
+        changes: list[StateChange] = []
+        applied: dict[int, dict[str, Any]] = {}
+        for number, predicted in predictions:
+            if number not in store or not predicted:
+                continue
+            previous = self._view(store, overrides, number)
+            # A new dict each time, so rolling back an older command can't undo this one
+            pending = {**overrides.get(number, {}), **predicted}
+            overrides[number] = applied[number] = pending
+            if subscriptions:
+                record = self._view(store, overrides, number)
+                self._diff(kind, number, previous, record, fields, changes)
+        self._broadcast(subscriptions, changes)
+
+        def rollback() -> None:
+            rollback_subscriptions = self._subscriptions_for(kind)
+            rollback_changes: list[StateChange] = []
+            for number, pending in applied.items():
+                if overrides.get(number) is not pending:
+                    continue
+                previous = self._view(store, overrides, number)
+                del overrides[number]
+                if rollback_subscriptions:
+                    self._diff(
+                        kind, number, previous, store[number], fields, rollback_changes
+                    )
+            self._broadcast(rollback_subscriptions, rollback_changes)
+
+        return rollback
+
+    def _subscriptions_for(self, kind: StateChangeKind) -> list[_Subscription]:
+        return [s for s in self._subscriptions if s.kind is None or s.kind is kind]
+
+    def _diff(
+        self,
+        kind: StateChangeKind,
+        number: int,
+        previous: Any,
+        record: Any,
+        fields: tuple[str, ...],
+        changes: list[StateChange],
+    ) -> None:
+        if previous == record:
+            return
+        for field in fields:
+            new_value = getattr(record, field)
+            old_value = None if previous is None else getattr(previous, field)
+            if previous is None or old_value != new_value:
+                changes.append(StateChange(kind, number, field, old_value, new_value))
+
+    def _broadcast(
+        self, subscriptions: list[_Subscription], changes: list[StateChange]
+    ) -> None:
+        dispatcher = self.dispatcher
+        if dispatcher is not None:
+            for change in changes:
+                for subscription in subscriptions:
+                    if subscription.matches(change):
+                        dispatcher.dispatch_to(subscription.callback, change)
+            return
+        for change in changes:
+            for subscription in subscriptions:
+                if subscription.matches(change):
+                    try:
+                        subscription.callback(change)
+                    except Exception:
+                        _LOGGER.exception("Exception in state change callback")
@@ -0,0 +1,70 @@
+import time
+from collections import deque
+from typing import Iterator
+
+from airtouch5py.capture import CaptureDirection
+from airtouch5py.packets.datapacket import DataPacket
+
+
+class TraceEntry:
+    """
+    One decoded packet as it was received or sent.
+    """
+
+    timestamp: float
+    direction: CaptureDirection
+    packet: DataPacket
+
+    def __init__(
+        self, timestamp: float, direction: CaptureDirection, packet: DataPacket
+    ):
+        self.timestamp = timestamp
+        self.direction = direction
+        self.packet = packet
+
+    def format(self) -> str:
+        """
+        The entry as one line, the data is None for message types the decoder doesn't know.
+        """
+        packet = self.packet
+        arrow = "<-" if self.direction is CaptureDirection.RECEIVED else "->"
+        when = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        return (
+            f"{when}.{int(self.timestamp % 1 * 1000):03d} {arrow}"
+            f" {packet.address:04x} #{packet.message_id} {packet.data!r}"
+        )
+
+
+class PacketTrace:
+    """
+    The last maxlen packets received and sent on a connection, give one to Airtouch5Client to turn tracing on.
+
+    Packets are kept decoded and only formatted when dump is called, so tracing costs an append per packet
+    and can be left on for every console. Unlike DEBUG logging nothing is written until it is asked for,
+    e.g. dump it when a console misbehaves.
+    """
+
+    maxlen: int
+    _entries: deque[TraceEntry]
+
+    def __init__(self, maxlen: int = 256):
+        self.maxlen = maxlen
+        self._entries = deque(maxlen=maxlen)
+
+    def record(self, direction: CaptureDirection, packet: DataPacket) -> None:
+        self._entries.append(TraceEntry(time.time(), direction, packet))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[TraceEntry]:
+        return iter(list(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def dump(self) -> str:
+        """
+        The traced packets, oldest first, one per line.
+        """
+        return "\n".join(entry.format() for entry in self)
@@ -0,0 +1,458 @@
+"""
+Benchmarks for the packet reader, decoder, encoder, CRC and the client end to end.
+The client benchmarks run on each event loop that is installed (asyncio, and uvloop if it is installed).
+
+Run from the repository root:
+    python -m benchmarks.run [--quick] [--filter reader] [--json results.json] [--compare baseline.json]
+
+Every result is printed, and with --json written as machine readable results (with the python version,
+platform and CRC implementation) so runs can be compared to find regressions.
+--compare prints each result's speed relative to the same benchmark in an earlier --json file.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from airtouch5py import crc16
+from airtouch5py.airtouch5_client import Airtouch5Client, ClientTransport
+from airtouch5py.data_packet_factory import DataPacketFactory
+from airtouch5py.packet_decoder import PacketDecoder
+from airtouch5py.packet_encoder import PacketEncoder
+from airtouch5py.packet_reader import PacketReader
+from airtouch5py.packets.ac_ability import AcAbilityData
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.ac_error_information import AcErrorInformationData
+from airtouch5py.packets.ac_status import AcStatusData
+from airtouch5py.packets.console_version import ConsoleVersionData
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_name import ZoneNameData
+from airtouch5py.packets.zone_status import ZoneStatusData
+from airtouch5py.simulator import ADDRESS, EXTENDED_ADDRESS, SimulatedConsole
+
+T = TypeVar("T")
+
+
+class BenchmarkResult:
+    name: str
+    params: dict
+    # Number of operations timed in each repeat
+    operations: int
+    # Fastest repeat, and the time of every repeat
+    best_seconds: float
+    seconds: list[float]
+
+    def __init__(self, name: str, params: dict, operations: int, seconds: list[float]):
+        self.name = name
+        self.params = params
+        self.operations = operations
+        self.seconds = seconds
+        self.best_seconds = min(seconds)
+
+    @property
+    def operations_per_second(self) -> float:
+        return self.operations / self.best_seconds
+
+    @property
+    def key(self) -> str:
+        return f"{self.name} {json.dumps(self.params, sort_keys=True)}"
+
+    def to_json(self) -> dict:
+        return {
+            "name": self.name,
+            "params": self.params,
+            "operations": self.operations,
+            "best_seconds": self.best_seconds,
+            "seconds": self.seconds,
+            "operations_per_second": self.operations_per_second,
+        }
+
+
+def _time(function: Callable[[], object], repeat: int) -> list[float]:
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def sample_packets() -> dict[str, DataPacket]:
+    """
+    One packet of each message type, sized like a big real system (4 ACs, 16 zones).
+    """
+    console = SimulatedConsole(ac_count=4, zones_per_ac=4)
+    factory = DataPacketFactory()
+    return {
+        "zone_control": factory.zone_control(
+            [
+                ZoneControlZone(
+                    zone,
+                    ZoneSettingValue.SET_OPEN_PERCENTAGE,
+                    ZoneSettingPower.SET_TO_ON,
+                    0.5,
+                )
+                for zone in range(16)
+            ]
+        ),
+        "zone_status": DataPacket(
+            ADDRESS, 1, ZoneStatusData(list(console.zone_status.values()))
+        ),
+        "ac_control": factory.ac_control(
+            [
+                AcControl(
+                    SetPowerSetting.SET_TO_ON,
+                    ac,
+                    SetAcMode.SET_TO_COOL,
+                    SetAcFanSpeed.SET_TO_AUTO,
+                    SetpointControl.CHANGE_SETPOINT,
+                    24,
+                )
+                for ac in range(4)
+            ]
+        ),
+        "ac_status": DataPacket(
+            ADDRESS, 1, AcStatusData(list(console.ac_status.values()))
+        ),
+        "ac_ability_request": factory.ac_ability_request(),
+        "ac_ability": DataPacket(EXTENDED_ADDRESS, 1, AcAbilityData(console.ac)),
+        "ac_error_information": DataPacket(
+            EXTENDED_ADDRESS, 1, AcErrorInformationData(0, "ER: FFFE")
+        ),
+        "zone_name_request": factory.zone_name_request(),
+        "zone_names": DataPacket(EXTENDED_ADDRESS, 1, ZoneNameData(console.zone_names)),
+        "console_version_request": factory.console_version_request(),
+        "console_version": DataPacket(
+            EXTENDED_ADDRESS, 1, ConsoleVersionData(False, console.version)
+        ),
+    }
+
+
+def status_stream(packets: int, noise_ratio: float, seed: int = 0) -> bytes:
+    """
+    Zone and AC status packets back to back, with noise_ratio random bytes added per packet byte.
+    """
+    encoder = PacketEncoder()
+    samples = sample_packets()
+    encoded = [
+        encoder.encode(samples["zone_status"]),
+        encoder.encode(samples["ac_status"]),
+    ]
+    rng = random.Random(seed)
+    stream = bytearray()
+    for index in range(packets):
+        packet = encoded[index % 2]
+        if noise_ratio:
+            stream += rng.randbytes(int(len(packet) * noise_ratio))
+        stream += packet
+    return bytes(stream)
+
+
+def bench_reader(repeat: int, packets: int) -> list[BenchmarkResult]:
+    results = []
+    for noise_ratio in (0.0, 0.1, 0.5):
+        stream = status_stream(packets, noise_ratio)
+        for chunk_size in (1, 16, 256, 4096):
+            chunks = [
+                stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)
+            ]
+
+            def run():
+                reader = PacketReader()
+                for chunk in chunks:
+                    reader.read(chunk)
+
+            results.append(
+                BenchmarkResult(
+                    "reader.read",
+                    {"chunk_size": chunk_size, "noise_ratio": noise_ratio},
+                    packets,
+                    _time(run, repeat),
+                )
+            )
+    return results
+
+
+def bench_decoder(repeat: int, operations: int) -> list[BenchmarkResult]:
+    encoder = PacketEncoder()
+    decoder = PacketDecoder()
+    results = []
+    for message_type, packet in sample_packets().items():
+        encoded = encoder.encode(packet)
+
+        def run():
+            decode = decoder.decode
+            for _ in range(operations):
+                decode(encoded)
+
+        results.append(
+            BenchmarkResult(
+                "decoder.decode",
+                {"message_type": message_type, "bytes": len(encoded)},
+                operations,
+                _time(run, repeat),
+            )
+        )
+    return results
+
+
+def bench_encoder(repeat: int, operations: int) -> list[BenchmarkResult]:
+    encoder = PacketEncoder()
+    results = []
+    for message_type, packet in sample_packets().items():
+
+        def run():
+            encode = encoder.encode
+            for _ in range(operations):
+                encode(packet)
+
+        results.append(
+            BenchmarkResult(
+                "encoder.encode",
+                {"message_type": message_type},
+                operations,
+                _time(run, repeat),
+            )
+        )
+    return results
+
+
+def bench_crc(repeat: int, operations: int) -> list[BenchmarkResult]:
+    results = []
+    for size in (16, 64, 256):
+        data = random.Random(size).randbytes(size)
+        for implementation, function in (
+            ("crc16_modbus", crc16.crc16_modbus),
+            ("table", crc16._crc16_modbus_table),
+        ):
+
+            def run():
+                for _ in range(operations):
+                    function(data)
+
+            results.append(
+                BenchmarkResult(
+                    "crc16",
+                    {"implementation": implementation, "bytes": size},
+                    operations,
+                    _time(run, repeat),
+                )
+            )
+    return results
+
+
+async def _client_throughput(packets: int, transport: ClientTransport) -> float:
+    """
+    Seconds for Airtouch5Client to receive packets status packets from a loopback server.
+    """
+    stream = status_stream(packets, 0)
+    sent = asyncio.Event()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await sent.wait()
+        writer.write(stream)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    client = Airtouch5Client(
+        "127.0.0.1", server.sockets[0].getsockname()[1], transport=transport
+    )
+    try:
+        await client.connect()
+        await client.packets_received.get()  # CONNECTED
+        start = time.perf_counter()
+        sent.set()
+        for _ in range(packets):
+            await client.packets_received.get()
+        return time.perf_counter() - start
+    finally:
+        await client.disconnect()
+        server.close()
+
+
+def event_loops() -> dict[str, Callable[[], asyncio.AbstractEventLoop]]:
+    """
+    The event loop implementations that are installed, by name.
+    """
+    loops: dict[str, Callable[[], asyncio.AbstractEventLoop]] = {
+        "asyncio": asyncio.new_event_loop
+    }
+    try:
+        import uvloop
+
+        loops["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        pass
+    return loops
+
+
+def _run_on(
+    loop_factory: Callable[[], asyncio.AbstractEventLoop], coroutine: Awaitable[T]
+) -> T:
+    loop = loop_factory()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def bench_client(repeat: int, packets: int) -> list[BenchmarkResult]:
+    results = []
+    for loop, loop_factory in event_loops().items():
+        for transport in ClientTransport:
+            seconds = [
+                _run_on(loop_factory, _client_throughput(packets, transport))
+                for _ in range(repeat)
+            ]
+            results.append(
+                BenchmarkResult(
+                    "client.receive",
+                    {"loop": loop, "transport": transport.name.lower()},
+                    packets,
+                    seconds,
+                )
+            )
+    return results
+
+
+async def _reconnect_latency(reconnects: int, transport: ClientTransport) -> float:
+    """
+    Seconds for Airtouch5Client to connect, get its first packet and disconnect, reconnects times.
+    """
+    first = PacketEncoder().encode(sample_packets()["zone_status"])
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.write(first)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    client = Airtouch5Client(
+        "127.0.0.1", server.sockets[0].getsockname()[1], transport=transport
+    )
+    try:
+        start = time.perf_counter()
+        for _ in range(reconnects):
+            await client.connect()
+            await client.packets_received.get()  # CONNECTED
+            await client.packets_received.get()  # the first packet
+            await client.disconnect()
+        return time.perf_counter() - start
+    finally:
+        server.close()
+
+
+def bench_reconnect(repeat: int, operations: int) -> list[BenchmarkResult]:
+    reconnects = max(1, operations // 20)
+    results = []
+    for loop, loop_factory in event_loops().items():
+        for transport in ClientTransport:
+            seconds = [
+                _run_on(loop_factory, _reconnect_latency(reconnects, transport))
+                for _ in range(repeat)
+            ]
+            results.append(
+                BenchmarkResult(
+                    "client.reconnect",
+                    {"loop": loop, "transport": transport.name.lower()},
+                    reconnects,
+                    seconds,
+                )
+            )
+    return results
+
+
+BENCHMARKS: dict[str, Callable[[int, int], list[BenchmarkResult]]] = {
+    "reader": bench_reader,
+    "decoder": bench_decoder,
+    "encoder": bench_encoder,
+    "crc": bench_crc,
+    "client": bench_client,
+    "reconnect": bench_reconnect,
+}
+
+
+def run(quick: bool = False, only: list[str] | None = None) -> list[BenchmarkResult]:
+    repeat, operations = (1, 20) if quick else (5, 2000)
+    results = []
+    for name, benchmark in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results.extend(benchmark(repeat, operations))
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "crc16": (
+            "table" if crc16.crc16_modbus is crc16._crc16_modbus_table else "crcmod"
+        ),
+        "loops": list(event_loops()),
+        "time": time.time(),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--quick", action="store_true", help="a fast smoke run")
+    parser.add_argument(
+        "--filter", action="append", choices=sorted(BENCHMARKS), help="only run these"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="compare against results written by --json")
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            for previous in json.load(f)["results"]:
+                key = f"{previous['name']} {json.dumps(previous['params'], sort_keys=True)}"
+                baseline[key] = previous["operations_per_second"]
+
+    results = run(args.quick, args.filter)
+    for result in results:
+        params = " ".join(f"{k}={v}" for k, v in result.params.items())
+        line = (
+            f"{result.name:16} {params:48} {result.operations_per_second:>14,.0f} ops/s"
+        )
+        if result.key in baseline:
+            line += f" {result.operations_per_second / baseline[result.key]:>6.2f}x"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "environment": environment(),
+                    "results": [result.to_json() for result in results],
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
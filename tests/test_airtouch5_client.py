@@ -0,0 +1,200 @@
+import asyncio
+
+from airtouch5py.airtouch5_client import (
+    Airtouch5Client,
+    Airtouch5ConnectionStateChange,
+    ClientTransport,
+)
+from airtouch5py.capture import CaptureDirection
+from airtouch5py.packet_encoder import PacketEncoder
+from airtouch5py.packets.console_version import ConsoleVersionData
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_name import ZoneName, ZoneNameData
+from airtouch5py.packets.zone_status import ZoneStatusData
+from airtouch5py.trace import PacketTrace
+
+"""
+Tests for Airtouch5Client against a loopback server
+"""
+
+
+def test_request_replies_matched_by_message_id(start_server):
+    """
+    Two requests in flight, replies arrive in the opposite order after an unsolicited status push.
+    """
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        if len(packets) < 2:
+            return []
+        zone_names, console_version = packets
+        return [
+            DataPacket(0x80B0, 0x00, ZoneStatusData([])),
+            DataPacket(
+                0xB090,
+                console_version.message_id,
+                ConsoleVersionData(False, "1.0.3,1.0.3"),
+            ),
+            DataPacket(
+                0xB090, zone_names.message_id, ZoneNameData([ZoneName(0, "Living")])
+            ),
+        ]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5Client("127.0.0.1", port)
+        await client.connect()
+        try:
+            zone_names = await client.request(
+                client.data_packet_factory.zone_name_request()
+            )
+            console_version = await client.request(
+                client.data_packet_factory.console_version_request()
+            )
+
+            assert (await asyncio.wait_for(console_version, 5)).data.version == (
+                "1.0.3,1.0.3"
+            )
+            assert (await asyncio.wait_for(zone_names, 5)).data.zone_names[
+                0
+            ].zone_name == "Living"
+
+            # Nothing was thrown away, the status push and the replies are all in the queue
+            assert (
+                client.packets_received.get_nowait()
+                is Airtouch5ConnectionStateChange.CONNECTED
+            )
+            received = [client.packets_received.get_nowait() for _ in range(3)]
+            assert [type(p.data) for p in received] == [
+                ZoneStatusData,
+                ConsoleVersionData,
+                ZoneNameData,
+            ]
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_request_fails_on_disconnect(start_server):
+    async def run():
+        server, port = await start_server(lambda packets: [])
+        client = Airtouch5Client("127.0.0.1", port)
+        await client.connect()
+        try:
+            reply = await client.request(
+                client.data_packet_factory.console_version_request()
+            )
+            await client.disconnect()
+
+            assert reply.done()
+            assert reply.exception() is not None
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_trace_keeps_last_packets(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        trace = PacketTrace(maxlen=3)
+        client = Airtouch5Client("127.0.0.1", port, trace=trace)
+        await client.connect()
+        try:
+            factory = client.data_packet_factory
+            replies = await client.request_many(
+                [factory.zone_name_request(), factory.console_version_request()]
+            )
+            await asyncio.wait_for(asyncio.gather(*replies), 5)
+
+            # The zone name request has been pushed out by the newer packets
+            lines = trace.dump().splitlines()
+            assert len(lines) == 3
+            assert "-> " in lines[0] and "ConsoleVersionRequestData" in lines[0]
+            assert "<- " in lines[1] and "ZoneNameData" in lines[1]
+            assert "<- " in lines[2] and "version='1.0.3,1.0.3'" in lines[2]
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_trace_formats_unknown_message_types():
+    trace = PacketTrace()
+    # The decoder returns no data for a message type it doesn't know
+    trace.record(CaptureDirection.RECEIVED, DataPacket(0xB080, 3, None))
+
+    assert trace.dump().endswith("<- b080 #3 None")
+
+
+def test_protocol_transport_request(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5Client("127.0.0.1", port, transport=ClientTransport.PROTOCOL)
+        await client.connect()
+        try:
+            reply = await client.request(
+                client.data_packet_factory.console_version_request()
+            )
+            assert (await asyncio.wait_for(reply, 5)).data.version == "1.0.3,1.0.3"
+        finally:
+            await client.disconnect()
+            server.close()
+
+        assert client.packets_received.get_nowait() is (
+            Airtouch5ConnectionStateChange.CONNECTED
+        )
+        assert isinstance(client.packets_received.get_nowait().data, ConsoleVersionData)
+        assert client.packets_received.get_nowait() is (
+            Airtouch5ConnectionStateChange.DISCONNECTED
+        )
+
+    asyncio.run(run())
+
+
+def test_protocol_transport_pauses_reading_when_queue_is_full():
+    """
+    With a full queue the packets wait for the consumer, and the ones received before the server
+    closed the connection arrive before DISCONNECTED.
+    """
+    encoder = PacketEncoder()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        for message_id in range(5):
+            packet = DataPacket(0xB080, message_id, ZoneStatusData([]))
+            writer.write(encoder.encode(packet))
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        client = Airtouch5Client(
+            "127.0.0.1",
+            server.sockets[0].getsockname()[1],
+            max_queue_size=1,
+            transport=ClientTransport.PROTOCOL,
+        )
+        await client.connect()
+        try:
+            received = []
+            while Airtouch5ConnectionStateChange.DISCONNECTED not in received:
+                received.append(
+                    await asyncio.wait_for(client.packets_received.get(), 5)
+                )
+                await asyncio.sleep(0.01)
+        finally:
+            await client.disconnect()
+            server.close()
+
+        assert received[0] is Airtouch5ConnectionStateChange.CONNECTED
+        assert [packet.message_id for packet in received[1:-1]] == [0, 1, 2, 3, 4]
+
+    asyncio.run(run())
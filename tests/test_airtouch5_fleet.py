@@ -0,0 +1,49 @@
+import asyncio
+
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.airtouch5_fleet import Airtouch5Fleet
+from airtouch5py.packets.datapacket import DataPacket
+
+"""
+Tests for Airtouch5Fleet against loopback servers answering with the examples from the protocol documentation
+"""
+
+
+def test_fleet_connects_every_console(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        servers = [await start_server(handle_requests) for _ in range(3)]
+        fleet = Airtouch5Fleet(max_concurrent_handshakes=1)
+        states: list[Airtouch5ConnectionStateChange] = []
+        fleet.connection_state_callbacks.append(
+            lambda client, state: states.append(state)
+        )
+
+        try:
+            clients = [fleet.add("127.0.0.1", port) for _, port in servers]
+            fleet.start()
+            for _ in range(100):
+                if len(fleet.connected) == 3:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert fleet.summary() == {"total": 3, "connected": 3, "disconnected": 0}
+            assert states == [Airtouch5ConnectionStateChange.CONNECTED] * 3
+            assert all(client.console_version == "1.0.3,1.0.3" for client in clients)
+            # The keep alive checks of every client share one loop timer
+            assert len(fleet.timers) == 3
+            assert fleet.timers._tick_handle is not None
+
+            await fleet.remove("127.0.0.1", servers[0][1])
+            assert fleet.summary() == {"total": 2, "connected": 2, "disconnected": 0}
+        finally:
+            await fleet.stop()
+            for server, _ in servers:
+                server.close()
+
+        assert fleet.connected == set()
+        assert len(fleet.timers) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,364 @@
+import asyncio
+
+import pytest
+from airtouch5py import airtouch5_simple_client
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.discovery import AirtouchDevice
+from airtouch5py.metadata_cache import (
+    ConsoleMetadata,
+    MemoryMetadataCache,
+    metadata_cache_key,
+)
+from airtouch5py.packet_queue import OverflowPolicy
+from airtouch5py.packets.ac_status import AcStatusData
+from airtouch5py.packets.console_version import ConsoleVersionRequestData
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_control import (
+    ZoneControlData,
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_status import ZoneStatusData
+from airtouch5py.simulator import SimulatedConsole
+from airtouch5py.state_store import StateChange
+
+"""
+Tests for Airtouch5SimpleClient against a loopback server answering with the examples from the protocol documentation
+"""
+
+
+def test_connect_pipelined_sends_all_requests_at_once(start_server, reply_to):
+    batches: list[int] = []
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        batches.append(len(packets))
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+
+            assert batches == [5]
+            assert client.ac[0].ac_name == "UNIT"
+            assert [zone.zone_name for zone in client.zones] == [
+                "Living",
+                "Kitchen",
+                "Bedroom",
+            ]
+            assert client.console_version == "1.0.3,1.0.3"
+            assert sorted(client.latest_zone_status) == [0, 1]
+            assert sorted(client.latest_ac_status) == [0, 1]
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_connect_sequential(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        try:
+            await client.connect_and_stay_connected()
+
+            assert client.console_version == "1.0.3,1.0.3"
+            assert sorted(client.latest_ac_status) == [0, 1]
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_connect_calls_callbacks_with_initial_sync(start_server, reply_to):
+    """
+    The CONNECTED state change and the initial status replies reach the callbacks after connecting.
+    """
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        states: list[Airtouch5ConnectionStateChange] = []
+        packets: list[DataPacket] = []
+        zone_statuses: list[dict] = []
+        ac_statuses: list[dict] = []
+        client.connection_state_callbacks.append(states.append)
+        client.data_packet_callbacks.append(packets.append)
+        client.zone_status_callbacks.append(zone_statuses.append)
+        client.ac_status_callbacks.append(ac_statuses.append)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            for _ in range(100):
+                if len(packets) == 5:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert states == [Airtouch5ConnectionStateChange.CONNECTED]
+            assert len(packets) == 5
+            assert [sorted(z) for z in zone_statuses] == [[0, 1]]
+            assert [sorted(a) for a in ac_statuses] == [[0, 1]]
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_connect_with_cached_metadata(start_server, reply_to):
+    requested: list[type] = []
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        requested.extend(type(packet.data) for packet in packets)
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        device = AirtouchDevice(
+            "127.0.0.1", "AT5N202502000000", "AirTouch5", "4300000", "Upstairs"
+        )
+        cache = MemoryMetadataCache()
+        cache.set(metadata_cache_key(device), ConsoleMetadata([], [], "1.0.3,1.0.3"))
+        client = Airtouch5SimpleClient(device, port, cache)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+
+            # Metadata comes from the cache, only the status is requested before we return
+            assert requested == [ZoneStatusData, AcStatusData]
+            assert client.console_version == "1.0.3,1.0.3"
+            assert client.ac == []
+
+            # The version is checked in the background, it hasn't changed so nothing else is fetched
+            await client._metadata_task
+            assert requested == [
+                ZoneStatusData,
+                AcStatusData,
+                ConsoleVersionRequestData,
+            ]
+            assert client.ac == []
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_failed_connect_closes_the_connection():
+    class BrokenCache(MemoryMetadataCache):
+        def get(self, key: str) -> ConsoleMetadata | None:
+            raise Exception("Cache is broken")
+
+    async def run():
+        closed = asyncio.Event()
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            await reader.read()
+            closed.set()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        device = AirtouchDevice(
+            "127.0.0.1", "AT5N202502000000", "AirTouch5", "4300000", "Upstairs"
+        )
+        client = Airtouch5SimpleClient(
+            device, server.sockets[0].getsockname()[1], BrokenCache()
+        )
+        try:
+            with pytest.raises(Exception, match="Cache is broken"):
+                await client.connect_and_stay_connected()
+            await asyncio.wait_for(closed.wait(), 5)
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_connect_with_outdated_cached_metadata(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        device = AirtouchDevice(
+            "127.0.0.1", "AT5N202502000000", "AirTouch5", "4300000", "Upstairs"
+        )
+        key = metadata_cache_key(device)
+        cache = MemoryMetadataCache()
+        cache.set(key, ConsoleMetadata([], [], "1.0.2,1.0.2"))
+        client = Airtouch5SimpleClient(device, port, cache)
+        try:
+            await client.connect_and_stay_connected()
+            await client._metadata_task
+
+            assert client.console_version == "1.0.3,1.0.3"
+            assert client.ac[0].ac_name == "UNIT"
+            assert len(client.zones) == 3
+            assert cache.get(key).console_version == "1.0.3,1.0.3"
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_keep_alive_is_sent_when_idle(start_server, reply_to, monkeypatch):
+    monkeypatch.setattr(airtouch5_simple_client, "KEEP_ALIVE_INTERVAL", 0.05)
+    requested: list[type] = []
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        requested.extend(type(packet.data) for packet in packets)
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            await asyncio.sleep(0.2)
+
+            # The console version is requested again to test the connection
+            assert requested.count(ConsoleVersionRequestData) >= 2
+            assert client._client._writer is not None
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_zone_control_is_shown_until_timeout(start_server, reply_to, monkeypatch):
+    monkeypatch.setattr(airtouch5_simple_client, "OPTIMISTIC_TIMEOUT", 0.05)
+    controls: list[DataPacket] = []
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        # The console never answers the control command
+        controls.extend(p for p in packets if isinstance(p.data, ZoneControlData))
+        return [reply_to(p) for p in packets if not isinstance(p.data, ZoneControlData)]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            before = client.latest_zone_status[0].open_percentage
+
+            await client.zone_control(
+                [
+                    ZoneControlZone(
+                        0,
+                        ZoneSettingValue.SET_OPEN_PERCENTAGE,
+                        ZoneSettingPower.KEEP_POWER_STATE,
+                        0.35,
+                    )
+                ]
+            )
+            assert client.optimistic_zone_status[0].open_percentage == 0.35
+            assert client.latest_zone_status[0].open_percentage == before
+
+            await asyncio.sleep(0.1)
+            assert len(controls) == 1
+            assert client.optimistic_zone_status[0].open_percentage == before
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_events_stream_initial_status(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        client = Airtouch5SimpleClient("127.0.0.1", port)
+        events = client.events(acs=[1], fields=["ac_mode"])
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            change = await asyncio.wait_for(events.__anext__(), 5)
+            assert (change.number, change.field, change.old_value) == (
+                1,
+                "ac_mode",
+                None,
+            )
+            assert len(events) == 0
+        finally:
+            events.close()
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_failing_state_subscriber_does_not_stop_updates():
+    async def run():
+        console = SimulatedConsole(ac_count=1, zones_per_ac=2)
+        await console.start(port=0)
+        client = Airtouch5SimpleClient("127.0.0.1", console.port)
+
+        def fail(change: StateChange) -> None:
+            raise Exception("Subscriber failed")
+
+        client.state.subscribe(fail)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+
+            # Each status pushed out is still merged in
+            for temperature in (25.0, 26.0):
+                console.zone_status[0].temperature = temperature
+                console.push_status()
+                for _ in range(100):
+                    if client.latest_zone_status[0].temperature == temperature:
+                        break
+                    await asyncio.sleep(0.01)
+                assert client.latest_zone_status[0].temperature == temperature
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_connect_with_small_blocking_queue(pipelined):
+    """
+    The reader can't block on a full queue while the initial sync waits for the replies behind it.
+    """
+
+    async def run():
+        console = SimulatedConsole(ac_count=2, zones_per_ac=4, fragment_size=16)
+        await console.start(port=0)
+        client = Airtouch5SimpleClient(
+            "127.0.0.1",
+            console.port,
+            max_queue_size=1,
+            overflow_policy=OverflowPolicy.BLOCK,
+        )
+        states: list[Airtouch5ConnectionStateChange] = []
+        client.connection_state_callbacks.append(states.append)
+        try:
+            await client.connect_and_stay_connected(pipelined)
+
+            assert len(client.zones) == 8
+            assert sorted(client.latest_ac_status) == [0, 1]
+            for _ in range(100):
+                if states:
+                    break
+                await asyncio.sleep(0.01)
+            assert states == [Airtouch5ConnectionStateChange.CONNECTED]
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,70 @@
+import threading
+
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.airtouch5_sync import Airtouch5SyncClient, LoopThread
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_status import ZonePowerState
+from airtouch5py.simulator import SimulatedConsole
+
+"""
+Tests for the blocking client, called from this (non asyncio) thread
+"""
+
+
+def test_two_consoles_on_one_loop_thread():
+    with LoopThread() as loop_thread:
+        consoles = [SimulatedConsole(zones_per_ac=2) for _ in range(2)]
+        for console in consoles:
+            loop_thread.run(console.start(port=0))
+
+        states: list[Airtouch5ConnectionStateChange] = []
+        callback_threads: set[str] = set()
+        zone_status_received = threading.Event()
+
+        def on_zone_status(status):
+            callback_threads.add(threading.current_thread().name)
+            if status[1].zone_power_state is ZonePowerState.OFF:
+                zone_status_received.set()
+
+        clients = [
+            Airtouch5SyncClient("127.0.0.1", console.port, loop_thread=loop_thread)
+            for console in consoles
+        ]
+        clients[0].connection_state_callbacks.append(states.append)
+        clients[0].zone_status_callbacks.append(on_zone_status)
+        try:
+            for client in clients:
+                client.connect()
+
+            state = clients[1].get_state()
+            assert len(state.zones) == 2
+            assert state.console_version == consoles[1].version
+
+            clients[0].set_zone(
+                [
+                    ZoneControlZone(
+                        1,
+                        ZoneSettingValue.KEEP_SETTING_VALUE,
+                        ZoneSettingPower.SET_TO_OFF,
+                        0,
+                    )
+                ]
+            )
+            # Shown straight away, before the console confirms it
+            assert (
+                clients[0].get_state().zone_status[1].zone_power_state
+                is ZonePowerState.OFF
+            )
+            assert zone_status_received.wait(5)
+            assert states == [Airtouch5ConnectionStateChange.CONNECTED]
+            assert threading.current_thread().name not in callback_threads
+            assert loop_thread._thread.name not in callback_threads
+        finally:
+            for client in clients:
+                client.close()
+            for console in consoles:
+                loop_thread.run(console.stop())
@@ -0,0 +1,29 @@
+import json
+
+from benchmarks.run import main, run
+
+
+def test_quick_benchmark_run(tmp_path):
+    results = run(quick=True)
+
+    assert {result.name for result in results} == {
+        "reader.read",
+        "decoder.decode",
+        "encoder.encode",
+        "crc16",
+        "client.receive",
+        "client.reconnect",
+    }
+    assert all(result.operations_per_second > 0 for result in results)
+
+
+def test_results_written_as_json(tmp_path, capsys):
+    path = tmp_path / "results.json"
+    main(["--quick", "--filter", "crc", "--json", str(path)])
+    main(["--quick", "--filter", "crc", "--compare", str(path)])
+
+    written = json.loads(path.read_text())
+    assert written["environment"]["crc16"] in ("table", "crcmod")
+    assert {r["params"]["bytes"] for r in written["results"]} == {16, 64, 256}
+    # The second run is compared against the first
+    assert capsys.readouterr().out.count("x\n") == 6
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from airtouch5py.callback_dispatcher import CallbackDispatcher, Subscriber
+from airtouch5py.metrics import Metrics
+
+
+def test_raising_callback_does_not_stop_the_others():
+    async def run():
+        dispatcher = CallbackDispatcher()
+        received: list[int] = []
+
+        def broken(value: int):
+            raise ValueError("broken")
+
+        callbacks = [Subscriber(broken, name="broken"), received.append]
+        dispatcher.dispatch(callbacks, 1)
+        dispatcher.dispatch(callbacks, 2)
+
+        assert received == [1, 2]
+        assert dispatcher.stats()["broken"].errors == 2
+
+    asyncio.run(run())
+
+
+def test_slow_async_subscriber_only_falls_behind_itself():
+    async def run():
+        metrics = Metrics()
+        dispatcher = CallbackDispatcher(metrics, slow_threshold=0.01)
+        release = asyncio.Event()
+        slow_received: list[int] = []
+        fast_received: list[int] = []
+
+        async def slow(value: int):
+            await release.wait()
+            await asyncio.sleep(0.02)
+            slow_received.append(value)
+
+        callbacks = [
+            Subscriber(slow, max_pending=2, name="slow"),
+            fast_received.append,
+        ]
+        dispatcher.dispatch(callbacks, 0)
+        # Let the slow callback start on 0
+        await asyncio.sleep(0)
+        for value in range(1, 5):
+            dispatcher.dispatch(callbacks, value)
+
+        # The fast callback has everything while the slow one is stuck
+        assert fast_received == [0, 1, 2, 3, 4]
+        release.set()
+        for _ in range(100):
+            if len(slow_received) == 3:
+                break
+            await asyncio.sleep(0.01)
+
+        # 0 was already being handled, 1 and 2 were dropped to keep 2 pending
+        assert slow_received == [0, 3, 4]
+        stats = dispatcher.stats()["slow"]
+        assert (stats.calls, stats.dropped, stats.slow) == (3, 2, 3)
+        assert metrics.gauges['callback_dropped{subscriber="slow"}']() == 2
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_executor_subscriber_runs_in_order_off_the_loop():
+    async def run():
+        dispatcher = CallbackDispatcher()
+        received: list[tuple[int, str]] = []
+        done = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def callback(value: int):
+            received.append((value, threading.current_thread().name))
+            if value == 2:
+                loop.call_soon_threadsafe(done.set)
+
+        with ThreadPoolExecutor(1, "callbacks") as executor:
+            callbacks = [Subscriber(callback, executor=executor)]
+            for value in range(3):
+                dispatcher.dispatch(callbacks, value)
+            await asyncio.wait_for(done.wait(), 5)
+            await dispatcher.close()
+
+        assert [value for value, _ in received] == [0, 1, 2]
+        assert all(name.startswith("callbacks") for _, name in received)
+
+    asyncio.run(run())
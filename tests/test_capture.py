@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from airtouch5py.airtouch5_client import Airtouch5Client
+from airtouch5py.capture import (
+    CaptureDirection,
+    CaptureReader,
+    CaptureWriter,
+    replay,
+    replay_timed,
+)
+from airtouch5py.packets.datapacket import DataPacket
+
+_zone_control = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+
+
+def test_write_and_read_back(tmp_path):
+    path = str(tmp_path / "capture.at5cap")
+    writer = CaptureWriter(path)
+    connection = writer.new_connection()
+    writer.record(connection, CaptureDirection.SENT, b"\x01\x02", timestamp=10.0)
+    writer.record(
+        connection, CaptureDirection.RECEIVED, _zone_control[:10], timestamp=10.5
+    )
+    writer.record(
+        connection, CaptureDirection.RECEIVED, _zone_control[10:], timestamp=11.0
+    )
+    writer.close()
+
+    # Appending keeps the existing records
+    writer = CaptureWriter(path)
+    assert writer.new_connection() == 2
+    writer.record(2, CaptureDirection.RECEIVED, _zone_control)
+    writer.close()
+    # A record cut short by a crash is ignored
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    with CaptureReader(path) as capture:
+        assert len(capture) == 4
+        assert capture[0].data == b"\x01\x02"
+        assert capture[0].direction is CaptureDirection.SENT
+        assert capture[1].timestamp == 10.5
+        assert capture.connections() == [1, 2]
+
+        # Split packets are joined up within their connection
+        assert [p.message_id for p in replay(capture)] == [0x0F, 0x0F]
+        assert len(list(replay(capture, connection=1))) == 1
+
+
+def test_append_after_record_cut_short(tmp_path):
+    path = str(tmp_path / "capture.at5cap")
+    writer = CaptureWriter(path)
+    writer.record(writer.new_connection(), CaptureDirection.RECEIVED, _zone_control)
+    writer.close()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    writer = CaptureWriter(path)
+    writer.record(writer.new_connection(), CaptureDirection.RECEIVED, _zone_control)
+    writer.close()
+
+    with CaptureReader(path) as capture:
+        assert capture.connections() == [1, 2]
+        assert len(list(replay(capture))) == 2
+
+
+def test_not_a_capture_file(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"hello world")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+
+
+def test_replay_timed_keeps_the_gaps(tmp_path):
+    path = str(tmp_path / "capture.at5cap")
+    writer = CaptureWriter(path)
+    writer.record(1, CaptureDirection.RECEIVED, _zone_control, timestamp=100.0)
+    writer.record(1, CaptureDirection.RECEIVED, _zone_control, timestamp=101.0)
+    writer.close()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        times = []
+        with CaptureReader(path) as capture:
+            async for _ in replay_timed(capture, speed=20):
+                times.append(loop.time())
+        return times
+
+    times = asyncio.run(run())
+    assert len(times) == 2
+    assert times[1] - times[0] >= 0.05 - 0.001
+
+
+def test_client_records_its_traffic(tmp_path, start_server, reply_to):
+    path = str(tmp_path / "capture.at5cap")
+
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        writer = CaptureWriter(path)
+        client = Airtouch5Client("127.0.0.1", port, capture=writer)
+        try:
+            await client.connect()
+            reply = await client.request(
+                client.data_packet_factory.console_version_request()
+            )
+            await reply
+        finally:
+            await client.disconnect()
+            writer.close()
+            server.close()
+
+    asyncio.run(run())
+
+    with CaptureReader(path) as capture:
+        sent = list(replay(capture, CaptureDirection.SENT))
+        received = list(replay(capture))
+    assert [type(p.data).__name__ for p in sent] == ["ConsoleVersionRequestData"]
+    assert [type(p.data).__name__ for p in received] == ["ConsoleVersionData"]
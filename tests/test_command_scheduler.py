@@ -0,0 +1,111 @@
+import asyncio
+
+from airtouch5py.command_scheduler import CommandScheduler
+from airtouch5py.data_packet_factory import DataPacketFactory
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_control import (
+    ZoneControlData,
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+
+
+def percentage(zone_number: int, value: float) -> ZoneControlZone:
+    return ZoneControlZone(
+        zone_number,
+        ZoneSettingValue.SET_OPEN_PERCENTAGE,
+        ZoneSettingPower.KEEP_POWER_STATE,
+        value,
+    )
+
+
+def power(zone_number: int, power: ZoneSettingPower) -> ZoneControlZone:
+    return ZoneControlZone(zone_number, ZoneSettingValue.KEEP_SETTING_VALUE, power, 0)
+
+
+def test_commands_are_merged_in_to_one_packet():
+    sent: list[DataPacket] = []
+
+    async def send(packet: DataPacket):
+        sent.append(packet)
+
+    async def run():
+        scheduler = CommandScheduler(send, DataPacketFactory(), window=0.01)
+        await asyncio.gather(
+            scheduler.zone_control([percentage(0, 0.1)]),
+            scheduler.zone_control([percentage(0, 0.5), percentage(1, 0.2)]),
+            scheduler.zone_control([power(0, ZoneSettingPower.SET_TO_ON)]),
+            scheduler.ac_control(
+                [
+                    AcControl(
+                        SetPowerSetting.KEEP_POWER_SETTING,
+                        0,
+                        SetAcMode.SET_TO_COOL,
+                        SetAcFanSpeed.KEEP_AC_FAN_SPEED,
+                        SetpointControl.KEEP_SETPOINT_VALUE,
+                        0,
+                    )
+                ]
+            ),
+        )
+
+    asyncio.run(run())
+
+    assert len(sent) == 2
+    assert isinstance(sent[0].data, ZoneControlData)
+    assert sent[0].data.zones == [
+        ZoneControlZone(
+            0,
+            ZoneSettingValue.SET_OPEN_PERCENTAGE,
+            ZoneSettingPower.SET_TO_ON,
+            0.5,
+        ),
+        percentage(1, 0.2),
+    ]
+    assert sent[1].data.ac_control[0].ac_mode is SetAcMode.SET_TO_COOL
+
+
+def test_relative_commands_are_not_merged_and_rate_is_limited():
+    sent: list[tuple[float, DataPacket]] = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        async def send(packet: DataPacket):
+            sent.append((loop.time(), packet))
+
+        scheduler = CommandScheduler(send, DataPacketFactory(), window=0.01, rate=20)
+        toggle = power(0, ZoneSettingPower.CHANGE_ON_OFF_STATE)
+        await asyncio.gather(
+            scheduler.zone_control([toggle]), scheduler.zone_control([toggle])
+        )
+
+    asyncio.run(run())
+
+    # Both toggles are sent, in separate packets at least 1 / rate seconds apart
+    assert [packet.data.zones for _, packet in sent] == [
+        [power(0, ZoneSettingPower.CHANGE_ON_OFF_STATE)]
+    ] * 2
+    assert sent[1][0] - sent[0][0] >= 0.05 - 0.001
+
+
+def test_send_failure_reaches_the_caller():
+    async def send(packet: DataPacket):
+        raise Exception("Writer is None")
+
+    async def run():
+        scheduler = CommandScheduler(send, DataPacketFactory(), window=0)
+        try:
+            await scheduler.zone_control([percentage(0, 0.1)])
+        except Exception as e:
+            return str(e)
+
+    assert asyncio.run(run()) == "Writer is None"
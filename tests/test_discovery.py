@@ -0,0 +1,131 @@
+import asyncio
+
+from airtouch5py.discovery import AirtouchDiscovery
+from airtouch5py.simulator import SimulatedConsole, start_discovery_responder
+
+"""
+Tests for AirtouchDiscovery against simulated discovery responders on loopback
+"""
+
+
+class _LossyResponder(asyncio.DatagramProtocol):
+    """
+    Ignores the first request, then answers for one console.
+    """
+
+    def __init__(self, response: bytes):
+        self.response = response
+        self.requests = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        if self.requests > 1:
+            self.transport.sendto(self.response, addr)
+
+
+class _Responder(asyncio.DatagramProtocol):
+    """
+    Answers each request with all the responses.
+    """
+
+    def __init__(self, responses: list[bytes]):
+        self.responses = responses
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        for response in self.responses:
+            self.transport.sendto(response, addr)
+
+
+def test_discover_by_ip_returns_when_the_console_replies():
+    async def run():
+        loop = asyncio.get_running_loop()
+        console = SimulatedConsole(console_id="AT5N000000000001")
+        responder = _LossyResponder(console.discovery_response("127.0.0.1"))
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: responder, local_addr=("127.0.0.1", 0)
+        )
+        discovery = AirtouchDiscovery(
+            transport.get_extra_info("sockname")[1], ("127.0.0.1", 0)
+        )
+        discovery.RETRANSMIT_INTERVAL = 0.05
+        try:
+            start = loop.time()
+            device = await discovery.discover_by_ip("127.0.0.1")
+            elapsed = loop.time() - start
+        finally:
+            await discovery.close()
+            transport.close()
+
+        assert device is not None and device.console_id == "AT5N000000000001"
+        # The lost request was resent, and we didn't wait out the timeout
+        assert responder.requests == 2
+        assert elapsed < AirtouchDiscovery.TIMEOUT / 2
+
+    asyncio.run(run())
+
+
+def test_discover_by_ip_ignores_other_consoles():
+    async def run():
+        loop = asyncio.get_running_loop()
+        other = SimulatedConsole(console_id="AT5N000000000002")
+        console = SimulatedConsole(console_id="AT5N000000000001")
+        # Another console's reply arrives first
+        responder = _Responder(
+            [
+                other.discovery_response("127.0.0.2"),
+                console.discovery_response("127.0.0.1"),
+            ]
+        )
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: responder, local_addr=("127.0.0.1", 0)
+        )
+        discovery = AirtouchDiscovery(
+            transport.get_extra_info("sockname")[1], ("127.0.0.1", 0)
+        )
+        try:
+            device = await discovery.discover_by_ip("127.0.0.1")
+        finally:
+            await discovery.close()
+            transport.close()
+
+        assert device is not None and device.console_id == "AT5N000000000001"
+
+    asyncio.run(run())
+
+
+def test_scan_yields_each_console_once():
+    async def run():
+        consoles = [
+            SimulatedConsole(console_id=f"AT5N00000000000{i}", name=f"Console {i}")
+            for i in range(3)
+        ]
+        # Advertised at another address, so the request is never seen as answered and keeps being resent
+        responder = await start_discovery_responder(
+            consoles, "10.0.0.5", "127.0.0.1", 0
+        )
+        discovery = AirtouchDiscovery(
+            responder.get_extra_info("sockname")[1], ("127.0.0.1", 0)
+        )
+        discovery.RETRANSMIT_INTERVAL = 0.05
+        try:
+            devices = [
+                device async for device in discovery.scan(["127.0.0.1"], timeout=0.3)
+            ]
+        finally:
+            await discovery.close()
+            responder.close()
+
+        assert [d.console_id for d in devices] == [
+            "AT5N000000000000",
+            "AT5N000000000001",
+            "AT5N000000000002",
+        ]
+        assert len(discovery.responses) == 3
+
+    asyncio.run(run())
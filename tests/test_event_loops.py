@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange, ClientTransport
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.discovery import AirtouchDiscovery
+from airtouch5py.simulator import SimulatedConsole, start_discovery_responder
+
+"""
+The client, simple client and discovery on each supported event loop (uvloop when it is installed)
+"""
+
+
+@pytest.mark.parametrize("transport", list(ClientTransport))
+def test_simple_client_connects_and_reconnects(run_on_loop, transport):
+    async def run():
+        console = SimulatedConsole(ac_count=1, zones_per_ac=2)
+        await console.start(port=0)
+        client = Airtouch5SimpleClient("127.0.0.1", console.port, transport=transport)
+        states: list[Airtouch5ConnectionStateChange] = []
+        client.connection_state_callbacks.append(states.append)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            assert len(client.zones) == 2
+
+            console.disconnect_clients()
+            for _ in range(100):
+                if len(states) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            assert states == [
+                Airtouch5ConnectionStateChange.CONNECTED,
+                Airtouch5ConnectionStateChange.DISCONNECTED,
+                Airtouch5ConnectionStateChange.CONNECTED,
+            ]
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    run_on_loop(run())
+
+
+def test_discovery(run_on_loop):
+    # Constructed outside of any event loop, it only uses the loop it is called from
+    discovery = AirtouchDiscovery(0, ("127.0.0.1", 0))
+
+    async def run():
+        console = SimulatedConsole(console_id="AT5N000000000001")
+        responder = await start_discovery_responder(
+            [console], "127.0.0.1", "127.0.0.1", 0
+        )
+        discovery.port = responder.get_extra_info("sockname")[1]
+        try:
+            return await discovery.discover_by_ip("127.0.0.1")
+        finally:
+            await discovery.close()
+            responder.close()
+
+    device = run_on_loop(run())
+    assert device is not None and device.console_id == "AT5N000000000001"
@@ -0,0 +1,78 @@
+import pytest
+from airtouch5py.discovery import AirtouchDevice
+from airtouch5py.metadata_cache import (
+    ConsoleMetadata,
+    FileMetadataCache,
+    MemoryMetadataCache,
+    metadata_cache_key,
+    MetadataCache,
+)
+from airtouch5py.packet_decoder import PacketDecoder
+from airtouch5py.packets.zone_name import ZoneName
+
+_device = AirtouchDevice(
+    "192.168.1.10", "AT5N202502000000", "AirTouch5", "4300000", "Upstairs"
+)
+
+
+def make_metadata() -> ConsoleMetadata:
+    # AC ability response example from the protocol documentation
+    ac_ability = PacketDecoder().decode(
+        b"\x55\x55\x55\xaa\xb0\x90\x01\x1f\x00\x1c\xff\x11\x00\x18\x55\x4e\x49\x54\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04\x17\x1d\x10\x1f\x12\x1f\xa2\x26"
+    )
+    return ConsoleMetadata(
+        ac_ability.data.ac_ability,
+        [ZoneName(0, "Living"), ZoneName(1, "Küche")],
+        "1.0.3,1.0.3",
+    )
+
+
+def test_memory_cache():
+    cache = MemoryMetadataCache()
+    key = metadata_cache_key(_device)
+    assert cache.get(key) is None
+
+    metadata = make_metadata()
+    cache.set(key, metadata)
+    assert cache.get(key) is metadata
+
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+
+def test_file_cache_survives_restart(tmp_path):
+    key = metadata_cache_key(_device)
+    FileMetadataCache(str(tmp_path)).set(key, make_metadata())
+
+    # A new cache reads it back from disk
+    metadata = FileMetadataCache(str(tmp_path)).get(key)
+    assert metadata is not None
+    assert metadata.console_version == "1.0.3,1.0.3"
+    assert [(z.zone_number, z.zone_name) for z in metadata.zones] == [
+        (0, "Living"),
+        (1, "Küche"),
+    ]
+    ac = metadata.ac[0]
+    assert ac.ac_name == "UNIT"
+    assert ac.zone_count == 4
+    assert ac.supports_mode_cool == True
+    assert ac.max_heat_set_point == 31
+
+    FileMetadataCache(str(tmp_path)).invalidate(key)
+    assert FileMetadataCache(str(tmp_path)).get(key) is None
+
+
+def test_file_cache_ignores_corrupt_file(tmp_path):
+    key = metadata_cache_key(_device)
+    (tmp_path / f"{key}.json").write_text("{not json")
+
+    assert FileMetadataCache(str(tmp_path)).get(key) is None
+
+
+def test_incomplete_cache_fails_on_construction():
+    class GetOnlyCache(MetadataCache):
+        def get(self, key: str) -> ConsoleMetadata | None:
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
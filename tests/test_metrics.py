@@ -0,0 +1,93 @@
+import asyncio
+
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.callback_dispatcher import Subscriber
+from airtouch5py.metrics import Histogram, Metrics
+from airtouch5py.packets.datapacket import DataPacket
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(1.0, 2), (2.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == 6.0
+
+
+def test_to_prometheus():
+    metrics = Metrics()
+    metrics.bytes_received = 10
+    metrics.request_seconds.observe(0.02)
+    metrics.gauges["queue_depth"] = lambda: 3
+    metrics.gauges['reader_errors{reason="crc"}'] = lambda: 1
+    metrics.gauges['reader_errors{reason="length"}'] = lambda: 2
+
+    text = metrics.to_prometheus(labels='console="upstairs"')
+    lines = text.splitlines()
+
+    assert "# TYPE airtouch5_bytes_received_total counter" in lines
+    assert 'airtouch5_bytes_received_total{console="upstairs"} 10' in lines
+    assert 'airtouch5_request_seconds_bucket{console="upstairs",le="0.01"} 0' in lines
+    assert 'airtouch5_request_seconds_bucket{console="upstairs",le="0.025"} 1' in lines
+    assert 'airtouch5_request_seconds_bucket{console="upstairs",le="+Inf"} 1' in lines
+    assert 'airtouch5_request_seconds_count{console="upstairs"} 1' in lines
+    assert 'airtouch5_queue_depth{console="upstairs"} 3' in lines
+    assert lines.count("# TYPE airtouch5_reader_errors gauge") == 1
+    assert 'airtouch5_reader_errors{console="upstairs",reason="crc"} 1' in lines
+
+
+def test_to_prometheus_groups_gauge_families():
+    metrics = Metrics()
+    for name in ("first", "second"):
+        label = f'{{subscriber="{name}"}}'
+        metrics.gauges[f"callback_calls{label}"] = lambda: 1
+        metrics.gauges[f"callback_errors{label}"] = lambda: 0
+
+    lines = metrics.to_prometheus().splitlines()
+    start = lines.index("# TYPE airtouch5_callback_calls gauge")
+
+    assert lines[start + 1 : start + 4] == [
+        'airtouch5_callback_calls{subscriber="first"} 1',
+        'airtouch5_callback_calls{subscriber="second"} 1',
+        "# TYPE airtouch5_callback_errors gauge",
+    ]
+    assert lines.count("# TYPE airtouch5_callback_errors gauge") == 1
+
+
+def test_client_metrics(start_server, reply_to):
+    def handle_requests(packets: list[DataPacket]) -> list[DataPacket]:
+        return [reply_to(packet) for packet in packets]
+
+    async def run():
+        server, port = await start_server(handle_requests)
+        metrics = Metrics()
+        client = Airtouch5SimpleClient("127.0.0.1", port, metrics=metrics)
+        client.data_packet_callbacks.append(
+            Subscriber(lambda packet: None, name="ignore")
+        )
+        client.zone_status_callbacks.append(lambda status: None)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            for _ in range(100):
+                if metrics.callback_seconds.count == 5 + 1:
+                    break
+                await asyncio.sleep(0.01)
+
+            snapshot = metrics.snapshot()
+            assert snapshot["packets_sent"] == 5
+            assert snapshot["packets_received"] == 5
+            assert snapshot["bytes_sent"] > 0
+            assert snapshot["bytes_received"] > 0
+            assert snapshot["request_seconds"]["count"] == 5
+            assert snapshot['reader_errors{reason="crc"}'] == 0
+            assert snapshot["queue_depth"] == 0
+            # The 5 data packets, then the zone status
+            assert metrics.callback_seconds.count == 5 + 1
+            assert snapshot['callback_calls{subscriber="ignore"}'] == 5
+        finally:
+            await client.disconnect()
+            server.close()
+
+    asyncio.run(run())
@@ -1,5 +1,7 @@
 # Test the packet encoder by decoding and then encoding a packet and comparing the result to the original bytes
 
+import pytest
+
 from airtouch5py.packet_decoder import PacketDecoder
 from airtouch5py.packet_encoder import PacketEncoder
 from airtouch5py.packets.datapacket import DataPacket
@@ -115,3 +117,26 @@ def test_console_version_response_example():
     source_data = b"\x55\x55\x55\xaa\xb0\x90\x01\x1f\x00\x0f\xff\x30\x00\x0b\x31\x2e\x30\x2e\x33\x2c\x31\x2e\x30\x2e\x33\x13\x28"
     encoded = decode_then_encode(source_data)
     assert encoded == source_data
+
+
+def test_encode_into_buffer_at_offset():
+    source_data = b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x18\x21\x00\x00\x00\x00\x08\x00\x02\x40\x80\x96\x80\x02\xe7\x00\x00\x01\x64\xff\x00\x07\xff\x00\x00\xb9\xef"
+    packet: DataPacket = PacketDecoder().decode(source_data)
+
+    encoder = PacketEncoder()
+    assert encoder.encoded_length(packet) == len(source_data)
+
+    buffer = bytearray(b"\xee" * (len(source_data) + 8))
+    written = encoder.encode_into(packet, buffer, 4)
+    assert written == len(source_data)
+    assert buffer[4 : 4 + written] == source_data
+    assert buffer[:4] == b"\xee" * 4
+    assert buffer[4 + written :] == b"\xee" * 4
+
+
+def test_encode_into_buffer_too_small():
+    source_data = b"\x55\x55\x55\xaa\x90\xb0\x01\x1f\x00\x02\xff\x30\x9b\x8c"
+    packet: DataPacket = PacketDecoder().decode(source_data)
+
+    with pytest.raises(ValueError):
+        PacketEncoder().encode_into(packet, bytearray(len(source_data) - 1))
@@ -1,3 +1,4 @@
+import pytest
 from airtouch5py.packet_decoder import PacketDecoder
 from airtouch5py.packets.ac_ability import AcAbilityData, AcAbilityRequestData
 from airtouch5py.packets.ac_control import (
@@ -154,6 +155,23 @@ def test_decode_ac_control_turn_off_second_ac_example():
     assert c.setpoint == 35.5
 
 
+def test_decode_ac_control_undefined_values():
+    """
+    Values that aren't explicitly defined decode to the documented fallback.
+    """
+
+    decoder = PacketDecoder()
+    data = b"\x55\x55\x55\xaa\x80\xb0\x01\xc0\x00\x0c\x22\x00\x00\x00\x00\x04\x00\x01\x91\x7a\x12\x00\x00\x00"
+    packet: DataPacket = decoder.decode(data)
+
+    c = packet.data.ac_control[0]
+    assert c.power_setting == SetPowerSetting.KEEP_POWER_SETTING
+    assert c.ac_number == 1
+    assert c.ac_mode == SetAcMode.KEEP_AC_MODE
+    assert c.ac_fan_speed == SetAcFanSpeed.KEEP_AC_FAN_SPEED
+    assert c.setpoint_control == SetpointControl.INVALIDATE_DATA
+
+
 def test_decode_ac_control_first_ac_cool_second_ac_26_degrees_example():
     """
     Decode the AC control message as given in the protocol documentation.
@@ -545,3 +563,21 @@ def test_invalid_message_type():
 
     # Message type is 0x0E, which is invalid, docs say to ignore it, which means we return None as data
     assert packet.data is None
+
+
+def test_decoded_records_compare_by_value():
+    decoder = PacketDecoder()
+    data = b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x18\x21\x00\x00\x00\x00\x08\x00\x02\x40\x80\x96\x80\x02\xe7\x00\x00\x01\x64\xff\x00\x07\xff\x00\x00\xb9\xef"
+    first: DataPacket = decoder.decode(data)
+    second: DataPacket = decoder.decode(data)
+
+    # Records are slotted and equal when their values are, as are the packets holding them
+    assert not hasattr(first.data.zones[0], "__dict__")
+    assert first.data.zones == second.data.zones
+    assert first.data.zones[0] != first.data.zones[1]
+    assert first == second
+    assert first != DataPacket(first.address, first.message_id, None)
+
+    # They can be changed, so they aren't hashable
+    with pytest.raises(TypeError):
+        hash(first.data.zones[0])
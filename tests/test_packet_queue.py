@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.packet_queue import OverflowPolicy, PacketQueue
+from airtouch5py.packets.console_version import ConsoleVersionData
+from airtouch5py.packets.datapacket import DataPacket
+from airtouch5py.packets.zone_status import (
+    ControlMethod,
+    ZonePowerState,
+    ZoneStatusData,
+    ZoneStatusZone,
+)
+
+
+def zone(zone_number: int, open_percentage: float) -> ZoneStatusZone:
+    return ZoneStatusZone(
+        ZonePowerState.ON,
+        zone_number,
+        ControlMethod.PERCENTAGE_CONTROL,
+        open_percentage,
+        None,
+        False,
+        None,
+        False,
+        False,
+    )
+
+
+def zone_status(*zones: ZoneStatusZone) -> DataPacket:
+    return DataPacket(0x80B0, 1, ZoneStatusData(list(zones)))
+
+
+def version(message_id: int) -> DataPacket:
+    return DataPacket(0x90B0, message_id, ConsoleVersionData(False, "1.0.3"))
+
+
+def test_block_raises_when_full_and_put_waits_for_space():
+    async def run():
+        queue = PacketQueue(2, OverflowPolicy.BLOCK)
+        queue.put_nowait(version(1))
+        queue.put_nowait(version(2))
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(version(3))
+
+        put = asyncio.create_task(queue.put(version(3)))
+        await asyncio.sleep(0)
+        assert not put.done()
+
+        assert (await queue.get()).message_id == 1
+        await put
+        assert [queue.get_nowait().message_id for _ in range(2)] == [2, 3]
+
+    asyncio.run(run())
+
+
+def test_drop_oldest_keeps_connection_state_changes():
+    queue = PacketQueue(2, OverflowPolicy.DROP_OLDEST)
+    queue.put_nowait(Airtouch5ConnectionStateChange.CONNECTED)
+    queue.put_nowait(version(1))
+    queue.put_nowait(version(2))
+    # Connection state changes go over maxsize rather than being dropped or blocking
+    queue.put_nowait(Airtouch5ConnectionStateChange.DISCONNECTED)
+
+    assert queue.dropped == 1
+    assert queue.get_nowait() is Airtouch5ConnectionStateChange.CONNECTED
+    assert queue.get_nowait().message_id == 2
+    assert queue.get_nowait() is Airtouch5ConnectionStateChange.DISCONNECTED
+
+
+def test_coalesce_keeps_newest_status_of_each_zone():
+    queue = PacketQueue(10, OverflowPolicy.COALESCE)
+    first = zone_status(zone(0, 0.1), zone(1, 0.1))
+    queue.put_nowait(first)
+    queue.put_nowait(version(1))
+    queue.put_nowait(zone_status(zone(0, 0.2)))
+    queue.put_nowait(zone_status(zone(0, 0.3)))
+
+    assert queue.coalesced == 2
+    assert queue.qsize() == 3
+    assert queue.get_nowait().data.zones == [zone(1, 0.1)]
+    assert queue.get_nowait().message_id == 1
+    assert queue.get_nowait().data.zones == [zone(0, 0.3)]
+    # The original packet may be a request's reply, so it isn't modified
+    assert len(first.data.zones) == 2
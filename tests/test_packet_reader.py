@@ -1,3 +1,6 @@
+import logging
+
+from airtouch5py.crc16 import crc16_modbus
 from airtouch5py.packet_reader import PacketReader
 
 
@@ -30,3 +33,105 @@ def test_read_two_zone_control_example():
     packets = reader.read(source_data)
 
     assert len(packets) == 2
+
+
+def test_read_skips_noise_before_packet():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    reader = PacketReader()
+    packets = reader.read(b"\x00\x55\x12\x55\x55" * 100 + source_data)
+
+    assert len(packets) == 1
+    assert packets[0].message_id == 0x0F
+
+
+def test_read_header_split_across_reads():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    reader = PacketReader()
+
+    # Noise that doesn't contain a header, followed by the first half of the header
+    assert len(reader.read(b"\x01" * 20 + source_data[:2])) == 0
+    packets = reader.read(source_data[2:])
+
+    assert len(packets) == 1
+
+
+def test_read_large_backlog_in_small_chunks():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    backlog = (b"\x00\x01\x02" + source_data) * 1000
+    reader = PacketReader()
+
+    packets = []
+    for i in range(0, len(backlog), 1000):
+        packets.extend(reader.read(backlog[i : i + 1000]))
+
+    assert len(packets) == 1000
+
+
+def test_read_drops_packet_with_bad_crc():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    corrupt_data = source_data[:-1] + b"\x00"
+    reader = PacketReader()
+    packets = reader.read(corrupt_data + source_data)
+
+    assert len(packets) == 1
+    assert reader.crc_errors == 1
+
+
+def test_read_does_not_wait_for_corrupt_length():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    # Data length corrupted to 0xF00C
+    corrupt_data = source_data[:8] + b"\xf0" + source_data[9:]
+    reader = PacketReader()
+    packets = reader.read(corrupt_data + source_data)
+
+    assert len(packets) == 1
+    assert reader.length_errors == 1
+
+
+def test_read_does_not_wait_for_false_header():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    # Looks like a header with a data length of 0x300, but the address and message type are unknown
+    false_header = b"\x55\x55\x55\xaa\x12\x34\x00\x00\x03\x00"
+    reader = PacketReader()
+    packets = reader.read(false_header + source_data)
+
+    assert len(packets) == 1
+    assert reader.header_errors == 1
+
+
+def test_readers_do_not_share_buffers():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    reader_a = PacketReader()
+    reader_b = PacketReader()
+
+    assert len(reader_a.read(source_data[:10])) == 0
+    assert len(reader_b.read(source_data[:10])) == 0
+    assert len(reader_a.read(source_data[10:])) == 1
+    assert len(reader_b.read(source_data[10:])) == 1
+
+
+def test_reset_discards_partial_packet():
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    reader = PacketReader()
+
+    assert len(reader.read(source_data[:10])) == 0
+    reader.reset()
+    assert len(reader.read(source_data[10:])) == 0
+    assert len(reader.read(source_data)) == 1
+
+
+def test_read_after_decode_error_is_logged(caplog):
+    # A zone control packet with a valid CRC but data too short to decode
+    source_data = b"\x55\x55\x55\xaa\x80\xb0\x0f\xc0\x00\x0c\x20\x00\x00\x00\x00\x04\x00\x01\x01\x02\xff\x00\xf0\xa1"
+    body = source_data[4:8] + b"\x00\x03" + source_data[10:13]
+    crc = crc16_modbus(body)
+    undecodable = source_data[:4] + body + bytes([crc >> 8, crc & 0xFF])
+    reader = PacketReader()
+
+    # caplog keeps the log records, and with them the exception
+    with caplog.at_level(logging.DEBUG, logger="airtouch5py.packet_reader"):
+        assert len(reader.read(undecodable + source_data[:10])) == 0
+    assert reader.decode_errors == 1
+
+    assert len(reader.read(source_data[10:] + source_data)) == 2
+    reader.reset()
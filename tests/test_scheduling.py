@@ -0,0 +1,54 @@
+import asyncio
+
+from airtouch5py.scheduling import Backoff, FIXED_BACKOFF, TimerWheel
+
+
+def test_backoff_grows_to_maximum_with_jitter():
+    backoff = Backoff(initial=1, maximum=10, multiplier=2, jitter=0.5)
+
+    for attempt, expected in enumerate([1, 2, 4, 8, 10, 10]):
+        delay = backoff.delay(attempt)
+        assert expected * 0.5 <= delay <= expected
+
+
+def test_fixed_backoff():
+    assert [FIXED_BACKOFF.delay(attempt) for attempt in range(5)] == [5] * 5
+
+
+def test_timer_wheel_runs_timers_in_order_and_skips_cancelled():
+    async def run():
+        wheel = TimerWheel(resolution=0.01)
+        fired: list[str] = []
+        wheel.call_later(0.03, fired.append, "late")
+        wheel.call_later(0.01, fired.append, "early")
+        cancelled = wheel.call_later(0.02, fired.append, "cancelled")
+        cancelled.cancel()
+        assert len(wheel) == 2
+
+        await asyncio.sleep(0.1)
+
+        assert fired == ["early", "late"]
+        assert len(wheel) == 0
+        assert wheel._tick_handle is None
+
+    asyncio.run(run())
+
+
+def test_timer_wheel_keeps_running_after_callback_error():
+    async def run():
+        wheel = TimerWheel(resolution=0.01)
+        fired: list[int] = []
+
+        def fail():
+            raise Exception("Oops")
+
+        wheel.call_later(0.01, fail)
+        wheel.call_later(0.01, fired.append, 1)
+        # Timers scheduled from a timer callback still run
+        wheel.call_later(0.01, lambda: wheel.call_later(0.01, fired.append, 2))
+
+        await asyncio.sleep(0.1)
+
+        assert fired == [1, 2]
+
+    asyncio.run(run())
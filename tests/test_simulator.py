@@ -0,0 +1,184 @@
+import asyncio
+
+from airtouch5py.airtouch5_client import Airtouch5ConnectionStateChange
+from airtouch5py.airtouch5_simple_client import Airtouch5SimpleClient
+from airtouch5py.discovery import AirtouchDiscovery, AirtouchDiscoveryProtocol
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.ac_status import AcMode
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_status import ZonePowerState
+from airtouch5py.simulator import SimulatedConsole, start_discovery_responder
+
+
+def test_simple_client_against_fragmented_slow_console():
+    async def run():
+        console = SimulatedConsole(
+            ac_count=2, zones_per_ac=3, latency=0.01, fragment_size=5
+        )
+        await console.start(port=0)
+        client = Airtouch5SimpleClient("127.0.0.1", console.port)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            assert [ac.ac_name for ac in client.ac] == ["AC 1", "AC 2"]
+            assert len(client.zones) == 6
+            assert client.console_version == console.version
+
+            await client.zone_control(
+                [
+                    ZoneControlZone(
+                        4,
+                        ZoneSettingValue.SET_OPEN_PERCENTAGE,
+                        ZoneSettingPower.SET_TO_OFF,
+                        0.35,
+                    )
+                ]
+            )
+            for _ in range(100):
+                if client.latest_zone_status[4].zone_power_state is ZonePowerState.OFF:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert client.latest_zone_status[4].zone_power_state is ZonePowerState.OFF
+            assert client.latest_zone_status[4].open_percentage == 0.35
+
+            # Changes made on the console are pushed out
+            console.ac_status[1].ac_mode = AcMode.HEAT
+            console.push_status()
+            for _ in range(100):
+                if client.latest_ac_status[1].ac_mode is AcMode.HEAT:
+                    break
+                await asyncio.sleep(0.01)
+            assert client.latest_ac_status[1].ac_mode is AcMode.HEAT
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    asyncio.run(run())
+
+
+def test_client_reconnects_after_console_drops_it():
+    async def run():
+        console = SimulatedConsole()
+        await console.start(port=0)
+        client = Airtouch5SimpleClient("127.0.0.1", console.port)
+        states: list[Airtouch5ConnectionStateChange] = []
+        client.connection_state_callbacks.append(states.append)
+        try:
+            await client.connect_and_stay_connected()
+            await asyncio.sleep(0.05)
+            console.disconnect_clients()
+            for _ in range(100):
+                if len(states) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            assert states == [
+                Airtouch5ConnectionStateChange.CONNECTED,
+                Airtouch5ConnectionStateChange.DISCONNECTED,
+                Airtouch5ConnectionStateChange.CONNECTED,
+            ]
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    asyncio.run(run())
+
+
+def test_optimistic_state_matches_console():
+    """
+    The client's predictions are checked against the simulator, which applies commands its own way.
+    """
+
+    async def run():
+        console = SimulatedConsole(ac_count=1, zones_per_ac=2)
+        await console.start(port=0)
+        client = Airtouch5SimpleClient("127.0.0.1", console.port)
+        try:
+            await client.connect_and_stay_connected(pipelined=True)
+            await client.zone_control(
+                [
+                    ZoneControlZone(
+                        1,
+                        ZoneSettingValue.SET_TARGET_SETPOINT,
+                        ZoneSettingPower.CHANGE_ON_OFF_STATE,
+                        24.0,
+                    )
+                ]
+            )
+            await client.ac_control(
+                [
+                    AcControl(
+                        SetPowerSetting.CHANGE_ON_OFF_STATUS,
+                        0,
+                        SetAcMode.SET_TO_COOL,
+                        SetAcFanSpeed.SET_TO_HIGH,
+                        SetpointControl.CHANGE_SETPOINT,
+                        22.0,
+                    )
+                ]
+            )
+            predicted_zone = client.optimistic_zone_status[1]
+            predicted_ac = client.optimistic_ac_status[0]
+
+            # Wait for the console to confirm (or contradict) the predictions
+            for _ in range(100):
+                if (
+                    client.optimistic_zone_status == client.latest_zone_status
+                    and client.optimistic_ac_status == client.latest_ac_status
+                ):
+                    break
+                await asyncio.sleep(0.01)
+
+            assert predicted_zone == console.zone_status[1]
+            assert predicted_ac == console.ac_status[0]
+            assert client.latest_zone_status[1] == console.zone_status[1]
+            assert client.latest_ac_status[0] == console.ac_status[0]
+        finally:
+            await client.disconnect()
+            await console.stop()
+
+    asyncio.run(run())
+
+
+def test_discovery_responder():
+    async def run():
+        consoles = [
+            SimulatedConsole(console_id=f"AT5N00000000000{i}", name=f"Console {i}")
+            for i in range(3)
+        ]
+        transport = await start_discovery_responder(
+            consoles, "10.0.0.5", "127.0.0.1", 0
+        )
+        port = transport.get_extra_info("sockname")[1]
+
+        responses: list[bytes] = []
+        loop = asyncio.get_running_loop()
+        client, _ = await loop.create_datagram_endpoint(
+            lambda: AirtouchDiscoveryProtocol(responses.append),
+            local_addr=("127.0.0.1", 0),
+        )
+        try:
+            client.sendto(
+                AirtouchDiscovery.DISCOVERY_MESSAGE.encode("utf-8"), ("127.0.0.1", port)
+            )
+            for _ in range(100):
+                if len(responses) == 3:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            client.close()
+            transport.close()
+
+        assert responses[0] == b"10.0.0.5,AT5N000000000000,AirTouch5,0000000,Console 0"
+        assert len(responses) == 3
+
+    asyncio.run(run())
@@ -0,0 +1,89 @@
+import asyncio
+import copy
+
+import pytest
+from airtouch5py.packet_decoder import PacketDecoder
+from airtouch5py.state_events import StateEventStream
+from airtouch5py.state_store import StateChangeKind, StateStore
+
+# Zone status and AC status response examples from the protocol documentation
+_zone_status = (
+    PacketDecoder()
+    .decode(
+        b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x18\x21\x00\x00\x00\x00\x08\x00\x02\x40\x80\x96\x80\x02\xe7\x00\x00\x01\x64\xff\x00\x07\xff\x00\x00\xb9\xef"
+    )
+    .data.zones
+)
+_ac_status = (
+    PacketDecoder()
+    .decode(
+        b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x1c\x23\x00\x00\x00\x00\x0a\x00\x02\x10\x12\x78\xc0\x02\xda\x00\x00\x80\x00\x01\x42\x64\xc0\x02\xe4\x00\x00\x80\x00\x3d\x79"
+    )
+    .data.ac_status
+)
+
+
+def _set_temperatures(store: StateStore, *temperatures: float) -> None:
+    for temperature in temperatures:
+        zones = copy.deepcopy(_zone_status)
+        zones[1].temperature = temperature
+        store.update_zones(zones)
+
+
+def test_stream_is_filtered_and_ends_when_closed():
+    async def run():
+        store = StateStore()
+        store.update_zones(_zone_status)
+        store.update_acs(_ac_status)
+
+        received = []
+        async with StateEventStream(store, zones=[1], fields=["temperature"]) as events:
+
+            async def consume():
+                async for change in events:
+                    received.append(change)
+
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(0)
+            _set_temperatures(store, 21.5, 22.0)
+            store.update_zones(copy.deepcopy(_zone_status)[:1])
+            store.update_acs(copy.deepcopy(_ac_status))
+            await asyncio.sleep(0)
+        await asyncio.wait_for(consumer, 1)
+
+        assert [(c.kind, c.number, c.field, c.new_value) for c in received] == [
+            (StateChangeKind.ZONE, 1, "temperature", 21.5),
+            (StateChangeKind.ZONE, 1, "temperature", 22.0),
+        ]
+
+    asyncio.run(run())
+
+
+def test_buffer_drops_oldest_or_keeps_latest():
+    async def run():
+        store = StateStore()
+        store.update_zones(_zone_status)
+        original = _zone_status[1].temperature
+
+        bounded = StateEventStream(
+            store, zones=[1], fields=["temperature"], max_pending=2
+        )
+        latest = StateEventStream(store, zones=[1], latest_only=True)
+        _set_temperatures(store, 21.0, 22.0, 23.0)
+        bounded.close()
+        latest.close()
+
+        assert [c.new_value async for c in bounded] == [22.0, 23.0]
+        assert bounded.dropped == 1
+        # One change per field, from the value before the burst to the newest
+        changes = [c async for c in latest]
+        assert [(c.field, c.old_value, c.new_value) for c in changes] == [
+            ("temperature", original, 23.0)
+        ]
+
+    asyncio.run(run())
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        StateEventStream(StateStore(), fields=["temprature"])
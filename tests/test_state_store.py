@@ -0,0 +1,241 @@
+import asyncio
+import copy
+
+from airtouch5py.callback_dispatcher import CallbackDispatcher, Subscriber
+from airtouch5py.metrics import Metrics
+from airtouch5py.packet_decoder import PacketDecoder
+from airtouch5py.packets.ac_control import (
+    AcControl,
+    SetAcFanSpeed,
+    SetAcMode,
+    SetpointControl,
+    SetPowerSetting,
+)
+from airtouch5py.packets.zone_control import (
+    ZoneControlZone,
+    ZoneSettingPower,
+    ZoneSettingValue,
+)
+from airtouch5py.packets.zone_status import ZonePowerState
+from airtouch5py.state_events import StateEventStream
+from airtouch5py.state_store import StateChange, StateChangeKind, StateStore
+
+# Zone status and AC status response examples from the protocol documentation
+_zone_status = (
+    PacketDecoder()
+    .decode(
+        b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x18\x21\x00\x00\x00\x00\x08\x00\x02\x40\x80\x96\x80\x02\xe7\x00\x00\x01\x64\xff\x00\x07\xff\x00\x00\xb9\xef"
+    )
+    .data.zones
+)
+_ac_status = (
+    PacketDecoder()
+    .decode(
+        b"\x55\x55\x55\xaa\xb0\x80\x01\xc0\x00\x1c\x23\x00\x00\x00\x00\x0a\x00\x02\x10\x12\x78\xc0\x02\xda\x00\x00\x80\x00\x01\x42\x64\xc0\x02\xe4\x00\x00\x80\x00\x3d\x79"
+    )
+    .data.ac_status
+)
+
+
+def test_first_update_reports_every_field():
+    store = StateStore()
+    changes: list[StateChange] = []
+    store.subscribe(changes.append, StateChangeKind.ZONE)
+
+    store.update_zones(_zone_status)
+
+    assert len(changes) == 2 * 8
+    assert all(c.old_value is None for c in changes)
+    assert sorted(store.zone_status) == [0, 1]
+
+
+def test_only_changed_fields_are_reported():
+    store = StateStore()
+    store.update_zones(_zone_status)
+    changes: list[StateChange] = []
+    store.subscribe(changes.append)
+
+    zones = copy.deepcopy(_zone_status)
+    zones[1].temperature = 21.5
+    zones[1].zone_power_state = ZonePowerState.TURBO
+    store.update_zones(zones)
+
+    assert [(c.kind, c.number, c.field) for c in changes] == [
+        (StateChangeKind.ZONE, 1, "zone_power_state"),
+        (StateChangeKind.ZONE, 1, "temperature"),
+    ]
+    assert changes[1].old_value == _zone_status[1].temperature
+    assert changes[1].new_value == 21.5
+    assert store.zone_status[1] is zones[1]
+
+    # Same again, nothing changed
+    changes.clear()
+    store.update_zones(copy.deepcopy(zones))
+    assert changes == []
+
+
+def test_subscription_filters():
+    store = StateStore()
+    store.update_zones(_zone_status)
+    store.update_acs(_ac_status)
+    zone_0: list[StateChange] = []
+    temperatures: list[StateChange] = []
+    store.subscribe(zone_0.append, StateChangeKind.ZONE, numbers=[0])
+    unsubscribe = store.subscribe(temperatures.append, fields=["temperature"])
+
+    zones = copy.deepcopy(_zone_status)
+    for zone in zones:
+        zone.temperature = 30.0
+    acs = copy.deepcopy(_ac_status)
+    acs[0].temperature = 30.0
+    store.update_zones(zones)
+    store.update_acs(acs)
+
+    assert [(c.number, c.field) for c in zone_0] == [(0, "temperature")]
+    assert [(c.kind, c.number) for c in temperatures] == [
+        (StateChangeKind.ZONE, 0),
+        (StateChangeKind.ZONE, 1),
+        (StateChangeKind.AC, 0),
+    ]
+
+    unsubscribe()
+    acs = copy.deepcopy(acs)
+    acs[0].temperature = 10.0
+    store.update_acs(acs)
+    assert len(temperatures) == 3
+
+
+def test_failing_subscriber_does_not_stop_updates():
+    store = StateStore()
+    changes: list[StateChange] = []
+
+    def fail(change: StateChange) -> None:
+        raise Exception("Subscriber failed")
+
+    store.subscribe(fail)
+    store.subscribe(changes.append)
+    store.update_zones(_zone_status)
+
+    zones = copy.deepcopy(_zone_status)
+    zones[0].temperature = 30.0
+    store.update_zones(zones)
+
+    assert len(changes) == 2 * 8 + 1
+    assert store.zone_status[0].temperature == 30.0
+
+
+def test_subscribers_are_called_through_the_dispatcher():
+    async def run():
+        metrics = Metrics()
+        dispatcher = CallbackDispatcher(metrics)
+        store = StateStore(dispatcher)
+        received: list[StateChange] = []
+
+        def fail(change: StateChange) -> None:
+            raise Exception("Subscriber failed")
+
+        async def save(change: StateChange) -> None:
+            received.append(change)
+
+        store.subscribe(Subscriber(fail, name="fail"))
+        unsubscribe = store.subscribe(Subscriber(save, name="save"))
+        events = StateEventStream(store)
+        store.update_zones(_zone_status)
+        for _ in range(100):
+            if len(received) == 2 * 8:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(received) == len(events) == 2 * 8
+        stats = dispatcher.stats()
+        assert stats["fail"].errors == 2 * 8
+        assert stats["events"].calls == 2 * 8
+
+        # Unsubscribing forgets the subscriber and its gauges
+        unsubscribe()
+        events.close()
+        assert sorted(dispatcher.stats()) == ["fail"]
+        assert 'callback_calls{subscriber="save"}' not in metrics.gauges
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_records_not_in_update_are_kept():
+    store = StateStore()
+    store.update_acs(_ac_status)
+    store.update_acs([copy.deepcopy(_ac_status[1])])
+
+    assert sorted(store.ac_status) == [0, 1]
+
+
+def test_optimistic_zone_control_is_confirmed_by_status():
+    store = StateStore()
+    store.update_zones(_zone_status)
+    changes: list[StateChange] = []
+    store.subscribe(changes.append)
+
+    rollback = store.apply_zone_control(
+        [
+            ZoneControlZone(
+                1,
+                ZoneSettingValue.SET_OPEN_PERCENTAGE,
+                ZoneSettingPower.SET_TO_TURBO,
+                0.5,
+            )
+        ]
+    )
+
+    # Shown straight away, the status from the console is unchanged
+    assert store.optimistic_zone_status[1].open_percentage == 0.5
+    assert store.optimistic_zone_status[1].zone_power_state is ZonePowerState.TURBO
+    assert store.zone_status[1] is _zone_status[1]
+    assert sorted((c.number, c.field) for c in changes) == [
+        (1, "open_percentage"),
+        (1, "zone_power_state"),
+    ]
+
+    # The console confirms it, nothing changes in the view
+    changes.clear()
+    zones = copy.deepcopy(_zone_status)
+    zones[1].open_percentage = 0.5
+    zones[1].zone_power_state = ZonePowerState.TURBO
+    store.update_zones(zones)
+    assert changes == []
+    assert store.optimistic_zone_status is store.zone_status
+
+    # Too late to roll back
+    rollback()
+    assert store.zone_status[1].open_percentage == 0.5
+
+
+def test_optimistic_ac_control_is_rolled_back():
+    store = StateStore()
+    store.update_acs(_ac_status)
+    changes: list[StateChange] = []
+    store.subscribe(changes.append)
+
+    rollback = store.apply_ac_control(
+        [
+            AcControl(
+                SetPowerSetting.KEEP_POWER_SETTING,
+                0,
+                SetAcMode.KEEP_AC_MODE,
+                SetAcFanSpeed.KEEP_AC_FAN_SPEED,
+                SetpointControl.CHANGE_SETPOINT,
+                26,
+            )
+        ]
+    )
+    assert store.optimistic_ac_status[0].ac_setpoint == 26
+
+    # A status that doesn't confirm it (e.g. sent before the console got the command) keeps it pending
+    store.update_acs(copy.deepcopy(_ac_status))
+    assert store.optimistic_ac_status[0].ac_setpoint == 26
+
+    rollback()
+    assert store.optimistic_ac_status[0].ac_setpoint == _ac_status[0].ac_setpoint
+    assert [(c.field, c.old_value, c.new_value) for c in changes] == [
+        ("ac_setpoint", _ac_status[0].ac_setpoint, 26),
+        ("ac_setpoint", 26, _ac_status[0].ac_setpoint),
+    ]